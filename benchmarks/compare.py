@@ -0,0 +1,49 @@
+"""
+Compares two benchmark result files by median time.
+
+    python benchmarks/compare.py results/base.json results/new.json
+"""
+import sys
+import json
+import argparse
+
+
+def compare(base, new, threshold=0.10):
+    """Yields (name, base_ms, new_ms, ratio, flag) for benchmarks present in either run."""
+    names = list(base['results']) + [n for n in new['results'] if n not in base['results']]
+    for name in names:
+        b = base['results'].get(name, {}).get('median_ms')
+        n = new['results'].get(name, {}).get('median_ms')
+        if b is None or n is None:
+            yield name, b, n, None, 'missing'
+            continue
+        ratio = n / b if b else float('inf')
+        flag = 'slower' if ratio > 1 + threshold else 'faster' if ratio < 1 - threshold else ''
+        yield name, b, n, ratio, flag
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark runs")
+    parser.add_argument('base')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="relative change reported as faster/slower (default 0.10)")
+    args = parser.parse_args(argv)
+    with open(args.base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.new, encoding='utf-8') as f:
+        new = json.load(f)
+
+    print(f"base: {base['meta']['git']['commit']}  new: {new['meta']['git']['commit']}")
+    slower = 0
+    for name, b, n, ratio, flag in compare(base, new, args.threshold):
+        if ratio is None:
+            print(f"{name:32} {'-' if b is None else f'{b:.3f}':>12} {'-' if n is None else f'{n:.3f}':>12}")
+            continue
+        print(f"{name:32} {b:12.3f} {n:12.3f}  x{ratio:6.2f}  {flag}")
+        slower += flag == 'slower'
+    return 1 if slower else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
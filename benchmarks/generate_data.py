@@ -0,0 +1,212 @@
+"""
+Fills a Smart POS database with synthetic but realistically skewed data for
+benchmarking. The same --seed and --end-date always produce the same database.
+
+    python benchmarks/generate_data.py --db bench.db --products 200000 --customers 20000 --lines 5000000
+
+Sales follow a Zipf-like curve (a few hundred SKUs make most of the lines),
+bill sizes are long-tailed, trading hours peak around noon and evening, and
+about 8% of bills are credit sales to repeat customers.
+"""
+import os
+import sys
+import argparse
+import random
+import time
+from bisect import bisect
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import database.connection
+from database.schema import create_tables
+from database.seed import seed_database
+from database.migrate import run_migrations
+
+CATEGORIES = ['Grocery', 'Dairy', 'Snacks', 'Beverages', 'Personal Care', 'Household',
+              'Stationery', 'Frozen', 'Bakery', 'Baby Care', 'Pharmacy', 'Pooja Items']
+WORDS = ['Fresh', 'Classic', 'Premium', 'Gold', 'Natural', 'Masala', 'Lite', 'Family',
+         'Rich', 'Super', 'Daily', 'Select', 'Royal', 'Pure', 'Value', 'Special']
+NOUNS = ['Atta', 'Rice', 'Dal', 'Oil', 'Soap', 'Shampoo', 'Biscuits', 'Chips', 'Tea',
+         'Coffee', 'Milk', 'Paneer', 'Ghee', 'Juice', 'Noodles', 'Detergent', 'Toothpaste',
+         'Namkeen', 'Sugar', 'Salt', 'Pen', 'Notebook', 'Bread', 'Agarbatti']
+UNITS = ['pcs'] * 6 + ['kg', 'box', 'ltr', 'ml']
+GST_WEIGHTS = {0.0: 15, 5.0: 35, 12.0: 20, 18.0: 25, 28.0: 5}
+PAYMENT_MODES = ['cash', 'upi', 'card', 'credit']
+PAYMENT_WEIGHTS = [50, 32, 10, 8]
+HOUR_WEIGHTS = [0] * 8 + [2, 5, 8, 10, 12, 9, 6, 5, 6, 9, 12, 11, 8, 4] + [0] * 2
+CHUNK = 2000  # invoices per transaction
+
+
+def zipf_sampler(rng, n, s):
+    """Returns a function drawing indexes 0..n-1 with P(k) proportional to 1/(k+1)^s."""
+    cum = list(accumulate(1.0 / (k + 1) ** s for k in range(n)))
+    total = cum[-1]
+    return lambda: bisect(cum, rng.random() * total)
+
+
+def generate(db_path, products=5000, customers=1000, lines=100000, days=90,
+             skew=1.1, seed=42, end_date=None):
+    if os.path.exists(db_path):
+        raise ValueError(f"{db_path} already exists; pick a new file.")
+    rng = random.Random(seed)
+    end_date = end_date or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start_date = end_date - timedelta(days=days - 1)
+
+    database.connection.set_db_path(db_path)
+    conn = database.connection.get_connection()
+    create_tables(conn)
+    seed_database()
+    run_migrations()
+    conn.execute("PRAGMA synchronous = OFF")
+
+    started = time.perf_counter()
+    with conn:
+        conn.executemany("INSERT OR IGNORE INTO categories (name) VALUES (?)", [(c,) for c in CATEGORIES])
+    category_ids = [r[0] for r in conn.execute("SELECT id FROM categories")]
+    gst_ids = {r['rate']: r['id'] for r in conn.execute("SELECT id, rate FROM gst_rates")}
+    gst_choices = list(GST_WEIGHTS)
+    gst_weights = list(GST_WEIGHTS.values())
+
+    # Products: the id order is shuffled against popularity so hot SKUs are spread over the table
+    catalog = []
+    rows = []
+    for i in range(1, products + 1):
+        rate = rng.choices(gst_choices, gst_weights)[0]
+        price = round(rng.lognormvariate(4.0, 0.9), 0) or 1.0
+        cost = round(price * rng.uniform(0.7, 0.9), 2)
+        name = f"{rng.choice(WORDS)} {rng.choice(NOUNS)} {rng.choice([50, 100, 200, 250, 500, 1000])}g #{i}"
+        expiry = (end_date + timedelta(days=rng.randint(-10, 400))).strftime('%Y-%m-%d') if rng.random() < 0.3 else None
+        rows.append((i, name, f"SKU{i:07d}", f"890{i:010d}", rng.choice(category_ids), gst_ids[rate],
+                     rng.choice(UNITS), cost, price, rng.randint(0, 500), rng.choice([5, 10, 20]), expiry))
+        catalog.append((i, name, price, rate))
+    with conn:
+        conn.executemany("""
+            INSERT INTO products (id, name, sku, barcode, category_id, gst_rate_id, unit,
+                                  cost_price, sell_price, stock, low_stock_qty, expiry_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+    popularity = list(range(products))
+    rng.shuffle(popularity)
+
+    with conn:
+        conn.executemany("INSERT INTO customers (id, name, phone, address) VALUES (?, ?, ?, ?)", [
+            (i, f"{rng.choice(['Amit', 'Priya', 'Ravi', 'Sunita', 'Farhan', 'Lakshmi', 'Joseph', 'Meena'])} "
+                f"{rng.choice(['Sharma', 'Patel', 'Reddy', 'Khan', 'Iyer', 'Das', 'Singh', 'Nair'])} {i}",
+             f"9{i:09d}", f"Ward {rng.randint(1, 40)}")
+            for i in range(1, customers + 1)
+        ])
+
+    pick_product = zipf_sampler(rng, products, skew)
+    pick_customer = zipf_sampler(rng, customers, 0.8) if customers else None
+    day_count = days
+    outstanding = {}
+    invoice_id = 0
+    line_id = 0
+    seq_by_day = {}
+    inv_rows, item_rows, log_rows = [], [], []
+
+    def flush():
+        with conn:
+            conn.executemany("""
+                INSERT INTO invoices (id, invoice_number, customer_id, user_id, subtotal, discount_pct,
+                                      discount_amt, cgst_amt, sgst_amt, total, payment_mode,
+                                      payment_status, created_at)
+                VALUES (?, ?, ?, 1, ?, 0, ?, ?, ?, ?, ?, ?, ?)
+            """, inv_rows)
+            conn.executemany("""
+                INSERT INTO invoice_items (invoice_id, product_id, product_name, qty, unit_price,
+                                           discount, gst_rate, gst_amt, line_total)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, item_rows)
+            conn.executemany("""
+                INSERT INTO inventory_logs (product_id, change_qty, reason, invoice_id, user_id, created_at)
+                VALUES (?, ?, 'sale', ?, 1, ?)
+            """, log_rows)
+        inv_rows.clear(); item_rows.clear(); log_rows.clear()
+
+    # Invoices are generated in time order so ids and invoice numbers ascend together
+    avg_lines = 4.0
+    invoices_total = max(1, int(lines / avg_lines))
+    per_day = [rng.uniform(0.7, 1.3) for _ in range(day_count)]
+    scale = invoices_total / sum(per_day)
+    for d in range(day_count):
+        day = start_date + timedelta(days=d)
+        n_invoices = int(per_day[d] * scale)
+        stamps = sorted(
+            day + timedelta(hours=rng.choices(range(24), HOUR_WEIGHTS)[0], seconds=rng.randint(0, 3599))
+            for _ in range(n_invoices)
+        )
+        for ts in stamps:
+            invoice_id += 1
+            n_lines = min(1 + int(rng.expovariate(1 / (avg_lines - 0.5))), 40)
+            mode = rng.choices(PAYMENT_MODES, PAYMENT_WEIGHTS)[0]
+            customer_id = None
+            if customers and (mode == 'credit' or rng.random() < 0.2):
+                customer_id = pick_customer() + 1
+            elif mode == 'credit':
+                mode = 'cash'
+            created_at = ts.strftime('%Y-%m-%d %H:%M:%S')
+
+            subtotal = gst_total = 0.0
+            seen = set()
+            for _ in range(n_lines):
+                pid, name, price, rate = catalog[popularity[pick_product()]]
+                if pid in seen:
+                    continue
+                seen.add(pid)
+                qty = rng.choice([1, 1, 1, 1, 2, 2, 3, 5])
+                base = price * qty
+                gst_amt = round(base * rate / 100, 2)
+                item_rows.append((invoice_id, pid, name, qty, price, 0.0, rate, gst_amt, round(base + gst_amt, 2)))
+                log_rows.append((pid, -qty, invoice_id, created_at))
+                subtotal += base
+                gst_total += gst_amt
+                line_id += 1
+
+            day_key = ts.strftime('%Y%m%d')
+            seq_by_day[day_key] = seq_by_day.get(day_key, 0) + 1
+            total = round(subtotal + gst_total, 2)
+            if mode == 'credit':
+                outstanding[customer_id] = outstanding.get(customer_id, 0.0) + total
+            inv_rows.append((invoice_id, f"INV-{day_key}-{seq_by_day[day_key]:04d}", customer_id,
+                             round(subtotal, 2), 0.0, round(gst_total / 2, 2), round(gst_total / 2, 2),
+                             total, mode, 'pending' if mode == 'credit' else 'paid', created_at))
+            if len(inv_rows) >= CHUNK:
+                flush()
+    flush()
+
+    with conn:
+        conn.executemany("UPDATE customers SET outstanding = ? WHERE id = ?",
+                         [(round(v, 2), k) for k, v in outstanding.items()])
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("ANALYZE")
+
+    stats = {
+        'products': products, 'customers': customers, 'invoices': invoice_id,
+        'invoice_lines': line_id, 'days': day_count, 'seed': seed,
+        'seconds': round(time.perf_counter() - started, 1),
+    }
+    print(f"Generated {invoice_id} invoices / {line_id} lines over {day_count} days "
+          f"in {stats['seconds']} s -> {db_path}")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic Smart POS database")
+    parser.add_argument('--db', default='bench.db')
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--customers', type=int, default=1000)
+    parser.add_argument('--lines', type=int, default=100000, help="approximate total invoice lines")
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--skew', type=float, default=1.1, help="Zipf exponent for product popularity")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--end-date', help="last trading day, YYYY-MM-DD (default: today)")
+    args = parser.parse_args(argv)
+    end_date = datetime.strptime(args.end_date, '%Y-%m-%d') if args.end_date else None
+    generate(args.db, args.products, args.customers, args.lines, args.days, args.skew, args.seed, end_date)
+
+
+if __name__ == '__main__':
+    main()
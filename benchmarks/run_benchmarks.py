@@ -0,0 +1,228 @@
+"""
+End-to-end benchmarks against a database built by generate_data.py.
+
+    python benchmarks/generate_data.py --db bench.db
+    python benchmarks/run_benchmarks.py --db bench.db --out results/base.json
+    python benchmarks/compare.py results/base.json results/new.json
+
+The source database is never modified: it is copied to a temporary file with
+the SQLite backup API and every benchmark (including invoice commit and day
+close) runs on the copy. Results record the git commit so runs taken on
+different commits can be compared.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import database.connection
+from database.connection import get_connection
+
+
+def measure(fn, repeat, warmup=1):
+    """Runs fn repeat times (after warmup runs) and returns timing stats in ms."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return {
+        'runs': repeat,
+        'median_ms': round(statistics.median(times), 3),
+        'p95_ms': round(times[min(len(times) - 1, int(len(times) * 0.95))], 3),
+        'min_ms': round(times[0], 3),
+        'max_ms': round(times[-1], 3),
+    }
+
+
+def git_info():
+    def git(*args):
+        try:
+            return subprocess.run(['git', *args], cwd=ROOT, capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {'commit': git('rev-parse', 'HEAD'), 'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))}
+
+
+def db_stats(conn):
+    return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ('products', 'customers', 'invoices', 'invoice_items', 'inventory_logs')}
+
+
+# ── Benchmarks ────────────────────────────────────────────────────────────
+def bench_scan_lookup(rng, repeat):
+    from services.inventory_service import find_product_by_barcode
+    barcodes = [r[0] for r in get_connection().execute(
+        "SELECT barcode FROM products WHERE barcode IS NOT NULL AND is_active = 1")]
+    return measure(lambda: find_product_by_barcode(rng.choice(barcodes)), repeat)
+
+
+def bench_cart_refresh(rng, repeat, cart_lines=25):
+    """Adding one item to a cart of cart_lines items and recomputing every total."""
+    from services.billing_service import BillingCart
+    rows = get_connection().execute("""
+        SELECT p.id, p.name, p.sell_price, COALESCE(g.rate, 0) as rate
+        FROM products p LEFT JOIN gst_rates g ON p.gst_rate_id = g.id
+        WHERE p.is_active = 1 LIMIT 500
+    """).fetchall()
+    cart = BillingCart()
+    for r in rng.sample(rows, min(cart_lines, len(rows))):
+        cart.add_item({'product_id': r['id'], 'name': r['name'], 'unit_price': r['sell_price'],
+                       'gst_rate': r['rate']})
+
+    def refresh():
+        r = rng.choice(rows)
+        cart.add_item({'product_id': r['id'], 'name': r['name'], 'unit_price': r['sell_price'],
+                       'gst_rate': r['rate']})
+        cart.calculate_totals()
+    return measure(refresh, repeat)
+
+
+def bench_invoice_commit(rng, repeat, lines=5):
+    from services.billing_service import BillingCart
+    from services.invoice_service import create_invoice
+    rows = get_connection().execute("SELECT id, name, sell_price FROM products WHERE is_active = 1 LIMIT 2000").fetchall()
+
+    def commit():
+        cart = BillingCart()
+        for r in rng.sample(rows, min(lines, len(rows))):
+            cart.add_item({'product_id': r['id'], 'name': r['name'], 'unit_price': r['sell_price'],
+                           'gst_rate': 5.0}, 1)
+        create_invoice(1, None, cart.calculate_totals(), 'cash')
+    return measure(commit, repeat)
+
+
+def bench_reports(day, repeat):
+    from services import report_service
+    start = (datetime.strptime(day, '%Y-%m-%d') - timedelta(days=29)).strftime('%Y-%m-%d')
+    return {
+        'report_daily_summary': measure(lambda: report_service.get_daily_summary(day), repeat),
+        'report_day_summary': measure(lambda: report_service.get_day_summary(day), repeat),
+        'report_product_sales_30d': measure(lambda: report_service.get_product_sales(start, day), repeat),
+        'report_gst_summary_30d': measure(lambda: report_service.get_gst_summary(start, day), repeat),
+        'report_invoice_register_30d': measure(lambda: report_service.get_invoice_register(start, day), repeat),
+    }
+
+
+def bench_day_close(day):
+    """One-shot: each day can only be closed once."""
+    from services.report_service import close_day
+    return measure(lambda: close_day(day, 1), 1, warmup=0)
+
+
+def bench_backup(tmpdir, repeat):
+    from services.backup_service import copy_database
+    dest = os.path.join(tmpdir, 'backup.db')
+
+    def backup():
+        if os.path.exists(dest):
+            os.remove(dest)
+        copy_database(dest)
+    return measure(backup, repeat, warmup=0)
+
+
+def bench_startup(db_path, repeat):
+    """Cold process start: the batch CLI, and importing the GUI up to the login screen."""
+    cli = [sys.executable, os.path.join(ROOT, 'smart_pos.py'), '--db', db_path, 'report', 'day']
+    gui = [sys.executable, '-c', 'import ui.main_window']
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    results = {'startup_cli_report': measure(
+        lambda: subprocess.run(cli, cwd=ROOT, capture_output=True, check=True), repeat, warmup=1)}
+    try:
+        results['startup_gui_import'] = measure(
+            lambda: subprocess.run(gui, cwd=ROOT, env=env, capture_output=True, check=True), repeat, warmup=1)
+    except subprocess.CalledProcessError:
+        print("Skipping GUI startup: PySide6 is not importable here.")
+    return results
+
+
+def run(db_path, repeat=50, seed=1, skip=()):
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        work_path = os.path.join(tmpdir, 'work.db')
+        src = sqlite3.connect(db_path)
+        dest = sqlite3.connect(work_path)
+        src.backup(dest)
+        src.close()
+        dest.close()
+
+        database.connection.set_db_path(work_path)
+        conn = get_connection()
+        last_day = conn.execute("SELECT date(MAX(created_at)) FROM invoices").fetchone()[0]
+        day = last_day or datetime.now().strftime('%Y-%m-%d')
+
+        results = {}
+        def section(name, fn):
+            if name in skip:
+                return
+            print(f"  {name}...", flush=True)
+            out = fn()
+            results.update(out if 'runs' not in out else {name: out})
+
+        section('scan_lookup', lambda: bench_scan_lookup(rng, repeat * 20))
+        section('cart_refresh', lambda: bench_cart_refresh(rng, repeat * 20))
+        section('reports', lambda: bench_reports(day, max(3, repeat // 10)))
+        section('invoice_commit', lambda: bench_invoice_commit(rng, repeat))
+        section('day_close', lambda: bench_day_close(day))
+        section('backup', lambda: bench_backup(tmpdir, 3))
+        section('startup', lambda: bench_startup(work_path, 5))
+
+        meta = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git': git_info(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'database': os.path.abspath(db_path),
+            'database_mb': round(os.path.getsize(db_path) / 2**20, 1),
+            'rows': db_stats(conn),
+            'report_day': day,
+        }
+        database.connection.set_db_path('smart_pos.db')
+    return {'meta': meta, 'results': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Smart POS benchmark suite")
+    parser.add_argument('--db', default='bench.db')
+    parser.add_argument('--out', help="JSON output file (default: benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--skip', nargs='*', default=[],
+                        choices=['scan_lookup', 'cart_refresh', 'reports', 'invoice_commit',
+                                 'day_close', 'backup', 'startup'])
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        parser.error(f"{args.db} not found; create it with benchmarks/generate_data.py")
+
+    report = run(args.db, args.repeat, skip=set(args.skip))
+    out = args.out
+    if not out:
+        commit = (report['meta']['git']['commit'] or 'nogit')[:8]
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        out = os.path.join(ROOT, 'benchmarks', 'results', f"{commit}-{stamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    for name, r in report['results'].items():
+        print(f"{name:32} median {r['median_ms']:10.3f} ms   p95 {r['p95_ms']:10.3f} ms")
+    print(f"Results written to {out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,19 @@
 import sqlite3
 import os
+from pathlib import Path
+
+DB_PATH = "smart_pos.db" # Database is stored in cwd unless set_db_path() is called
 
 _db_connection = None
 
+def set_db_path(path):
+    """Points the app (or a batch job) at another database file."""
+    global DB_PATH, _db_connection
+    if _db_connection is not None:
+        _db_connection.close()
+        _db_connection = None
+    DB_PATH = path
+
 def get_connection():
     """
     Returns a singleton SQLite connection with WAL journal mode
@@ -10,9 +21,7 @@ def get_connection():
     """
     global _db_connection
     if _db_connection is None:
-        db_path = "smart_pos.db" # Database is stored in cwd for now
-        
-        _db_connection = sqlite3.connect(db_path, check_same_thread=False)
+        _db_connection = sqlite3.connect(DB_PATH, check_same_thread=False)
         _db_connection.row_factory = sqlite3.Row
         
         # Enable foreign key support and WAL mode
@@ -20,3 +29,25 @@ def get_connection():
         _db_connection.execute("PRAGMA journal_mode = WAL;")
         
     return _db_connection
+
+def get_worker_connection():
+    """
+    Opens a new read-write connection for a worker thread that writes
+    (imports, derived data), so its transactions never interleave with the
+    UI thread's on the shared connection. The caller owns it and must close() it.
+    """
+    conn = sqlite3.connect(DB_PATH, timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON;")
+    return conn
+
+def get_read_connection():
+    """
+    Opens a new read-only connection for a worker thread (reports, exports).
+    In WAL mode it reads a consistent snapshot without blocking billing.
+    The caller owns it and must close() it.
+    """
+    uri = Path(os.path.abspath(DB_PATH)).as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    return conn
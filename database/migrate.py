@@ -0,0 +1,30 @@
+from database.migrations import (add_day_close, add_login_security, add_top_products,
+                                 add_low_stock_flag, add_report_indexes, add_gst_return_fields,
+                                 add_purchase_suggestions, add_stock_take,
+                                 add_stock_ledger, add_product_batches, add_price_lists,
+                                 add_purchases, add_customer_search, add_customer_totals)
+
+# Applied in order; every migration is idempotent and safe to re-run
+MIGRATIONS = [
+    add_day_close.run_migration,
+    add_login_security.run_migration,
+    add_top_products.run_migration,
+    add_low_stock_flag.run_migration,
+    add_report_indexes.run_migration,
+    add_gst_return_fields.run_migration,
+    add_purchase_suggestions.run_migration,
+    add_stock_take.run_migration,
+    add_stock_ledger.run_migration,
+    add_product_batches.run_migration,
+    add_price_lists.run_migration,
+    add_purchases.run_migration,
+    add_customer_search.run_migration,
+    add_customer_totals.run_migration,
+]
+
+def run_migrations():
+    for migration in MIGRATIONS:
+        migration()
+
+if __name__ == '__main__':
+    run_migrations()
@@ -0,0 +1,51 @@
+from database.connection import get_connection
+
+def run_migration():
+    conn = get_connection()
+    try:
+        with conn:
+            cursor = conn.cursor()
+
+            # Word-prefix search over name, phone and email. The index holds no copy of
+            # the text (content='customers'); the triggers keep it in step with the table
+            created = not cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'customers_fts'").fetchone()
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS customers_fts USING fts5(
+                    name, phone, email,
+                    content='customers', content_rowid='id', prefix='2 3'
+                )
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS customers_fts_insert AFTER INSERT ON customers BEGIN
+                    INSERT INTO customers_fts (rowid, name, phone, email)
+                    VALUES (new.id, new.name, new.phone, new.email);
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS customers_fts_delete AFTER DELETE ON customers BEGIN
+                    INSERT INTO customers_fts (customers_fts, rowid, name, phone, email)
+                    VALUES ('delete', old.id, old.name, old.phone, old.email);
+                END
+            ''')
+            # Dues and address changes don't touch the index
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS customers_fts_update AFTER UPDATE OF name, phone, email ON customers BEGIN
+                    INSERT INTO customers_fts (customers_fts, rowid, name, phone, email)
+                    VALUES ('delete', old.id, old.name, old.phone, old.email);
+                    INSERT INTO customers_fts (rowid, name, phone, email)
+                    VALUES (new.id, new.name, new.phone, new.email);
+                END
+            ''')
+            if created:
+                cursor.execute("INSERT INTO customers_fts (customers_fts) VALUES ('rebuild')")
+
+            # Alphabetical lists stop at the first page instead of sorting every customer;
+            # phone prefixes seek on the UNIQUE index the phone column already has
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_customers_name ON customers(name)")
+            print("Migration add_customer_search completed.")
+    except Exception as e:
+        print(f"Migration add_customer_search failed: {e}")
+
+if __name__ == '__main__':
+    run_migration()
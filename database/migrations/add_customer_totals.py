@@ -0,0 +1,51 @@
+from database.connection import get_connection
+
+def run_migration():
+    conn = get_connection()
+    try:
+        with conn:
+            cursor = conn.cursor()
+
+            # Customer count and dues for the customers screen's summary cards, kept by
+            # triggers so the unfiltered summary is one row read instead of a table scan
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS customer_totals (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    customers INTEGER NOT NULL,
+                    with_dues INTEGER NOT NULL,
+                    dues REAL NOT NULL
+                )
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS customer_totals_insert AFTER INSERT ON customers BEGIN
+                    UPDATE customer_totals SET customers = customers + 1,
+                        with_dues = with_dues + (COALESCE(new.outstanding, 0) > 0),
+                        dues = dues + COALESCE(new.outstanding, 0);
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS customer_totals_delete AFTER DELETE ON customers BEGIN
+                    UPDATE customer_totals SET customers = customers - 1,
+                        with_dues = with_dues - (COALESCE(old.outstanding, 0) > 0),
+                        dues = dues - COALESCE(old.outstanding, 0);
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS customer_totals_update AFTER UPDATE OF outstanding ON customers BEGIN
+                    UPDATE customer_totals SET
+                        with_dues = with_dues + (COALESCE(new.outstanding, 0) > 0) - (COALESCE(old.outstanding, 0) > 0),
+                        dues = dues + COALESCE(new.outstanding, 0) - COALESCE(old.outstanding, 0);
+                END
+            ''')
+            cursor.execute('''
+                INSERT OR IGNORE INTO customer_totals (id, customers, with_dues, dues)
+                SELECT 1, COUNT(*), TOTAL(outstanding > 0), TOTAL(outstanding) FROM customers
+            ''')
+            # "Who owes most" pages: matches the customers screen's Outstanding sort expression
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_customers_outstanding ON customers(COALESCE(outstanding, 0))")
+            print("Migration add_customer_totals completed.")
+    except Exception as e:
+        print(f"Migration add_customer_totals failed: {e}")
+
+if __name__ == '__main__':
+    run_migration()
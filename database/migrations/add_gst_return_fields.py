@@ -0,0 +1,45 @@
+from database.connection import get_connection
+
+def _columns(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [col['name'] for col in cursor.fetchall()]
+
+def run_migration():
+    conn = get_connection()
+    try:
+        with conn:
+            cursor = conn.cursor()
+            
+            if 'hsn_code' not in _columns(cursor, 'products'):
+                cursor.execute("ALTER TABLE products ADD COLUMN hsn_code TEXT")
+            if 'gstin' not in _columns(cursor, 'customers'):
+                cursor.execute("ALTER TABLE customers ADD COLUMN gstin TEXT")
+                
+            # Snapshots at time of sale, like product_name, so editing a product
+            # or customer later does not change a filed return
+            if 'hsn_code' not in _columns(cursor, 'invoice_items'):
+                cursor.execute("ALTER TABLE invoice_items ADD COLUMN hsn_code TEXT")
+                cursor.execute("""
+                    UPDATE invoice_items SET hsn_code = p.hsn_code
+                    FROM products p WHERE p.id = invoice_items.product_id AND p.hsn_code IS NOT NULL
+                """)
+            if 'customer_gstin' not in _columns(cursor, 'invoices'):
+                cursor.execute("ALTER TABLE invoices ADD COLUMN customer_gstin TEXT")
+                cursor.execute("""
+                    UPDATE invoices SET customer_gstin = c.gstin
+                    FROM customers c WHERE c.id = invoices.customer_id AND c.gstin IS NOT NULL
+                """)
+                
+            # GSTR-1 aggregates of each closed day, written by close_day
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS daily_gst_snapshots (
+                    close_date TEXT PRIMARY KEY,
+                    data TEXT NOT NULL
+                )
+            ''')
+            print("Migration add_gst_return_fields completed.")
+    except Exception as e:
+        print(f"Migration add_gst_return_fields failed: {e}")
+
+if __name__ == '__main__':
+    run_migration()
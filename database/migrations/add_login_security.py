@@ -0,0 +1,30 @@
+from database.connection import get_connection
+
+def run_migration():
+    conn = get_connection()
+    try:
+        with conn:
+            cursor = conn.cursor()
+            
+            # Short PIN used for cashier switching (pbkdf2 verifier, not bcrypt)
+            cursor.execute("PRAGMA table_info(users)")
+            columns = [col['name'] for col in cursor.fetchall()]
+            
+            if 'pin_hash' not in columns:
+                cursor.execute("ALTER TABLE users ADD COLUMN pin_hash TEXT")
+                
+            # Failed login counters survive restarts
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS login_attempts (
+                    username TEXT PRIMARY KEY,
+                    failed_count INTEGER DEFAULT 0,
+                    locked_until TEXT,
+                    last_failed_at TEXT
+                )
+            ''')
+            print("Migration add_login_security completed.")
+    except Exception as e:
+        print(f"Migration add_login_security failed: {e}")
+
+if __name__ == '__main__':
+    run_migration()
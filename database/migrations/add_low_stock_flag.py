@@ -0,0 +1,48 @@
+from database.connection import get_connection
+
+# Kept in step with stock/low_stock_qty/is_active by triggers, so low-stock
+# lookups read a small partial index instead of comparing two columns per row
+LOW_STOCK_EXPR = "CASE WHEN NEW.is_active = 1 AND NEW.stock <= NEW.low_stock_qty THEN 1 ELSE 0 END"
+
+def run_migration():
+    conn = get_connection()
+    try:
+        with conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("PRAGMA table_info(products)")
+            columns = [col['name'] for col in cursor.fetchall()]
+            
+            if 'is_low_stock' not in columns:
+                cursor.execute("ALTER TABLE products ADD COLUMN is_low_stock INTEGER NOT NULL DEFAULT 0")
+                cursor.execute("""
+                    UPDATE products SET is_low_stock =
+                        CASE WHEN is_active = 1 AND stock <= low_stock_qty THEN 1 ELSE 0 END
+                """)
+                
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_products_low_stock_insert
+                AFTER INSERT ON products
+                WHEN NEW.is_low_stock IS NOT {LOW_STOCK_EXPR}
+                BEGIN
+                    UPDATE products SET is_low_stock = {LOW_STOCK_EXPR} WHERE id = NEW.id;
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_products_low_stock_update
+                AFTER UPDATE OF stock, low_stock_qty, is_active ON products
+                WHEN NEW.is_low_stock IS NOT {LOW_STOCK_EXPR}
+                BEGIN
+                    UPDATE products SET is_low_stock = {LOW_STOCK_EXPR} WHERE id = NEW.id;
+                END
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_products_low_stock
+                ON products(is_low_stock) WHERE is_low_stock = 1
+            """)
+            print("Migration add_low_stock_flag completed.")
+    except Exception as e:
+        print(f"Migration add_low_stock_flag failed: {e}")
+
+if __name__ == '__main__':
+    run_migration()
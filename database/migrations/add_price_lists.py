@@ -0,0 +1,61 @@
+from database.connection import get_connection
+
+def run_migration():
+    conn = get_connection()
+    try:
+        with conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS price_lists (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    starts_at TEXT NOT NULL, -- 'YYYY-MM-DD HH:MM:SS', local time
+                    status TEXT NOT NULL DEFAULT 'scheduled', -- scheduled|applied|cancelled
+                    created_by INTEGER REFERENCES users(id),
+                    created_at TEXT DEFAULT (datetime('now','localtime')),
+                    applied_at TEXT,
+                    products_changed INTEGER
+                )
+            ''')
+            # The scheduler only ever looks for the next pending list
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_price_lists_due
+                ON price_lists(starts_at) WHERE status = 'scheduled'
+            ''')
+            
+            # NULL category / GST rate matches every product; the most specific rule wins
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS price_list_rules (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    price_list_id INTEGER NOT NULL REFERENCES price_lists(id),
+                    category_id INTEGER REFERENCES categories(id),
+                    gst_rate_id INTEGER REFERENCES gst_rates(id),
+                    kind TEXT NOT NULL, -- percent|markup|add
+                    value REAL NOT NULL,
+                    round_to REAL -- e.g. 0.5 or 1; NULL rounds to paise
+                )
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_price_list_rules_list ON price_list_rules(price_list_id)
+            ''')
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS price_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    product_id INTEGER NOT NULL REFERENCES products(id),
+                    price_list_id INTEGER REFERENCES price_lists(id),
+                    old_price REAL NOT NULL,
+                    new_price REAL NOT NULL,
+                    changed_at TEXT DEFAULT (datetime('now','localtime'))
+                )
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_price_history_product ON price_history(product_id, id)
+            ''')
+            print("Migration add_price_lists completed.")
+    except Exception as e:
+        print(f"Migration add_price_lists failed: {e}")
+
+if __name__ == '__main__':
+    run_migration()
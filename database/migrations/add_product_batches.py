@@ -0,0 +1,59 @@
+from database.connection import get_connection
+
+def run_migration():
+    conn = get_connection()
+    try:
+        with conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'product_batches'")
+            first_run = cursor.fetchone() is None
+            
+            # qty is what is left of the batch; expiry_date NULL = does not expire
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS product_batches (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    product_id INTEGER NOT NULL REFERENCES products(id),
+                    batch_no TEXT,
+                    expiry_date TEXT,
+                    qty REAL NOT NULL,
+                    received_qty REAL NOT NULL,
+                    cost_price REAL,
+                    received_at TEXT DEFAULT (datetime('now','localtime'))
+                )
+            ''')
+            
+            # FEFO order (dated batches first, earliest expiry, oldest batch) over
+            # batches with stock left; empty batches drop out of both indexes
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_batches_fefo
+                ON product_batches(product_id, expiry_date IS NULL, expiry_date, id)
+                WHERE qty > 0
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_batches_expiry
+                ON product_batches(expiry_date)
+                WHERE qty > 0
+            ''')
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS batch_allocations (
+                    invoice_id INTEGER NOT NULL REFERENCES invoices(id),
+                    batch_id INTEGER NOT NULL REFERENCES product_batches(id),
+                    qty REAL NOT NULL,
+                    PRIMARY KEY (invoice_id, batch_id)
+                ) WITHOUT ROWID
+            ''')
+            
+            if first_run:
+                # Stock on hand becomes one opening batch per product
+                cursor.execute('''
+                    INSERT INTO product_batches (product_id, batch_no, expiry_date, qty, received_qty, cost_price)
+                    SELECT id, 'OPENING', expiry_date, stock, stock, cost_price FROM products WHERE stock > 0
+                ''')
+            print("Migration add_product_batches completed.")
+    except Exception as e:
+        print(f"Migration add_product_batches failed: {e}")
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,24 @@
+from database.connection import get_connection
+
+def run_migration():
+    conn = get_connection()
+    try:
+        with conn:
+            cursor = conn.cursor()
+            
+            # Written in full by services.reorder_service.save_suggestions
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS purchase_suggestions (
+                    product_id INTEGER PRIMARY KEY REFERENCES products(id),
+                    velocity REAL NOT NULL,
+                    days_of_cover REAL,
+                    suggested_qty REAL NOT NULL,
+                    computed_at TEXT NOT NULL
+                )
+            ''')
+            print("Migration add_purchase_suggestions completed.")
+    except Exception as e:
+        print(f"Migration add_purchase_suggestions failed: {e}")
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,51 @@
+from database.connection import get_connection
+
+def _columns(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [col['name'] for col in cursor.fetchall()]
+
+def run_migration():
+    conn = get_connection()
+    try:
+        with conn:
+            cursor = conn.cursor()
+            
+            # Goods receipts (GRNs). freight and other charges are spread over the
+            # lines by value, so cost_price reflects the landed cost
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS purchases (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    supplier TEXT,
+                    invoice_no TEXT,
+                    invoice_date TEXT,
+                    freight REAL NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'draft', -- draft|posted|cancelled
+                    total_cost REAL, -- landed, set when posted
+                    created_by INTEGER REFERENCES users(id),
+                    created_at TEXT DEFAULT (datetime('now','localtime')),
+                    posted_by INTEGER REFERENCES users(id),
+                    posted_at TEXT
+                )
+            ''')
+            
+            # One line per product; scanning it again adds to qty
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS purchase_lines (
+                    purchase_id INTEGER NOT NULL REFERENCES purchases(id),
+                    product_id INTEGER NOT NULL REFERENCES products(id),
+                    qty REAL NOT NULL,
+                    unit_cost REAL NOT NULL,
+                    batch_no TEXT,
+                    expiry_date TEXT,
+                    PRIMARY KEY (purchase_id, product_id)
+                ) WITHOUT ROWID
+            ''')
+            
+            if 'purchase_id' not in _columns(cursor, 'inventory_logs'):
+                cursor.execute("ALTER TABLE inventory_logs ADD COLUMN purchase_id INTEGER REFERENCES purchases(id)")
+            print("Migration add_purchases completed.")
+    except Exception as e:
+        print(f"Migration add_purchases failed: {e}")
+
+if __name__ == '__main__':
+    run_migration()
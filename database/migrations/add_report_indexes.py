@@ -0,0 +1,21 @@
+from database.connection import get_connection
+
+def run_migration():
+    conn = get_connection()
+    try:
+        with conn:
+            cursor = conn.cursor()
+            
+            # Date-range reports seek on created_at, then fetch each invoice's lines
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoices_created_at ON invoices(created_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoice_items_invoice ON invoice_items(invoice_id)")
+            # Finds not-yet-closed invoices in a range (report cache closed-day check)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_invoices_open ON invoices(created_at) WHERE day_closed = 0
+            """)
+            print("Migration add_report_indexes completed.")
+    except Exception as e:
+        print(f"Migration add_report_indexes failed: {e}")
+
+if __name__ == '__main__':
+    run_migration()
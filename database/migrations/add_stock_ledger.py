@@ -0,0 +1,53 @@
+from database.connection import get_connection
+
+def run_migration():
+    conn = get_connection()
+    try:
+        with conn:
+            cursor = conn.cursor()
+            
+            # Range scans of one product's ledger tail: WHERE product_id = ? AND id > ?
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_inventory_logs_product
+                ON inventory_logs(product_id, id)
+            ''')
+            
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stock_checkpoints'")
+            first_run = cursor.fetchone() is None
+            
+            # qty = SUM(inventory_logs.change_qty) for the product over log ids <= log_id
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS stock_checkpoints (
+                    product_id INTEGER NOT NULL REFERENCES products(id),
+                    log_id INTEGER NOT NULL,
+                    qty REAL NOT NULL,
+                    created_at TEXT DEFAULT (datetime('now','localtime')),
+                    PRIMARY KEY (product_id, log_id)
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_stock_checkpoints_log
+                ON stock_checkpoints(log_id)
+            ''')
+            
+            if first_run:
+                # Stock that never went through the ledger (seed data, direct edits)
+                # becomes an opening balance, so the ledger and products.stock agree
+                cursor.execute('''
+                    INSERT INTO inventory_logs (product_id, change_qty, reason)
+                    SELECT p.id, p.stock - COALESCE(l.qty, 0), 'opening_balance'
+                    FROM products p
+                    LEFT JOIN (SELECT product_id, SUM(change_qty) as qty FROM inventory_logs GROUP BY product_id) l
+                           ON l.product_id = p.id
+                    WHERE ABS(p.stock - COALESCE(l.qty, 0)) > 1e-9
+                ''')
+                cursor.execute('''
+                    INSERT INTO stock_checkpoints (product_id, log_id, qty)
+                    SELECT id, (SELECT COALESCE(MAX(id), 0) FROM inventory_logs), stock FROM products
+                ''')
+            print("Migration add_stock_ledger completed.")
+    except Exception as e:
+        print(f"Migration add_stock_ledger failed: {e}")
+
+if __name__ == '__main__':
+    run_migration()
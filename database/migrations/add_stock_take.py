@@ -0,0 +1,38 @@
+from database.connection import get_connection
+
+def run_migration():
+    conn = get_connection()
+    try:
+        with conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS stock_takes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    status TEXT NOT NULL DEFAULT 'open', -- open|closed|cancelled
+                    note TEXT,
+                    started_by INTEGER REFERENCES users(id),
+                    started_at TEXT DEFAULT (datetime('now','localtime')),
+                    closed_by INTEGER REFERENCES users(id),
+                    closed_at TEXT
+                )
+            ''')
+            
+            # Staging for scanned counts. system_qty is products.stock at the first
+            # scan, so sales rung up after an item was counted don't show as variance
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS stock_take_counts (
+                    take_id INTEGER NOT NULL REFERENCES stock_takes(id),
+                    product_id INTEGER NOT NULL REFERENCES products(id),
+                    counted_qty REAL NOT NULL,
+                    system_qty REAL NOT NULL,
+                    counted_at TEXT DEFAULT (datetime('now','localtime')),
+                    PRIMARY KEY (take_id, product_id)
+                ) WITHOUT ROWID
+            ''')
+            print("Migration add_stock_take completed.")
+    except Exception as e:
+        print(f"Migration add_stock_take failed: {e}")
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,26 @@
+from database.connection import get_connection
+
+def run_migration():
+    conn = get_connection()
+    try:
+        with conn:
+            cursor = conn.cursor()
+            
+            # Top sellers of each closed day, written by close_day
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS daily_top_products (
+                    close_date TEXT NOT NULL,
+                    rank INTEGER NOT NULL,
+                    product_id INTEGER NOT NULL,
+                    name TEXT NOT NULL,
+                    qty_sold REAL NOT NULL,
+                    revenue REAL NOT NULL,
+                    PRIMARY KEY (close_date, rank)
+                ) WITHOUT ROWID
+            ''')
+            print("Migration add_top_products completed.")
+    except Exception as e:
+        print(f"Migration add_top_products failed: {e}")
+
+if __name__ == '__main__':
+    run_migration()
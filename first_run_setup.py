@@ -3,7 +3,7 @@ import sys
 from database.connection import get_connection
 from database.schema import create_tables
 from database.seed import seed_database
-from database.migrations.add_day_close import run_migration
+from database.migrate import run_migrations
 from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QFormLayout, QMessageBox
 from PySide6.QtCore import Qt
 
@@ -59,7 +59,7 @@ if __name__ == "__main__":
     conn = get_connection()
     create_tables(conn)
     seed_database()
-    run_migration()
+    run_migrations()
     
     app = QApplication(sys.argv)
     wizard = SetupWizard()
@@ -1,10 +1,32 @@
+import hashlib
+import hmac
+import os
+from datetime import datetime, timedelta
 import bcrypt
 from database.connection import get_connection
 from models.user import User
 
+MAX_FAILED_ATTEMPTS = 5
+LOCKOUT_MINUTES = 15
+PIN_ITERATIONS = 20000  # ~10 ms per check; lockout limits guessing
+
+def hash_pin(pin: str) -> str:
+    salt = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac('sha256', pin.encode('utf-8'), salt, PIN_ITERATIONS)
+    return f"pbkdf2_sha256${PIN_ITERATIONS}${salt.hex()}${digest.hex()}"
+
+def check_pin(pin: str, pin_hash: str) -> bool:
+    try:
+        _, iterations, salt_hex, digest_hex = pin_hash.split('$')
+        digest = hashlib.pbkdf2_hmac('sha256', pin.encode('utf-8'),
+                                     bytes.fromhex(salt_hex), int(iterations))
+    except (ValueError, AttributeError):
+        return False
+    return hmac.compare_digest(digest.hex(), digest_hex)
+
 class LoginForm:
-    def __init__(self):
-        self.failed_attempts = {}
+    # user_id -> (User, pin_hash), shared by all forms in the process
+    _pin_verifiers = None
 
     def validate(self, username, password):
         """
@@ -12,16 +34,29 @@ class LoginForm:
         Returns: User dataclass on success.
         Raises: ValueError with message on failure.
         """
-        # Check account lock simply in memory for this session
-        attempts = self.failed_attempts.get(username, 0)
-        if attempts >= 5:
-            raise ValueError("Account locked due to too many failed attempts.")
+        row = self.begin(username)
+        ok = self.check_password(row, password)
+        return self.complete(username, row, ok)
+
+    # The three steps of validate(). Only check_password is slow (bcrypt),
+    # and it does not touch the database, so it can run on a worker thread.
+    def begin(self, username):
+        """Checks the persistent lockout and loads the user row (may be None)."""
+        self._check_lock(username)
 
         conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT id, username, password, full_name, role, is_active FROM users WHERE username = ?", (username,))
         row = cursor.fetchone()
+        return dict(row) if row else None
+
+    @staticmethod
+    def check_password(row, password):
+        if not row:
+            return False
+        return bcrypt.checkpw(password.encode('utf-8'), row['password'].encode('utf-8'))
 
+    def complete(self, username, row, password_ok):
         if not row:
             self._record_failure(username)
             raise ValueError("Invalid username or password.")
@@ -29,13 +64,89 @@ class LoginForm:
         if not row['is_active']:
             raise ValueError("Account is disabled.")
 
-        hashed_pw = row['password'].encode('utf-8')
-        if not bcrypt.checkpw(password.encode('utf-8'), hashed_pw):
+        if not password_ok:
             self._record_failure(username)
             raise ValueError("Invalid username or password.")
 
         # Success - reset attempts
-        self.failed_attempts[username] = 0
+        self._reset_failures(username)
+        return self._to_user(row)
+
+    # ── Cashier switching ────────────────────────────────────────────────
+    def get_switchable_users(self):
+        """Active users who have a PIN set."""
+        return [user for user, _ in self._load_pin_verifiers().values()]
+
+    def verify_pin(self, user_id, pin):
+        """Fast re-authentication for shift handover. Returns User or raises ValueError."""
+        entry = self._load_pin_verifiers().get(user_id)
+        if not entry:
+            raise ValueError("No PIN set for this user.")
+        user, pin_hash = entry
+        self._check_lock(user.username)
+        if not check_pin(pin, pin_hash):
+            self._record_failure(user.username)
+            raise ValueError("Incorrect PIN.")
+        self._reset_failures(user.username)
+        return user
+
+    def set_pin(self, user_id, pin):
+        if not (pin.isdigit() and 4 <= len(pin) <= 6):
+            raise ValueError("PIN must be 4 to 6 digits.")
+        conn = get_connection()
+        with conn:
+            conn.execute("UPDATE users SET pin_hash = ? WHERE id = ?", (hash_pin(pin), user_id))
+        LoginForm._pin_verifiers = None
+
+    @classmethod
+    def clear_pin_cache(cls):
+        cls._pin_verifiers = None
+
+    @classmethod
+    def _load_pin_verifiers(cls):
+        if cls._pin_verifiers is None:
+            conn = get_connection()
+            rows = conn.execute("""
+                SELECT id, username, full_name, role, is_active, pin_hash FROM users
+                WHERE is_active = 1 AND pin_hash IS NOT NULL ORDER BY full_name
+            """).fetchall()
+            cls._pin_verifiers = {r['id']: (cls._to_user(r), r['pin_hash']) for r in rows}
+        return cls._pin_verifiers
+
+    # ── Lockout ──────────────────────────────────────────────────────────
+    def _check_lock(self, username):
+        conn = get_connection()
+        row = conn.execute("SELECT locked_until FROM login_attempts WHERE username = ?",
+                           (username,)).fetchone()
+        if not row or not row['locked_until']:
+            return
+        if row['locked_until'] > datetime.now().isoformat(timespec='seconds'):
+            until = row['locked_until'][11:16]
+            raise ValueError(f"Account locked due to too many failed attempts. Try again after {until}.")
+        # Lock expired - start counting again
+        self._reset_failures(username)
+
+    def _record_failure(self, username):
+        now = datetime.now()
+        locked_until = (now + timedelta(minutes=LOCKOUT_MINUTES)).isoformat(timespec='seconds')
+        conn = get_connection()
+        with conn:
+            conn.execute("""
+                INSERT INTO login_attempts (username, failed_count, last_failed_at)
+                VALUES (?, 1, ?)
+                ON CONFLICT(username) DO UPDATE SET
+                    failed_count = failed_count + 1,
+                    last_failed_at = excluded.last_failed_at,
+                    locked_until = CASE WHEN failed_count + 1 >= ? THEN ? ELSE locked_until END
+            """, (username, now.isoformat(timespec='seconds'), MAX_FAILED_ATTEMPTS, locked_until))
+
+    def _reset_failures(self, username):
+        conn = get_connection()
+        with conn:
+            conn.execute("DELETE FROM login_attempts WHERE username = ?", (username,))
+
+    @staticmethod
+    def _to_user(row):
         return User(
             id=row['id'],
             username=row['username'],
@@ -43,6 +154,3 @@ class LoginForm:
             role=row['role'],
             is_active=bool(row['is_active'])
         )
-
-    def _record_failure(self, username):
-        self.failed_attempts[username] = self.failed_attempts.get(username, 0) + 1
@@ -1,7 +1,13 @@
 import sys
 import os
+import multiprocessing
+from utils import startup_profile
+startup_profile.install()
+
 from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QTimer
 from ui.main_window import MainWindow
+from database.migrate import run_migrations
 
 def load_stylesheet(app):
     qss_path = os.path.join(os.path.dirname(__file__), "ui", "styles", "main.qss")
@@ -17,11 +23,14 @@ def main():
     app.setApplicationName("Smart POS")
     
     load_stylesheet(app)
+    run_migrations()
 
     window = MainWindow()
     window.show()
+    QTimer.singleShot(0, lambda: startup_profile.mark('login_shown'))
 
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support() # label rendering starts worker processes; needed in a frozen build
     main()
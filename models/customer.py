@@ -9,3 +9,4 @@ class Customer:
     address: str
     outstanding: float
     created_at: str
+    gstin: str = None
@@ -15,3 +15,4 @@ class Product:
     low_stock_qty: float
     expiry_date: str
     is_active: bool
+    hsn_code: str = None
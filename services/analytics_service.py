@@ -0,0 +1,134 @@
+# services/analytics_service.py
+# Multi-month product analytics, one worker process per month shard
+
+import os
+import heapq
+from datetime import date, timedelta
+from concurrent.futures import ProcessPoolExecutor
+import database.connection
+from database.connection import get_read_connection
+
+
+def month_shards(start_date, end_date):
+    """[(start, end)] per calendar month, clipped to the range (inclusive ISO dates)."""
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    if start > end:
+        raise ValueError("Start date is after end date.")
+    shards = []
+    while start <= end:
+        next_month = (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        shard_end = min(end, next_month - timedelta(days=1))
+        shards.append((start.isoformat(), shard_end.isoformat()))
+        start = next_month
+    return shards
+
+
+def _product_shard(start_date, end_date):
+    """Runs in a worker process: per-product sums and invoice totals for one shard."""
+    from services.report_service import day_bounds
+    conn = get_read_connection()
+    try:
+        bounds = day_bounds(start_date, end_date)
+        products = conn.execute("""
+            SELECT ii.product_id, MAX(ii.product_name), SUM(ii.qty), SUM(ii.line_total),
+                   COUNT(*), COUNT(DISTINCT ii.invoice_id)
+            FROM invoices i
+            JOIN invoice_items ii ON ii.invoice_id = i.id
+            WHERE i.created_at >= ? AND i.created_at < ?
+            GROUP BY ii.product_id
+        """, bounds).fetchall()
+        invoices, revenue = conn.execute("""
+            SELECT COUNT(*), COALESCE(SUM(total), 0) FROM invoices
+            WHERE created_at >= ? AND created_at < ?
+        """, bounds).fetchone()
+        # Plain tuples: results are pickled back to the parent process
+        return {'start': start_date, 'end': end_date, 'invoices': invoices, 'revenue': revenue,
+                'products': [tuple(r) for r in products]}
+    finally:
+        conn.close()
+
+
+def _init_worker(db_path):
+    # Only point the worker at the file: closing a connection inherited
+    # through fork could release the parent's locks
+    database.connection.DB_PATH = db_path
+
+
+def run_shards(shards, workers=None):
+    """Aggregates every (start, end) shard, in parallel when there is more than one."""
+    workers = min(workers or os.cpu_count() or 1, len(shards))
+    if workers <= 1:
+        return [_product_shard(s, e) for s, e in shards]
+    db_path = os.path.abspath(database.connection.DB_PATH)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(db_path,)) as pool:
+        return list(pool.map(_product_shard, *zip(*shards)))
+
+
+def merge_shards(partials, k=20):
+    """
+    Merges shard results into {totals, by_month, top_products, product_count}; k=None keeps all.
+    Shards carry full per-product sums, so top-K is taken only after merging.
+    """
+    products = {}  # product_id -> [name, qty, revenue, lines, invoices]
+    by_month = {}
+    for part in partials:
+        month = by_month.setdefault(part['start'][:7], {'month': part['start'][:7], 'invoices': 0,
+                                                         'revenue': 0.0, 'qty': 0.0})
+        month['invoices'] += part['invoices']
+        month['revenue'] += part['revenue']
+        for product_id, name, qty, revenue, lines, invoices in part['products']:
+            entry = products.get(product_id)
+            if entry is None:
+                products[product_id] = [name, qty, revenue, lines, invoices]
+            else:
+                entry[1] += qty
+                entry[2] += revenue
+                entry[3] += lines
+                entry[4] += invoices # an invoice lies in exactly one shard
+            month['qty'] += qty
+
+    totals = {'invoices': sum(m['invoices'] for m in by_month.values()),
+              'revenue': round(sum(m['revenue'] for m in by_month.values()), 2)}
+    top = heapq.nlargest(k or len(products), products.items(), key=lambda kv: (kv[1][2], kv[1][1]))
+    return {
+        'totals': totals,
+        'by_month': [dict(m, revenue=round(m['revenue'], 2)) for m in by_month.values()],
+        'top_products': [{'product_id': pid, 'name': name, 'qty_sold': qty, 'revenue': round(revenue, 2),
+                          'lines': lines, 'invoices': invoices}
+                         for pid, (name, qty, revenue, lines, invoices) in top],
+        'product_count': len(products),
+    }
+
+
+def product_analytics(start_date, end_date, k=20, workers=None):
+    """Top k products by revenue plus monthly totals over the range."""
+    return merge_shards(run_shards(month_shards(start_date, end_date), workers), k)
+
+
+def year_over_year(start_date, end_date, k=20, workers=None):
+    """
+    product_analytics for the range and for the same dates a year earlier, run
+    on one pool. Each top product gets its previous revenue and growth in %.
+    """
+    current = month_shards(start_date, end_date)
+    previous = month_shards(_year_earlier(start_date), _year_earlier(end_date))
+    partials = run_shards(current + previous, workers)
+    now = merge_shards(partials[:len(current)], k)
+    before = merge_shards(partials[len(current):], k=None)
+
+    before_revenue = {p['product_id']: p['revenue'] for p in before['top_products']}
+    for p in now['top_products']:
+        prev = before_revenue.get(p['product_id'], 0.0)
+        p['prev_revenue'] = prev
+        p['growth_pct'] = round((p['revenue'] - prev) / prev * 100, 1) if prev else None
+    now['prev_totals'] = before['totals']
+    return now
+
+
+def _year_earlier(iso_day):
+    d = date.fromisoformat(iso_day)
+    try:
+        return d.replace(year=d.year - 1).isoformat()
+    except ValueError:
+        return d.replace(year=d.year - 1, day=28).isoformat() # 29 Feb
@@ -1,7 +1,8 @@
 import os
-import shutil
 import ctypes
+import sqlite3
 from datetime import datetime
+import database.connection
 from database.connection import get_connection
 
 def get_last_backup_date():
@@ -37,6 +38,17 @@ def check_backup_reminder():
         return True
     return False
 
+def copy_database(dest_path):
+    """
+    Copies the live database with SQLite's online backup API, so pages still
+    in the WAL are included and the app can keep billing during a backup.
+    """
+    dest = sqlite3.connect(dest_path)
+    try:
+        get_connection().backup(dest)
+    finally:
+        dest.close()
+
 def get_usb_drives():
     drives = []
     bitmask = ctypes.windll.kernel32.GetLogicalDrives()
@@ -61,11 +73,11 @@ def backup_to_usb():
         os.makedirs(backup_folder)
         
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    db_path = "smart_pos.db"
+    db_path = database.connection.DB_PATH
     dest_path = os.path.join(backup_folder, f"smart_pos_backup_{timestamp}.db")
     
     if os.path.exists(db_path):
-        shutil.copy2(db_path, dest_path)
+        copy_database(dest_path)
         update_last_backup_date()
         return dest_path
     else:
@@ -76,11 +88,11 @@ def backup_to_local(folder):
         raise Exception(f"Folder does not exist: {folder}")
         
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    db_path = "smart_pos.db"
+    db_path = database.connection.DB_PATH
     dest_path = os.path.join(folder, f"smart_pos_backup_{timestamp}.db")
     
     if os.path.exists(db_path):
-        shutil.copy2(db_path, dest_path)
+        copy_database(dest_path)
         update_last_backup_date()
         return dest_path
     else:
@@ -0,0 +1,93 @@
+# services/batch_service.py
+# Per-batch stock and expiry; stock leaves batches first-expiry-first-out through idx_batches_fefo
+
+from datetime import date, timedelta
+from database.connection import get_connection
+
+# One index seek: the product's next batch in FEFO order
+_NEXT_BATCH = """
+    SELECT id, qty FROM product_batches
+    WHERE product_id = ? AND qty > 0
+    ORDER BY expiry_date IS NULL, expiry_date, id
+    LIMIT 1
+"""
+
+def add_batch(cursor, product_id: int, qty: float, expiry_date: str = None, batch_no: str = None,
+              cost_price: float = None) -> int:
+    """Inserts a batch in the caller's transaction; products.stock and logs are the caller's."""
+    cursor.execute("""
+        INSERT INTO product_batches (product_id, batch_no, expiry_date, qty, received_qty, cost_price)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (product_id, batch_no or None, expiry_date or None, qty, qty, cost_price))
+    return cursor.lastrowid
+
+def consume_fefo(cursor, product_id: int, qty: float, invoice_id: int = None) -> float:
+    """
+    Takes qty out of the product's batches, earliest expiry first, in the
+    caller's transaction; with invoice_id the split is kept in
+    batch_allocations. Returns the part no batch covered.
+    """
+    while qty > 1e-9:
+        row = cursor.execute(_NEXT_BATCH, (product_id,)).fetchone()
+        if not row:
+            break
+        batch_id, available = row
+        take = min(qty, available)
+        cursor.execute("UPDATE product_batches SET qty = ROUND(qty - ?, 6) WHERE id = ?", (take, batch_id))
+        if invoice_id is not None:
+            cursor.execute("""
+                INSERT INTO batch_allocations (invoice_id, batch_id, qty) VALUES (?, ?, ?)
+                ON CONFLICT(invoice_id, batch_id) DO UPDATE SET qty = qty + excluded.qty
+            """, (invoice_id, batch_id, take))
+        qty = round(qty - take, 6)
+    return max(qty, 0.0)
+
+def receive_batch(product_id: int, qty: float, expiry_date: str = None, batch_no: str = None,
+                  cost_price: float = None, user_id: int = None) -> int:
+    """Books qty into stock as a new batch, logged as a purchase. Returns the batch id."""
+    from services.inventory_service import get_low_stock_flags, publish_stock_changes
+    if qty <= 0:
+        raise ValueError("Received quantity must be positive.")
+    low_before = get_low_stock_flags([product_id])
+    conn = get_connection()
+    with conn:
+        cursor = conn.cursor()
+        batch_id = add_batch(cursor, product_id, qty, expiry_date, batch_no, cost_price)
+        cursor.execute("UPDATE products SET stock = stock + ? WHERE id = ?", (qty, product_id))
+        cursor.execute("""
+            INSERT INTO inventory_logs (product_id, change_qty, reason, user_id) VALUES (?, ?, 'purchase', ?)
+        """, (product_id, qty, user_id))
+    publish_stock_changes([product_id], low_before)
+    return batch_id
+
+def get_batches(product_id: int):
+    """Batches with stock left, in the order sales will take them."""
+    rows = get_connection().execute("""
+        SELECT id, batch_no, expiry_date, qty, received_qty, cost_price, received_at
+        FROM product_batches
+        WHERE product_id = ? AND qty > 0
+        ORDER BY expiry_date IS NULL, expiry_date, id
+    """, (product_id,)).fetchall()
+    return [dict(r) for r in rows]
+
+def _expiry_query(where, params, limit):
+    rows = get_connection().execute(f"""
+        SELECT b.id as batch_id, b.product_id, p.name, b.batch_no, b.expiry_date, b.qty,
+               ROUND(b.qty * COALESCE(b.cost_price, p.cost_price), 2) as stock_value
+        FROM product_batches b
+        JOIN products p ON p.id = b.product_id
+        WHERE b.qty > 0 AND {where}
+        ORDER BY b.expiry_date
+        LIMIT ?
+    """, (*params, limit if limit is not None else -1)).fetchall()
+    return [dict(r) for r in rows]
+
+def get_expiring_batches(days: int = 30, as_of: str = None, limit: int = 500):
+    """Batches expiring within days of as_of (default today), soonest first."""
+    start = date.fromisoformat(as_of) if as_of else date.today()
+    return _expiry_query("b.expiry_date >= ? AND b.expiry_date <= ?",
+                         (start.isoformat(), (start + timedelta(days=days)).isoformat()), limit)
+
+def get_expired_batches(as_of: str = None, limit: int = 500):
+    """Batches past their expiry date that still hold stock."""
+    return _expiry_query("b.expiry_date < ?", ((as_of or date.today().isoformat()),), limit)
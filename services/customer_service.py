@@ -1,9 +1,16 @@
+import re
 import sqlite3
+import threading
+from collections import OrderedDict
 from typing import List, Optional, Dict
 from models.customer import Customer
 from database.connection import get_connection
+from services import event_bus
 from dataclasses import dataclass
 
+# 2-digit state code, PAN, entity number, 'Z', check character
+GSTIN_PATTERN = re.compile(r'^\d{2}[A-Z]{5}\d{4}[A-Z][1-9A-Z]Z[0-9A-Z]$')
+
 @dataclass
 class InvoiceSummary:
     id: int
@@ -13,25 +20,128 @@ class InvoiceSummary:
     created_at: str
 
 def get_all_customers(search: Optional[str] = None) -> List[Customer]:
-    conn = get_connection()
-    cursor = conn.cursor()
-    
     if search:
-        query = """
-            SELECT * FROM customers 
-            WHERE name LIKE ? OR phone LIKE ? 
-            ORDER BY name ASC
-        """
-        like_search = f"%{search}%"
-        cursor.execute(query, (like_search, like_search))
+        return search_customers(search, limit=None)
+    conn = get_connection()
+    rows = conn.execute("SELECT * FROM customers ORDER BY name ASC").fetchall()
+    return [Customer(**dict(row)) for row in rows]
+
+# Identity map: one Customer instance per id, dropped when a credit bill or a
+# dues payment changes the customer's outstanding balance. Holds the most
+# recently used CACHED_CUSTOMERS, so browsing a large customer list can't grow it
+CACHED_CUSTOMERS = 500
+_customers = OrderedDict()
+_subscribed = False
+_lock = threading.Lock()
+
+def get_customer(customer_id: int) -> Optional[Customer]:
+    global _subscribed
+    with _lock:
+        if not _subscribed:
+            event_bus.subscribe(event_bus.INVOICE_COMMITTED, _on_invoice_committed)
+            event_bus.subscribe(event_bus.DUES_SETTLED, _on_dues_settled)
+            _subscribed = True
+        customer = _customers.get(customer_id)
+        if customer is not None:
+            _customers.move_to_end(customer_id)
+            return customer
+    row = get_connection().execute("SELECT * FROM customers WHERE id = ?", (customer_id,)).fetchone()
+    if not row:
+        return None
+    with _lock:
+        customer = _customers.setdefault(customer_id, Customer(**dict(row)))
+        while len(_customers) > CACHED_CUSTOMERS:
+            _customers.popitem(last=False)
+        return customer
+
+def forget_customer(customer_id: int):
+    """Drops a cached customer after its row is changed outside this module."""
+    with _lock:
+        _customers.pop(customer_id, None)
+
+def _on_invoice_committed(event, invoice):
+    if invoice.customer_id is not None:
+        forget_customer(invoice.customer_id)
+
+def _on_dues_settled(event, customer_id, amount):
+    forget_customer(customer_id)
+
+def reset():
+    """Empties the identity map and unsubscribes; the next get_customer() starts afresh."""
+    global _subscribed
+    with _lock:
+        event_bus.unsubscribe(event_bus.INVOICE_COMMITTED, _on_invoice_committed)
+        event_bus.unsubscribe(event_bus.DUES_SETTLED, _on_dues_settled)
+        _customers.clear()
+        _subscribed = False
+
+def customer_filter(search: Optional[str], conn=None):
+    """
+    (WHERE conditions, params) for the customers a search box matches, the
+    same ones search_customers() finds.
+    """
+    where, params, _ = _search_filter(search, conn or get_connection())
+    return where, params
+
+def _search_filter(search, conn):
+    """
+    (WHERE conditions, params, ORDER BY): a number finds phones starting with
+    it, in phone order; words, or a number no phone starts with, find word
+    prefixes of name, phone and email, by name.
+    """
+    text = (search or '').strip()
+    if not text:
+        return [], [], "name"
+    digits = _phone_prefix(text)
+    # ':' sorts just after '9', so this is a range seek on the phone index
+    if digits and conn.execute("SELECT 1 FROM customers WHERE phone >= ? AND phone < ? LIMIT 1",
+                               (digits, digits + ':')).fetchone():
+        return ["phone >= ? AND phone < ?"], [digits, digits + ':'], "phone"
+    query = _match_query(text)
+    if not query:
+        return ["0"], [], "name"
+    return ["id IN (SELECT rowid FROM customers_fts WHERE customers_fts MATCH ?)"], [query], "name"
+
+def get_customer_summary(search: Optional[str] = None) -> Dict[str, float]:
+    """{customers, with_dues, dues} over the customers the search matches (all by default)."""
+    conn = get_connection()
+    where, params = customer_filter(search, conn)
+    if where:
+        row = conn.execute(f"""
+            SELECT COUNT(*) as customers, TOTAL(outstanding > 0) as with_dues, TOTAL(outstanding) as dues
+            FROM customers WHERE {' AND '.join(where)}
+        """, params).fetchone()
     else:
-        query = "SELECT * FROM customers ORDER BY name ASC"
-        cursor.execute(query)
-        
-    rows = cursor.fetchall()
+        row = conn.execute("SELECT customers, with_dues, dues FROM customer_totals").fetchone()
+    return {'customers': int(row['customers']), 'with_dues': int(row['with_dues']), 'dues': round(row['dues'], 2)}
+
+def _phone_prefix(text: str) -> Optional[str]:
+    digits = re.sub(r'[\s()-]', '', text)
+    return digits if digits.lstrip('+').isdigit() else None
+
+def _match_query(text: str) -> str:
+    # Every word must start some word of the name, phone or email: 'ram ku' -> "ram"* "ku"*
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+def search_customers(text: Optional[str] = None, limit: Optional[int] = 50) -> List[Customer]:
+    """
+    A number finds phones starting with it (in phone order); words find
+    customers by the starts of their name, phone or email words (by name).
+    No text lists customers by name. limit=None returns every match.
+    """
+    conn = get_connection()
+    where, params, order = _search_filter(text, conn)
+    rows = conn.execute(f"""
+        SELECT * FROM customers {'WHERE ' + ' AND '.join(where) if where else ''}
+        ORDER BY {order} LIMIT ?
+    """, [*params, -1 if limit is None else int(limit)]).fetchall()
     return [Customer(**dict(row)) for row in rows]
 
-def add_customer(name: str, phone: str, email: str = '', address: str = '') -> Customer:
+def add_customer(name: str, phone: str, email: str = '', address: str = '',
+                 gstin: str = None) -> Customer:
+    gstin = (gstin or '').strip().upper() or None
+    if gstin and not GSTIN_PATTERN.match(gstin):
+        raise ValueError(f"'{gstin}' is not a valid GSTIN.")
     conn = get_connection()
     try:
         with conn:
@@ -44,9 +154,9 @@ def add_customer(name: str, phone: str, email: str = '', address: str = '') -> C
                     raise ValueError(f"Customer with phone '{phone}' already exists.")
             
             cursor.execute("""
-                INSERT INTO customers (name, phone, email, address)
-                VALUES (?, ?, ?, ?)
-            """, (name, phone, email, address))
+                INSERT INTO customers (name, phone, email, address, gstin)
+                VALUES (?, ?, ?, ?, ?)
+            """, (name, phone, email, address, gstin))
             
             customer_id = cursor.lastrowid
             
@@ -111,3 +221,4 @@ def settle_dues(customer_id: int, amount: float, user_id: int) -> None:
             """, (customer_id, amount, user_id, f"Settled {amount} dues"))
     except Exception as e:
         raise ValueError(f"Failed to settle dues: {str(e)}")
+    event_bus.publish(event_bus.DUES_SETTLED, customer_id=customer_id, amount=amount)
@@ -0,0 +1,42 @@
+# services/event_bus.py
+# In-process publish/subscribe for data changes; Qt code subscribes through ui.event_bridge
+
+import threading
+
+# Event names and their keyword payloads
+INVOICE_COMMITTED = 'invoice_committed'  # invoice: models.invoice.Invoice
+STOCK_CHANGED = 'stock_changed'          # changes: [{id, name, stock, low_stock_qty, is_active, is_low_stock}]
+LOW_STOCK_CHANGED = 'low_stock_changed'  # products: same dicts, only those that crossed the threshold
+DUES_SETTLED = 'dues_settled'            # customer_id, amount
+PRICES_CHANGED = 'prices_changed'        # price_list_id, products (number repriced)
+
+_subscribers = {}  # event -> [callback(event, **payload)]
+_lock = threading.Lock()
+
+
+def subscribe(event, callback):
+    with _lock:
+        _subscribers.setdefault(event, []).append(callback)
+
+
+def unsubscribe(event, callback):
+    with _lock:
+        callbacks = _subscribers.get(event, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+
+def publish(event, **payload):
+    """Calls every subscriber. A failing subscriber never fails the publisher."""
+    with _lock:
+        callbacks = list(_subscribers.get(event, ()))
+    for callback in callbacks:
+        try:
+            callback(event, **payload)
+        except Exception as e:
+            print(f"Event handler error ({event}): {e}")
+
+
+def clear():
+    with _lock:
+        _subscribers.clear()
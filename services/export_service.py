@@ -0,0 +1,146 @@
+# services/export_service.py
+# Streaming CSV / gzip CSV / XLSX exports read with fetchmany(), run by ReportWorker
+
+import os
+import csv
+import gzip
+import time
+from database.connection import get_connection
+
+BATCH_SIZE = 2000
+XLSX_MAX_ROWS = 1048575  # Excel's sheet limit minus the header row
+
+# name -> (label, query, takes a date range)
+DATASETS = {
+    'invoice_lines': ("Invoice lines", """
+        SELECT i.invoice_number, i.created_at, i.payment_mode, ii.product_id, ii.product_name,
+               ii.qty, ii.unit_price, ii.discount, ii.gst_rate, ii.gst_amt, ii.line_total
+        FROM invoices i
+        JOIN invoice_items ii ON ii.invoice_id = i.id
+        WHERE i.created_at >= ? AND i.created_at < ?
+        ORDER BY i.created_at
+    """, True),
+    'invoices': ("Invoices", """
+        SELECT i.invoice_number, i.created_at, c.name as customer, i.subtotal, i.discount_amt,
+               i.cgst_amt, i.sgst_amt, i.total, i.payment_mode, i.payment_status
+        FROM invoices i
+        LEFT JOIN customers c ON i.customer_id = c.id
+        WHERE i.created_at >= ? AND i.created_at < ?
+        ORDER BY i.created_at
+    """, True),
+    'products': ("Products", """
+        SELECT id, name, sku, barcode, unit, cost_price, sell_price, stock, low_stock_qty, expiry_date
+        FROM products WHERE is_active = 1 ORDER BY id
+    """, False),
+    'customers': ("Customers", """
+        SELECT id, name, phone, email, address, outstanding, created_at
+        FROM customers ORDER BY id
+    """, False),
+}
+
+
+def export_format(path):
+    lower = path.lower()
+    if lower.endswith('.csv.gz'):
+        return 'csv.gz'
+    if lower.endswith('.xlsx'):
+        return 'xlsx'
+    if lower.endswith('.csv'):
+        return 'csv'
+    raise ValueError("Export file must end in .csv, .csv.gz or .xlsx")
+
+
+def iter_export(dataset, path, start_date=None, end_date=None, conn=None):
+    """
+    Streams dataset to path. Yields (rows_written, 0, stats) after every batch;
+    the last yield's stats are the final {rows, seconds, rows_per_sec, path}.
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown export '{dataset}'.")
+    _, query, dated = DATASETS[dataset]
+    params = ()
+    if dated:
+        from services.report_service import day_bounds
+        if not (start_date and end_date):
+            raise ValueError("This export needs a date range.")
+        params = day_bounds(start_date, end_date)
+
+    conn = conn or get_connection()
+    cursor = conn.execute(query, params)
+    columns = [d[0] for d in cursor.description]
+    yield from iter_write(path, columns, _batches(cursor))
+
+
+def iter_write(path, columns, batches):
+    """Writes batches (lists of row tuples) to path; yields progress like iter_export."""
+    fmt = export_format(path)
+    tmp_path = path + '.part'
+    started = time.perf_counter()
+    rows = 0
+    complete = False
+
+    def stats():
+        seconds = time.perf_counter() - started
+        return {'rows': rows, 'seconds': round(seconds, 2),
+                'rows_per_sec': int(rows / seconds) if seconds > 0 else 0, 'path': path}
+
+    try:
+        if fmt == 'xlsx':
+            from openpyxl import Workbook
+            wb = Workbook(write_only=True)
+            ws, sheet_rows = None, XLSX_MAX_ROWS
+            for batch in batches:
+                for row in batch:
+                    if sheet_rows >= XLSX_MAX_ROWS:
+                        # A year of lines can exceed one sheet; continue on the next
+                        ws = wb.create_sheet(f"Sheet{len(wb.worksheets) + 1}")
+                        ws.append(columns)
+                        sheet_rows = 0
+                    ws.append(row)
+                    sheet_rows += 1
+                rows += len(batch)
+                yield rows, 0, stats()
+            if ws is None:
+                wb.create_sheet("Sheet1").append(columns)
+            wb.save(tmp_path)
+        else:
+            opener = gzip.open if fmt == 'csv.gz' else open
+            with opener(tmp_path, 'wt', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                for batch in batches:
+                    writer.writerows(batch)
+                    rows += len(batch)
+                    yield rows, 0, stats()
+        os.replace(tmp_path, path)
+        complete = True
+        yield rows, 0, stats()
+    finally:
+        # Cancelled (generator closed) or failed: don't leave a partial file behind
+        if not complete and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def export(dataset, path, start_date=None, end_date=None, conn=None):
+    """Runs iter_export to completion and returns its stats."""
+    result = None
+    for _, _, result in iter_export(dataset, path, start_date, end_date, conn):
+        pass
+    return result
+
+
+def export_rows(rows, path):
+    """Exports an already built list of dicts (small report tables)."""
+    columns = list(rows[0].keys()) if rows else []
+    result = None
+    for _, _, result in iter_write(path, columns, [[tuple(r[c] for c in columns) for r in rows]]):
+        pass
+    return result
+
+
+def _batches(cursor):
+    while True:
+        batch = cursor.fetchmany(BATCH_SIZE)
+        if not batch:
+            return
+        yield [tuple(r) for r in batch]
@@ -0,0 +1,233 @@
+# services/gst_return_service.py
+# GSTR-1 sections built in one streaming pass, merged with closed-day snapshots
+
+import json
+from datetime import date, timedelta
+from database.connection import get_connection
+
+LINES_QUERY = """
+    SELECT i.invoice_number, i.created_at, i.total, i.customer_gstin, c.name as customer,
+           ii.hsn_code, p.unit, ii.qty, ii.gst_rate, ii.gst_amt, ii.line_total
+    FROM invoices i
+    LEFT JOIN invoice_items ii ON ii.invoice_id = i.id
+    LEFT JOIN products p ON ii.product_id = p.id
+    LEFT JOIN customers c ON i.customer_id = c.id
+    WHERE i.created_at >= ? AND i.created_at < ? AND (? = 0 OR i.day_closed = 0)
+    ORDER BY i.created_at, i.id
+"""
+
+# Unique Quantity Codes for the HSN summary
+UQC = {'pcs': 'PCS', 'kg': 'KGS', 'box': 'BOX', 'ltr': 'LTR', 'ml': 'MLT'}
+
+
+class Gstr1Builder:
+    def __init__(self):
+        self.b2b = {}    # invoice_number -> {ctin, customer, date, value, rates: {rate: [taxable, tax]}}
+        self.b2cs = {}   # rate -> [taxable, tax]
+        self.hsn = {}    # (hsn, uqc, rate) -> [qty, value, taxable, tax]
+        self.docs = {}   # series prefix -> [first, last, count]
+        self._invoice = None
+
+    def add_line(self, row):
+        """row: a LINES_QUERY row. Rows of one invoice must be consecutive."""
+        number = row['invoice_number']
+        if number != self._invoice:
+            self._invoice = number
+            self._add_document(number)
+            if row['customer_gstin']:
+                self.b2b[number] = {'ctin': row['customer_gstin'], 'customer': row['customer'],
+                                    'date': row['created_at'][:10], 'value': row['total'], 'rates': {}}
+        if row['line_total'] is None:
+            return # invoice without lines still uses up its number
+
+        rate, tax, value = row['gst_rate'] or 0.0, row['gst_amt'] or 0.0, row['line_total']
+        taxable = value - tax
+        if number in self.b2b:
+            _add(self.b2b[number]['rates'].setdefault(_key(rate), [0.0, 0.0]), taxable, tax)
+        else:
+            _add(self.b2cs.setdefault(_key(rate), [0.0, 0.0]), taxable, tax)
+        hsn = (row['hsn_code'] or '', UQC.get(row['unit'], 'OTH'), _key(rate))
+        _add(self.hsn.setdefault(hsn, [0.0, 0.0, 0.0, 0.0]), row['qty'], value, taxable, tax)
+
+    def _add_document(self, number):
+        prefix = number.rsplit('-', 1)[0]
+        series = self.docs.get(prefix)
+        if series is None:
+            self.docs[prefix] = [number, number, 1]
+        else:
+            series[0], series[1] = min(series[0], number), max(series[1], number)
+            series[2] += 1
+
+    def merge(self, other):
+        self.b2b.update(other.b2b)
+        for rate, totals in other.b2cs.items():
+            _add(self.b2cs.setdefault(rate, [0.0, 0.0]), *totals)
+        for key, totals in other.hsn.items():
+            _add(self.hsn.setdefault(key, [0.0, 0.0, 0.0, 0.0]), *totals)
+        for prefix, (first, last, count) in other.docs.items():
+            series = self.docs.get(prefix)
+            if series is None:
+                self.docs[prefix] = [first, last, count]
+            else:
+                series[0], series[1] = min(series[0], first), max(series[1], last)
+                series[2] += count
+
+    # JSON form stored in daily_gst_snapshots
+    def to_json(self):
+        return json.dumps({'b2b': self.b2b, 'b2cs': self.b2cs, 'docs': self.docs,
+                           'hsn': [[*key, *totals] for key, totals in self.hsn.items()]})
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        builder = cls()
+        builder.b2b, builder.b2cs, builder.docs = data['b2b'], data['b2cs'], data['docs']
+        builder.hsn = {tuple(r[:3]): r[3:] for r in data['hsn']}
+        return builder
+
+    def sections(self):
+        """The return as flat rows per section, amounts rounded to paise."""
+        b2b = [{'ctin': inv['ctin'], 'customer': inv['customer'], 'invoice_number': number,
+                'date': inv['date'], 'invoice_value': round(inv['value'], 2), 'gst_rate': float(rate),
+                **_amounts(*totals)}
+               for number, inv in sorted(self.b2b.items())
+               for rate, totals in sorted(inv['rates'].items(), key=_rate_order)]
+        b2cs = [{'gst_rate': float(rate), **_amounts(*totals)}
+                for rate, totals in sorted(self.b2cs.items(), key=_rate_order)]
+
+        rates = {}
+        for rate_totals in [inv['rates'] for inv in self.b2b.values()] + [self.b2cs]:
+            for rate, totals in rate_totals.items():
+                _add(rates.setdefault(float(rate), [0.0, 0.0]), *totals)
+        rate_rows = [{'gst_rate': rate, **_amounts(*totals)} for rate, totals in sorted(rates.items())]
+
+        hsn = [{'hsn_code': code, 'uqc': uqc, 'gst_rate': float(rate), 'qty': round(qty, 3),
+                'total_value': round(value, 2), **_amounts(taxable, tax)}
+               for (code, uqc, rate), (qty, value, taxable, tax)
+               in sorted(self.hsn.items(), key=lambda kv: (kv[0][0], kv[0][1], float(kv[0][2])))]
+        docs = [{'series': prefix, 'from': first, 'to': last, 'total': count, 'cancelled': 0}
+                for prefix, (first, last, count) in sorted(self.docs.items())]
+        return {'b2b': b2b, 'b2cs': b2cs, 'rates': rate_rows, 'hsn': hsn, 'docs': docs}
+
+
+def _key(rate):
+    return str(float(rate)) # JSON object keys are strings
+
+def _rate_order(item):
+    return float(item[0])
+
+def _add(totals, *amounts):
+    for i, amount in enumerate(amounts):
+        totals[i] += amount
+
+def _amounts(taxable, tax):
+    cgst = round(tax / 2, 2)
+    return {'taxable_value': round(taxable, 2), 'cgst': cgst, 'sgst': round(tax - cgst, 2)}
+
+
+def build_day(day, conn=None, open_only=False):
+    """Streams one day's lines into a new builder; open_only: just invoices not yet covered by a day close."""
+    from services.report_service import day_bounds
+    conn = conn or get_connection()
+    builder = Gstr1Builder()
+    cursor = conn.execute(LINES_QUERY, (*day_bounds(day), int(open_only)))
+    while True:
+        rows = cursor.fetchmany(2000)
+        if not rows:
+            return builder
+        for row in rows:
+            builder.add_line(row)
+
+
+def save_snapshot(cursor, day):
+    """Stores the day's aggregates. Called inside close_day's transaction."""
+    builder = build_day(day, cursor.connection)
+    cursor.execute("INSERT OR REPLACE INTO daily_gst_snapshots (close_date, data) VALUES (?, ?)",
+                   (day, builder.to_json()))
+
+
+def build_gstr1(month, conn=None):
+    """
+    GSTR-1 for month ('YYYY-MM'). Returns {gstin, period, sections..., snapshot_days}
+    where the sections are lists of dicts as given by Gstr1Builder.sections().
+    """
+    conn = conn or get_connection()
+    try:
+        first = date.fromisoformat(month + '-01')
+    except ValueError:
+        raise ValueError(f"Month must be YYYY-MM, not '{month}'.")
+    last = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+    snapshots = dict(conn.execute("""
+        SELECT close_date, data FROM daily_gst_snapshots WHERE close_date BETWEEN ? AND ?
+    """, (first.isoformat(), last.isoformat())).fetchall())
+
+    builder = Gstr1Builder()
+    day = first
+    while day <= last:
+        text = snapshots.get(day.isoformat())
+        if text:
+            builder.merge(Gstr1Builder.from_json(text))
+            # Bills made after the close are not in the snapshot
+            builder.merge(build_day(day.isoformat(), conn, open_only=True))
+        else:
+            builder.merge(build_day(day.isoformat(), conn))
+        day += timedelta(days=1)
+
+    row = conn.execute("SELECT value FROM settings WHERE key = 'gst_number'").fetchone()
+    return {'gstin': row[0] if row else '', 'period': first.strftime('%m%Y'),
+            **builder.sections(), 'snapshot_days': len(snapshots)}
+
+
+def write_return(report, path):
+    """
+    Writes the return as GSTN-style JSON (path ending .json), or as one CSV per
+    section next to path (name_b2b.csv, name_b2cs.csv, ...). Returns the files written.
+    """
+    if path.lower().endswith('.json'):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(to_gstn_json(report), f, indent=1)
+        return [path]
+
+    from services.export_service import export_rows
+    base = path[:-4] if path.lower().endswith('.csv') else path
+    written = []
+    for section in ('b2b', 'b2cs', 'rates', 'hsn', 'docs'):
+        out = f"{base}_{section}.csv"
+        export_rows(report[section], out)
+        written.append(out)
+    return written
+
+
+def to_gstn_json(report):
+    """Maps the sections onto the GSTR-1 offline-utility JSON layout (intra-state supplies)."""
+    state = report['gstin'][:2]
+    b2b = {}
+    for row in report['b2b']:
+        party = b2b.setdefault(row['ctin'], {})
+        inv = party.setdefault(row['invoice_number'], {
+            'inum': row['invoice_number'], 'idt': _gstn_date(row['date']), 'val': row['invoice_value'],
+            'pos': row['ctin'][:2], 'rchrg': 'N', 'inv_typ': 'R', 'itms': []})
+        inv['itms'].append({'num': len(inv['itms']) + 1, 'itm_det': {
+            'rt': row['gst_rate'], 'txval': row['taxable_value'],
+            'camt': row['cgst'], 'samt': row['sgst'], 'csamt': 0}})
+    return {
+        'gstin': report['gstin'],
+        'fp': report['period'],
+        'b2b': [{'ctin': ctin, 'inv': list(invs.values())} for ctin, invs in b2b.items()],
+        'b2cs': [{'sply_ty': 'INTRA', 'pos': state, 'typ': 'OE', 'rt': r['gst_rate'],
+                  'txval': r['taxable_value'], 'camt': r['cgst'], 'samt': r['sgst'], 'csamt': 0}
+                 for r in report['b2cs']],
+        'hsn': {'data': [{'num': n, 'hsn_sc': r['hsn_code'], 'uqc': r['uqc'], 'qty': r['qty'],
+                          'rt': r['gst_rate'], 'val': r['total_value'], 'txval': r['taxable_value'],
+                          'iamt': 0, 'camt': r['cgst'], 'samt': r['sgst'], 'csamt': 0}
+                         for n, r in enumerate(report['hsn'], start=1)]},
+        'doc_issue': {'doc_det': [{'doc_num': 1, 'docs': [
+            {'num': n, 'from': d['from'], 'to': d['to'], 'totnum': d['total'],
+             'cancel': d['cancelled'], 'net_issue': d['total'] - d['cancelled']}
+            for n, d in enumerate(report['docs'], start=1)]}]},
+    }
+
+def _gstn_date(iso_day):
+    y, m, d = iso_day.split('-')
+    return f"{d}-{m}-{y}"
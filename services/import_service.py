@@ -0,0 +1,290 @@
+# services/import_service.py
+# Bulk product catalog import from CSV / XLSX: streamed, validated, upserted in one transaction per chunk
+
+import os
+import csv
+import json
+import time
+from database.connection import get_connection
+from services.inventory_service import publish_stock_changes
+
+CHUNK_SIZE = 5000
+UNITS = ('pcs', 'kg', 'box', 'ltr', 'ml')
+
+def read_rows(path):
+    """Yields (line_no, {column: value}) from a .csv or .xlsx file, without loading it whole."""
+    lower = path.lower()
+    if lower.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            header = [h.strip().lower() for h in next(reader, [])]
+            for line_no, values in enumerate(reader, start=2):
+                if any(values):
+                    yield line_no, dict(zip(header, values))
+    elif lower.endswith('.xlsx'):
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = [str(h or '').strip().lower() for h in next(rows, ())]
+            for line_no, values in enumerate(rows, start=2):
+                if any(v not in (None, '') for v in values):
+                    yield line_no, dict(zip(header, values))
+        finally:
+            wb.close()
+    else:
+        raise ValueError("Import file must end in .csv or .xlsx")
+
+
+def _text(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value) # XLSX stores barcodes typed as numbers as floats
+    return str(value).strip() or None
+
+
+def _number(row, field, default=None):
+    value = row.get(field)
+    if value in (None, ''):
+        return default
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} '{value}' is not a number") from None
+    if number < 0:
+        raise ValueError(f"{field} cannot be negative")
+    return number
+
+
+def _parse(row, categories, gst_ids):
+    """
+    Validates one file row into a dict of product fields; blank or missing
+    fields are None. Raises ValueError.
+    """
+    name = _text(row.get('name'))
+    if not name:
+        raise ValueError("name is required")
+    product = {'name': name, 'sku': _text(row.get('sku')), 'barcode': _text(row.get('barcode')),
+               'hsn_code': _text(row.get('hsn_code'))}
+
+    unit = _text(row.get('unit'))
+    if unit and unit.lower() not in UNITS:
+        raise ValueError(f"unit '{unit}' must be one of {', '.join(UNITS)}")
+    product['unit'] = unit and unit.lower()
+
+    for field in ('cost_price', 'sell_price', 'stock', 'low_stock_qty'):
+        product[field] = _number(row, field)
+
+    rate = _number(row, 'gst_rate')
+    if rate is not None and rate not in gst_ids:
+        raise ValueError(f"unknown GST rate {rate:g}%")
+    product['gst_rate_id'] = gst_ids.get(rate)
+
+    category = _text(row.get('category'))
+    product['category_id'] = categories.get(category.lower()) if category else None
+    product['category'] = category
+
+    expiry = row.get('expiry_date')
+    product['expiry_date'] = expiry.date().isoformat() if hasattr(expiry, 'date') else _text(expiry)
+    return product
+
+
+# Matched by sku, then barcode. A blank cell keeps the product's current value,
+# and stock only seeds new products: stock on hand changes through adjust_stock()
+UPSERT_SQL = """
+    INSERT INTO products (name, sku, barcode, category_id, unit, cost_price, sell_price,
+                          gst_rate_id, hsn_code, stock, low_stock_qty, expiry_date)
+    VALUES (:name, :sku, :barcode, :category_id, COALESCE(:unit, 'pcs'), COALESCE(:cost_price, 0),
+            COALESCE(:sell_price, 0), :gst_rate_id, :hsn_code, COALESCE(:stock, 0),
+            COALESCE(:low_stock_qty, 5), :expiry_date)
+    ON CONFLICT(sku) DO UPDATE SET {updates}, barcode = COALESCE(:barcode, barcode)
+    ON CONFLICT(barcode) DO UPDATE SET {updates}, sku = COALESCE(sku, :sku)
+"""
+UPDATABLE = ('category_id', 'unit', 'cost_price', 'sell_price', 'gst_rate_id', 'hsn_code',
+             'low_stock_qty', 'expiry_date')
+UPSERT_SQL = UPSERT_SQL.format(updates=', '.join(
+    ['name = :name', 'is_active = 1'] + [f"{f} = COALESCE(:{f}, {f})" for f in UPDATABLE]))
+
+# Defaults a new product gets for blank fields, as in UPSERT_SQL
+NEW_DEFAULTS = {'unit': 'pcs', 'cost_price': 0.0, 'sell_price': 0.0, 'stock': 0.0, 'low_stock_qty': 5.0}
+
+
+def _diff(product, existing):
+    changes = []
+    for f in ('name', 'sku', 'barcode') + UPDATABLE:
+        old, new = existing[f], product[f]
+        if new is not None and new != old:
+            changes.append(f"{f}: {old} -> {new}")
+    return changes
+
+
+def iter_import(path, dry_run=False, chunk_size=CHUNK_SIZE, conn=None):
+    """
+    Imports products from path, yielding stats after every chunk. The last yield
+    holds the totals: {rows, inserted, updated, unchanged, failed, errors,
+    new_categories, diff, seconds, rows_per_sec}. With dry_run nothing is
+    written and 'diff' lists what would change. A worker thread passes its
+    own connection (get_worker_connection()).
+    """
+    conn = conn or get_connection()
+    started = time.perf_counter()
+    categories = {r[1].lower(): r[0] for r in conn.execute("SELECT id, name FROM categories")}
+    gst_ids = {r[1]: r[0] for r in conn.execute("SELECT id, rate FROM gst_rates")}
+    stats = {'rows': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0, 'failed': 0, 'errors': [],
+             'new_categories': [], 'diff': [], 'seconds': 0.0, 'rows_per_sec': 0.0, 'path': path}
+    existing = _existing_products(conn) if dry_run else None
+    barcodes = {r[0]: r[1] for r in conn.execute("SELECT barcode, sku FROM products WHERE barcode IS NOT NULL")}
+
+    chunk = []
+    for line_no, row in read_rows(path):
+        stats['rows'] += 1
+        try:
+            product = _parse(row, categories, gst_ids)
+            _check_barcode(product, barcodes)
+        except ValueError as e:
+            stats['failed'] += 1
+            stats['errors'].append((line_no, str(e)))
+            continue
+        category = product.pop('category')
+        if category and category.lower() not in categories:
+            stats['new_categories'].append(category)
+            categories[category.lower()] = None if dry_run else _add_category(conn, category)
+            product['category_id'] = categories[category.lower()]
+        product['line_no'] = line_no
+
+        if dry_run:
+            _preview(product, existing, stats)
+            continue
+        chunk.append(product)
+        if len(chunk) >= chunk_size:
+            _write_chunk(conn, chunk, stats)
+            chunk = []
+            yield _progress(stats, started)
+    if chunk:
+        _write_chunk(conn, chunk, stats)
+    yield _progress(stats, started)
+
+
+def _check_barcode(product, barcodes):
+    """Rejects a barcode that already belongs to a product with another sku."""
+    barcode, sku = product['barcode'], product['sku']
+    if not barcode:
+        return
+    owner = barcodes.get(barcode)
+    if owner and sku and owner != sku:
+        raise ValueError(f"barcode {barcode} belongs to sku {owner}")
+    barcodes[barcode] = owner or sku
+
+
+def _progress(stats, started):
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    stats['rows_per_sec'] = round(stats['rows'] / stats['seconds']) if stats['seconds'] else 0
+    return stats
+
+
+def _add_category(conn, name):
+    with conn:
+        return conn.execute("INSERT INTO categories (name) VALUES (?)", (name,)).lastrowid
+
+
+def _existing_products(conn):
+    """(key column, value) -> product dict, for the dry run's diff."""
+    existing = {}
+    for r in conn.execute(f"SELECT name, sku, barcode, {', '.join(UPDATABLE)}, is_active FROM products"):
+        r = dict(r)
+        for key in ('sku', 'barcode'):
+            if r[key]:
+                existing[(key, r[key])] = r
+    return existing
+
+
+def _preview(product, existing, stats):
+    match = ((product['sku'] and existing.get(('sku', product['sku'])))
+             or (product['barcode'] and existing.get(('barcode', product['barcode']))))
+    entry = {'line': product['line_no'], 'sku': product['sku'], 'barcode': product['barcode'],
+             'name': product['name']}
+    if not match:
+        stats['inserted'] += 1
+        stats['diff'].append(dict(entry, action='new', changes=''))
+        # Later rows with the same key update this one, as they would in the real import
+        match = {f: product[f] if product[f] is not None else NEW_DEFAULTS.get(f)
+                 for f in ('name', 'sku', 'barcode') + UPDATABLE}
+        match['is_active'] = 1
+        for key in ('sku', 'barcode'):
+            if product[key]:
+                existing[(key, product[key])] = match
+        return
+    changes = _diff(product, match)
+    if not match['is_active']:
+        changes.append("is_active: 0 -> 1")
+    if not changes:
+        stats['unchanged'] += 1
+        return
+    stats['updated'] += 1
+    stats['diff'].append(dict(entry, action='update', changes='; '.join(changes)))
+    match.update({f: v for f, v in product.items() if v is not None and f in match})
+    match['is_active'] = 1
+
+
+def _write_chunk(conn, chunk, stats):
+    """
+    Upserts a chunk in one transaction, skipping rows that break a constraint.
+    Repriced products get price_history rows, new ones their opening stock.
+    """
+    skus = json.dumps([p['sku'] for p in chunk if p['sku']])
+    barcodes = json.dumps([p['barcode'] for p in chunk if p['barcode']])
+    new_ids, history = [], []
+    with conn:
+        # Holds the write lock from the lookup on, so no other writer's product is
+        # taken for one of ours
+        conn.execute("BEGIN IMMEDIATE")
+        before = {r['id']: r for r in conn.execute("""
+            SELECT id, sell_price, is_low_stock FROM products
+            WHERE sku IN (SELECT value FROM json_each(?)) OR barcode IN (SELECT value FROM json_each(?))
+        """, (skus, barcodes))}
+        prices = {pid: r['sell_price'] for pid, r in before.items()}
+        for product in chunk:
+            try:
+                pid, price = conn.execute(UPSERT_SQL + " RETURNING id, sell_price", product).fetchone()
+            except conn.IntegrityError as e:
+                # A row clashes with another product's sku/barcode; skip it without losing the rest
+                stats['failed'] += 1
+                stats['errors'].append((product['line_no'], str(e)))
+                continue
+            if pid not in prices:
+                new_ids.append(pid)
+            else:
+                stats['updated'] += 1
+                if price != prices[pid]:
+                    history.append((pid, prices[pid], price))
+            prices[pid] = price
+        conn.executemany("INSERT INTO price_history (product_id, old_price, new_price) VALUES (?, ?, ?)",
+                         history)
+        _log_opening_stock(conn, new_ids)
+
+    stats['inserted'] += len(new_ids)
+    publish_stock_changes(list(prices), {pid: r['is_low_stock'] for pid, r in before.items()}, conn)
+
+
+def _log_opening_stock(conn, new_ids):
+    ids = json.dumps(new_ids)
+    conn.execute("""
+        INSERT INTO inventory_logs (product_id, change_qty, reason)
+        SELECT id, stock, 'purchase' FROM products WHERE id IN (SELECT value FROM json_each(?)) AND stock > 0
+    """, (ids,))
+    conn.execute("""
+        INSERT INTO product_batches (product_id, batch_no, expiry_date, qty, received_qty, cost_price)
+        SELECT id, 'OPENING', expiry_date, stock, stock, cost_price FROM products
+        WHERE id IN (SELECT value FROM json_each(?)) AND stock > 0
+    """, (ids,))
+
+
+def import_products(path, dry_run=False, conn=None):
+    """Runs iter_import to the end and returns its final stats."""
+    if not os.path.exists(path):
+        raise ValueError(f"File not found: {path}")
+    stats = None
+    for stats in iter_import(path, dry_run, conn=conn):
+        pass
+    return stats
@@ -1,4 +1,6 @@
 from database.connection import get_connection
+from services import event_bus
+from services.batch_service import add_batch, consume_fefo, receive_batch
 
 def get_products():
     conn = get_connection()
@@ -6,10 +8,130 @@ def get_products():
     cursor.execute("SELECT * FROM products WHERE is_active = 1")
     return cursor.fetchall()
 
+def add_product(name: str, sku: str = None, barcode: str = None, category_id: int = None,
+                unit: str = 'pcs', cost_price: float = 0.0, sell_price: float = 0.0,
+                gst_rate_id: int = None, stock: float = 0.0, low_stock_qty: float = 5.0,
+                expiry_date: str = None, user_id: int = None, hsn_code: str = None) -> int:
+    """Inserts a product; opening stock is logged as a purchase. Returns the new id."""
+    conn = get_connection()
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO products (name, sku, barcode, category_id, unit, cost_price, 
+            sell_price, gst_rate_id, stock, low_stock_qty, expiry_date, hsn_code)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (name, sku or None, barcode or None, category_id, unit, cost_price,
+              sell_price, gst_rate_id, stock, low_stock_qty, expiry_date, hsn_code or None))
+        product_id = cursor.lastrowid
+        
+        if stock > 0:
+            cursor.execute("""
+                INSERT INTO inventory_logs (product_id, change_qty, reason, user_id)
+                VALUES (?, ?, 'purchase', ?)
+            """, (product_id, stock, user_id))
+            add_batch(cursor, product_id, stock, expiry_date, 'OPENING', cost_price)
+    publish_stock_changes([product_id], {})
+    return product_id
+
+PRODUCT_FIELDS = ('name', 'sku', 'barcode', 'category_id', 'unit', 'cost_price', 'sell_price',
+                  'gst_rate_id', 'low_stock_qty', 'expiry_date', 'hsn_code')
+
+def get_product(product_id: int):
+    row = get_connection().execute("SELECT * FROM products WHERE id = ?", (product_id,)).fetchone()
+    return dict(row) if row else None
+
+def get_categories():
+    return [dict(r) for r in get_connection().execute("SELECT id, name FROM categories ORDER BY name")]
+
+def get_gst_rates():
+    return [dict(r) for r in get_connection().execute("SELECT id, label, rate FROM gst_rates ORDER BY rate")]
+
+def update_product(product_id: int, **fields):
+    """Updates product details; stock changes go through adjust_stock()."""
+    unknown = set(fields) - set(PRODUCT_FIELDS)
+    if unknown:
+        raise ValueError(f"Cannot update {', '.join(sorted(unknown))}.")
+    if not fields:
+        return
+    for key in ('sku', 'barcode', 'hsn_code'):
+        if key in fields:
+            fields[key] = fields[key] or None
+    low_before = get_low_stock_flags([product_id])
+    conn = get_connection()
+    with conn:
+        if 'sell_price' in fields:
+            conn.execute("""
+                INSERT INTO price_history (product_id, old_price, new_price)
+                SELECT id, sell_price, ? FROM products WHERE id = ? AND sell_price != ?
+            """, (fields['sell_price'], product_id, fields['sell_price']))
+        conn.execute(f"UPDATE products SET {', '.join(f'{k} = ?' for k in fields)} WHERE id = ?",
+                     [*fields.values(), product_id])
+    publish_stock_changes([product_id], low_before)
+
 def adjust_stock(product_id: int, change_qty: float, reason: str, user_id: int = None):
+    if reason == 'purchase' and change_qty > 0:
+        # Goods received are a batch; receive_batch() takes its number and expiry
+        receive_batch(product_id, change_qty, user_id=user_id)
+        return
     conn = get_connection()
+    low_before = get_low_stock_flags([product_id])
     with conn:
         cursor = conn.cursor()
         cursor.execute("UPDATE products SET stock = stock + ? WHERE id = ?", (change_qty, product_id))
         cursor.execute("INSERT INTO inventory_logs (product_id, change_qty, reason, user_id) VALUES (?, ?, ?, ?)", 
                        (product_id, change_qty, reason, user_id))
+        # Stock taken out leaves the earliest-expiring batches; stock put back (returns,
+        # count corrections) has no known batch number or expiry
+        if change_qty < 0:
+            consume_fefo(cursor, product_id, -change_qty)
+        elif change_qty > 0:
+            add_batch(cursor, product_id, change_qty)
+    publish_stock_changes([product_id], low_before)
+
+def get_stock_levels(product_ids, conn=None):
+    """Current stock of the given products, as carried by STOCK_CHANGED events."""
+    if not product_ids:
+        return []
+    conn = conn or get_connection()
+    product_ids = list(product_ids)
+    rows = []
+    for i in range(0, len(product_ids), 500): # stay under SQLite's bound-parameter limit
+        chunk = product_ids[i:i + 500]
+        placeholders = ','.join('?' * len(chunk))
+        rows += conn.execute(f"""
+            SELECT id, name, stock, low_stock_qty, is_active, is_low_stock FROM products WHERE id IN ({placeholders})
+        """, chunk).fetchall()
+    return [dict(r) for r in rows]
+
+def find_product_by_barcode(barcode: str):
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM products WHERE barcode = ? AND is_active = 1", (barcode,))
+    row = cursor.fetchone()
+    return dict(row) if row else None
+
+def get_low_stock_flags(product_ids, conn=None):
+    """product_id -> is_low_stock, read before a stock change to detect threshold crossings."""
+    return {p['id']: p['is_low_stock'] for p in get_stock_levels(product_ids, conn)}
+
+def publish_stock_changes(product_ids, low_before, conn=None):
+    """
+    Publishes STOCK_CHANGED for the products, and LOW_STOCK_CHANGED for those
+    whose is_low_stock flag differs from low_before. Call after the commit.
+    """
+    changes = get_stock_levels(product_ids, conn)
+    event_bus.publish(event_bus.STOCK_CHANGED, changes=changes)
+    crossed = [c for c in changes if c['is_low_stock'] != low_before.get(c['id'], 0)]
+    if crossed:
+        event_bus.publish(event_bus.LOW_STOCK_CHANGED, products=crossed)
+
+def get_low_stock_products(limit: int = None):
+    conn = get_connection()
+    query = "SELECT id, name, stock, low_stock_qty FROM products WHERE is_low_stock = 1 ORDER BY stock"
+    if limit:
+        query += f" LIMIT {int(limit)}"
+    return [dict(r) for r in conn.execute(query).fetchall()]
+
+def count_low_stock() -> int:
+    conn = get_connection()
+    return conn.execute("SELECT COUNT(*) FROM products WHERE is_low_stock = 1").fetchone()[0]
@@ -0,0 +1,111 @@
+from datetime import datetime
+from typing import Optional
+from database.connection import get_connection
+from services import event_bus
+from services.inventory_service import get_low_stock_flags, publish_stock_changes
+from services.batch_service import consume_fefo
+from models.invoice import Invoice, InvoiceItem
+
+def next_invoice_number(cursor, day: datetime) -> str:
+    """INV-YYYYMMDD-NNNN, numbered per day. Uses a range scan on the unique index."""
+    prefix = f"INV-{day.strftime('%Y%m%d')}-"
+    cursor.execute("""
+        SELECT MAX(invoice_number) FROM invoices
+        WHERE invoice_number >= ? AND invoice_number < ?
+    """, (prefix, prefix[:-1] + '.'))
+    last = cursor.fetchone()[0]
+    seq = int(last.rsplit('-', 1)[1]) + 1 if last else 1
+    return f"{prefix}{seq:04d}"
+
+def create_invoice(user_id: int, customer_id: Optional[int], cart_totals: dict,
+                   payment_mode: str = 'cash', amount_received: float = 0.0,
+                   notes: str = None) -> Invoice:
+    """
+    Saves a bill from BillingCart.calculate_totals() in one transaction:
+    invoice header, lines, stock decrement, 'sale' inventory logs, FEFO
+    batch allocation and, for credit bills, the customer's outstanding balance.
+    """
+    items = cart_totals.get('items', [])
+    if not items:
+        raise ValueError("Cannot save an empty invoice.")
+
+    payment_mode = (payment_mode or 'cash').lower()
+    if payment_mode == 'credit' and not customer_id:
+        raise ValueError("Credit bills need a customer.")
+    payment_status = 'pending' if payment_mode == 'credit' else 'paid'
+
+    subtotal = cart_totals['subtotal']
+    discount_amt = cart_totals['discount_amt']
+    discount_pct = round(discount_amt / subtotal * 100, 2) if subtotal else 0.0
+    total = cart_totals['grand_total']
+    now = datetime.now()
+    created_at = now.strftime('%Y-%m-%d %H:%M:%S')
+
+    product_ids = {item['product_id'] for item in items}
+    low_before = get_low_stock_flags(product_ids)
+
+    conn = get_connection()
+    with conn:
+        cursor = conn.cursor()
+        invoice_number = next_invoice_number(cursor, now)
+        cursor.execute("""
+            INSERT INTO invoices (invoice_number, customer_id, user_id, subtotal, discount_pct,
+                                  discount_amt, cgst_amt, sgst_amt, total, payment_mode,
+                                  payment_status, notes, created_at, customer_gstin)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+                    (SELECT gstin FROM customers WHERE id = ?))
+        """, (invoice_number, customer_id, user_id, subtotal, discount_pct, discount_amt,
+              cart_totals['cgst_total'], cart_totals['sgst_total'], total, payment_mode,
+              payment_status, notes, created_at, customer_id))
+        invoice_id = cursor.lastrowid
+
+        line_rows = []
+        for item in items:
+            base = item.get('base_amount', 0.0)
+            # Effective line discount (item + bill level) as a percentage
+            disc = round(item.get('discount_amt', 0.0) / base * 100, 2) if base else 0.0
+            line_rows.append((invoice_id, item['product_id'], item['name'], item['qty'],
+                              item['unit_price'], disc, item['gst_rate'], item['gst_amt'],
+                              item['line_total'], item['product_id']))
+        cursor.executemany("""
+            INSERT INTO invoice_items (invoice_id, product_id, product_name, qty, unit_price,
+                                       discount, gst_rate, gst_amt, line_total, hsn_code)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, (SELECT hsn_code FROM products WHERE id = ?))
+        """, line_rows)
+
+        cursor.executemany("UPDATE products SET stock = stock - ? WHERE id = ?",
+                           [(item['qty'], item['product_id']) for item in items])
+        cursor.executemany("""
+            INSERT INTO inventory_logs (product_id, change_qty, reason, invoice_id, user_id, created_at)
+            VALUES (?, ?, 'sale', ?, ?, ?)
+        """, [(item['product_id'], -item['qty'], invoice_id, user_id, created_at) for item in items])
+        for item in items:
+            consume_fefo(cursor, item['product_id'], item['qty'], invoice_id)
+
+        if payment_mode == 'credit':
+            cursor.execute("UPDATE customers SET outstanding = outstanding + ? WHERE id = ?",
+                           (total, customer_id))
+
+    invoice = get_invoice(invoice_id)
+    event_bus.publish(event_bus.INVOICE_COMMITTED, invoice=invoice)
+    publish_stock_changes(product_ids, low_before)
+    return invoice
+
+def get_invoice(invoice_id: int) -> Optional[Invoice]:
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, invoice_number, customer_id, user_id, subtotal, discount_pct, discount_amt,
+               cgst_amt, sgst_amt, total, payment_mode, payment_status, notes, created_at
+        FROM invoices WHERE id = ?
+    """, (invoice_id,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    cursor.execute("""
+        SELECT id, invoice_id, product_id, product_name, qty, unit_price, discount,
+               gst_rate, gst_amt, line_total
+        FROM invoice_items WHERE invoice_id = ? ORDER BY id
+    """, (invoice_id,))
+    items = [InvoiceItem(**dict(r)) for r in cursor.fetchall()]
+    return Invoice(**dict(row), items=items)
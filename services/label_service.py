@@ -0,0 +1,212 @@
+# services/label_service.py
+# Product labels: EAN-13 / Code128 barcodes with name and price, as A4 label-sheet PDFs or ZPL
+
+import os
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+import database.connection
+from database.connection import get_connection
+
+# A4 label sheets (mm): columns x rows of width x height labels at the given pitch
+SHEETS = {
+    '65-up': {'cols': 5, 'rows': 13, 'width': 38.1, 'height': 21.2, 'left': 4.7, 'top': 10.7,
+              'pitch_x': 40.6, 'pitch_y': 21.2},
+    '21-up': {'cols': 3, 'rows': 7, 'width': 63.5, 'height': 38.1, 'left': 7.2, 'top': 15.1,
+              'pitch_x': 66.0, 'pitch_y': 38.1},
+}
+RENDER_CHUNK = 250  # barcodes per worker task
+
+
+def cache_dir():
+    """Rendered barcode images, next to the database file."""
+    base = os.path.splitext(os.path.abspath(database.connection.DB_PATH))[0]
+    return base + '_labels'
+
+
+def symbology_for(code: str) -> str:
+    """'ean13' for a 13-digit code with a valid check digit, else 'code128'."""
+    if len(code) == 13 and code.isdigit():
+        odd, even = sum(map(int, code[0:12:2])), sum(map(int, code[1:12:2]))
+        if (10 - (odd + 3 * even) % 10) % 10 == int(code[12]):
+            return 'ean13'
+    return 'code128'
+
+
+def get_label_items(product_copies):
+    """
+    {product_id: copies} -> label dicts (name, price, code, symbology, copies)
+    in the given order. Products with neither barcode nor sku are skipped.
+    """
+    conn = get_connection()
+    ids = list(product_copies)
+    products = {}
+    for i in range(0, len(ids), 500): # stay under SQLite's bound-parameter limit
+        chunk = ids[i:i + 500]
+        for r in conn.execute(f"""
+            SELECT id, name, sell_price, COALESCE(barcode, sku) as code FROM products
+            WHERE id IN ({','.join('?' * len(chunk))}) AND COALESCE(barcode, sku) IS NOT NULL
+        """, chunk):
+            products[r['id']] = r
+    items = []
+    for product_id in ids:
+        r = products.get(product_id)
+        copies = int(product_copies[product_id])
+        if r is not None and copies > 0:
+            items.append({'product_id': product_id, 'name': r['name'], 'price': r['sell_price'],
+                          'code': r['code'], 'symbology': symbology_for(r['code']), 'copies': copies})
+    return items
+
+
+# ── Barcode images ───────────────────────────────────────────────────────
+# Bars are rendered one pixel tall, 3 pixels (0.254 mm at 300 dpi) per module, and
+# stretched to the label's bar height when drawn: every row of a 1-D barcode is identical
+MODULE_MM = 0.254
+QUIET_ZONE_MM = 2.5
+
+
+def image_path(folder, symbology, code):
+    """Cache file for a barcode, keyed by symbology, code and module size."""
+    digest = hashlib.sha1(f"{symbology}|{code}|{MODULE_MM}".encode()).hexdigest()[:20]
+    return os.path.join(folder, digest[:2], f"{digest}.png")
+
+
+def _render(folder, symbology, code):
+    import barcode
+    from barcode.writer import ImageWriter
+    path = image_path(folder, symbology, code)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    image = barcode.get(symbology, code, writer=ImageWriter(mode='1'))
+    options = {'module_width': MODULE_MM, 'module_height': 25.4 / 300, 'quiet_zone': QUIET_ZONE_MM,
+               'margin_top': 0, 'margin_bottom': 0, 'write_text': False, 'dpi': 300}
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        image.write(f, options)
+    os.replace(tmp, path) # readers never see a half-written file
+    return path
+
+
+def _render_chunk(folder, jobs):
+    """Runs in a worker process: renders (symbology, code) jobs."""
+    for job in jobs:
+        _render(folder, *job)
+    return len(jobs)
+
+
+def render_barcodes(jobs, workers=None):
+    """
+    Renders the (symbology, code) jobs not already cached, in parallel for
+    large batches. Returns how many images were rendered.
+    """
+    folder = cache_dir()
+    missing = [job for job in dict.fromkeys(jobs) if not os.path.exists(image_path(folder, *job))]
+    chunks = [missing[i:i + RENDER_CHUNK] for i in range(0, len(missing), RENDER_CHUNK)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    if workers <= 1:
+        return sum(_render_chunk(folder, chunk) for chunk in chunks)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(_render_chunk, [folder] * len(chunks), chunks))
+
+
+# ── Output ───────────────────────────────────────────────────────────────
+def _fit(text, font, size, width):
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    if stringWidth(text, font, size) <= width:
+        return text
+    while text and stringWidth(text + '…', font, size) > width:
+        text = text[:-1]
+    return text + '…'
+
+
+def _bar_height(sheet):
+    # The name line above and the code / price line below take about 7 mm
+    return min(sheet['height'] - 9.5, 15)
+
+
+def write_pdf(items, path, sheet='65-up', workers=None):
+    """Lays the labels out on A4 sheets. Returns {labels, pages, rendered}."""
+    from reportlab.lib.units import mm
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas as pdf_canvas
+
+    spec = SHEETS[sheet]
+    bar_height = _bar_height(spec)
+    rendered = render_barcodes([(i['symbology'], i['code']) for i in items], workers)
+    folder = cache_dir()
+
+    c = pdf_canvas.Canvas(path, pagesize=A4)
+    per_page = spec['cols'] * spec['rows']
+    width, height, pad = spec['width'] * mm, spec['height'] * mm, 1.5 * mm
+    inner = width - 2 * pad
+    bar_width = min(inner, 45 * mm) # wider bars only make the label harder to scan
+    slot = 0
+    for item in items:
+        image = image_path(folder, item['symbology'], item['code'])
+        name = _fit(item['name'], 'Helvetica-Bold', 6.5, inner)
+        price = f"Rs {item['price']:.2f}"
+        for _ in range(item['copies']):
+            if slot == per_page:
+                c.showPage()
+                slot = 0
+            col, row = slot % spec['cols'], slot // spec['cols']
+            x = (spec['left'] + col * spec['pitch_x']) * mm
+            top = A4[1] - (spec['top'] + row * spec['pitch_y']) * mm
+            c.setFont('Helvetica-Bold', 6.5)
+            c.drawString(x + pad, top - pad - 6.5, name)
+            bars_bottom = top - pad - 10 - bar_height * mm
+            c.drawImage(image, x + pad, bars_bottom, bar_width, bar_height * mm)
+            c.setFont('Helvetica', 5.5)
+            c.drawString(x + pad, bars_bottom - 7, item['code'])
+            c.setFont('Helvetica-Bold', 8)
+            c.drawRightString(x + width - pad, bars_bottom - 7, price)
+            slot += 1
+    c.save()
+    labels = sum(i['copies'] for i in items)
+    return {'labels': labels, 'pages': -(-labels // per_page) if labels else 0, 'rendered': rendered}
+
+
+def _zpl_text(text):
+    return text.replace('^', ' ').replace('~', ' ')
+
+
+def write_zpl(items, path, width_mm=50, height_mm=25, dpi=203):
+    """
+    ZPL for thermal label printers, one format per product with ^PQ copies.
+    The printer draws the barcode itself, so nothing is rendered here.
+    """
+    dots = dpi / 25.4
+    width, height = round(width_mm * dots), round(height_mm * dots)
+    bar_height = round(height * 0.45)
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        for item in items:
+            command = '^BEN' if item['symbology'] == 'ean13' else '^BCN'
+            # EAN-13 takes the 12 data digits; the printer adds the check digit
+            data = item['code'][:12] if item['symbology'] == 'ean13' else item['code']
+            f.write(f"^XA^CI28^PW{width}^LL{height}\n"
+                    f"^FO16,12^A0N,24,22^FB{width - 32},1,0,L^FD{_zpl_text(item['name'])}^FS\n"
+                    f"^FO16,44^BY2{command},{bar_height},Y,N^FD{_zpl_text(data)}^FS\n"
+                    f"^FO16,{height - 34}^A0N,28,28^FB{width - 32},1,0,R^FDRs {item['price']:.2f}^FS\n"
+                    f"^PQ{item['copies']}\n^XZ\n")
+    return {'labels': sum(i['copies'] for i in items), 'pages': 0, 'rendered': 0}
+
+
+def write_labels(items, path, sheet='65-up', workers=None):
+    """Writes a .pdf (A4 sheet) or .zpl file; runs without the database, so it suits a worker thread."""
+    started = time.perf_counter()
+    lower = path.lower()
+    if lower.endswith('.pdf'):
+        stats = write_pdf(items, path, sheet, workers)
+    elif lower.endswith('.zpl'):
+        stats = write_zpl(items, path)
+    else:
+        raise ValueError("Label file must end in .pdf or .zpl")
+    stats['seconds'] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+def print_labels(product_copies, path, sheet='65-up', workers=None):
+    """{product_id: copies} -> label file. Returns {labels, pages, rendered, seconds}."""
+    items = get_label_items(product_copies)
+    if not items:
+        raise ValueError("None of the products has a barcode or SKU.")
+    return write_labels(items, path, sheet, workers)
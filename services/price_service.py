@@ -0,0 +1,174 @@
+# services/price_service.py
+# Scheduled price lists: rules by category / GST rate, applied to every product in one transaction
+
+from datetime import datetime
+from database.connection import get_connection
+from services import event_bus
+
+# percent: change the sell price by value %; markup: cost price plus value %;
+# add: add value (negative to cut) to the sell price
+RULE_KINDS = ('percent', 'markup', 'add')
+
+# Each active product's new price from its most specific rule (category and GST
+# rate > category > GST rate > catch-all; later rules break ties), where it differs.
+# A markup rule passes over products with no cost price, which would go to 0
+_NEW_PRICES = """
+    WITH matched AS (
+        SELECT p.id as product_id, p.sell_price as old_price, r.round_to,
+               CASE r.kind WHEN 'percent' THEN p.sell_price * (1 + r.value / 100.0)
+                           WHEN 'markup' THEN p.cost_price * (1 + r.value / 100.0)
+                           ELSE p.sell_price + r.value END as raw_price,
+               ROW_NUMBER() OVER (
+                   PARTITION BY p.id
+                   ORDER BY (r.category_id IS NOT NULL) * 2 + (r.gst_rate_id IS NOT NULL) DESC, r.id DESC
+               ) as rank
+        FROM price_list_rules r
+        JOIN products p ON (r.category_id IS NULL OR p.category_id = r.category_id)
+                       AND (r.gst_rate_id IS NULL OR p.gst_rate_id = r.gst_rate_id)
+                       AND (r.kind != 'markup' OR p.cost_price > 0)
+                       AND p.is_active = 1
+        WHERE r.price_list_id = ?
+    ),
+    priced AS (
+        SELECT product_id, old_price,
+               MAX(0, ROUND(CASE WHEN round_to > 0 THEN ROUND(raw_price / round_to) * round_to
+                                 ELSE raw_price END, 2)) as new_price
+        FROM matched WHERE rank = 1
+    )
+    SELECT product_id, old_price, new_price FROM priced WHERE new_price != old_price
+"""
+
+def _timestamp(value) -> str:
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    try:
+        return datetime.fromisoformat(str(value)).strftime('%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        raise ValueError(f"Start time '{value}' is not a valid date/time.") from None
+
+def create_price_list(name: str, starts_at, rules, user_id: int = None) -> int:
+    """
+    Schedules a price list. rules: dicts with kind, value and optional
+    category_id, gst_rate_id, round_to. Returns the list id.
+    """
+    name = (name or '').strip()
+    if not name:
+        raise ValueError("Price list name is required.")
+    if not rules:
+        raise ValueError("A price list needs at least one rule.")
+    rows = []
+    for rule in rules:
+        kind, value = rule.get('kind'), rule.get('value')
+        if kind not in RULE_KINDS:
+            raise ValueError(f"Rule kind must be one of {', '.join(RULE_KINDS)}.")
+        if value is None or (kind == 'percent' and value <= -100):
+            raise ValueError("Rule value is missing or would make prices negative.")
+        round_to = rule.get('round_to') or None
+        if round_to is not None and round_to < 0:
+            raise ValueError("Round-to amount cannot be negative.")
+        rows.append((rule.get('category_id'), rule.get('gst_rate_id'), kind, value, round_to))
+
+    conn = get_connection()
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO price_lists (name, starts_at, created_by) VALUES (?, ?, ?)",
+                       (name, _timestamp(starts_at), user_id))
+        price_list_id = cursor.lastrowid
+        cursor.executemany("""
+            INSERT INTO price_list_rules (price_list_id, category_id, gst_rate_id, kind, value, round_to)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(price_list_id, *row) for row in rows])
+    return price_list_id
+
+def cancel_price_list(price_list_id: int):
+    conn = get_connection()
+    with conn:
+        cursor = conn.execute("UPDATE price_lists SET status = 'cancelled' WHERE id = ? AND status = 'scheduled'",
+                              (price_list_id,))
+    if cursor.rowcount == 0:
+        raise ValueError("Only scheduled price lists can be cancelled.")
+
+def get_price_lists(limit: int = 100):
+    """Newest first, with their rule counts."""
+    rows = get_connection().execute("""
+        SELECT l.*, (SELECT COUNT(*) FROM price_list_rules r WHERE r.price_list_id = l.id) as rules
+        FROM price_lists l
+        ORDER BY l.starts_at DESC, l.id DESC
+        LIMIT ?
+    """, (limit,)).fetchall()
+    return [dict(r) for r in rows]
+
+def preview_price_list(price_list_id: int, limit: int = 20):
+    """(number of products the list would reprice now, a sample of the changes)."""
+    rows = get_connection().execute(_NEW_PRICES, (price_list_id,)).fetchall()
+    return len(rows), [dict(r) for r in rows[:limit]]
+
+def apply_price_list(price_list_id: int, now=None) -> int:
+    """
+    Reprices every matching product and records price_history in one
+    transaction, so the till never sees half a revision. Publishes
+    PRICES_CHANGED after the commit. Returns the number of products repriced.
+    """
+    applied_at = _timestamp(now or datetime.now())
+    conn = get_connection()
+    with conn:
+        cursor = conn.cursor()
+        # Claims the list first, so two tills can't both apply it
+        cursor.execute("UPDATE price_lists SET status = 'applied', applied_at = ? WHERE id = ? AND status = 'scheduled'",
+                       (applied_at, price_list_id))
+        if cursor.rowcount == 0:
+            raise ValueError("Price list is not scheduled.")
+        cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS price_changes (
+                product_id INTEGER PRIMARY KEY, old_price REAL, new_price REAL
+            )
+        """)
+        cursor.execute("DELETE FROM temp.price_changes")
+        cursor.execute(f"INSERT INTO temp.price_changes {_NEW_PRICES}", (price_list_id,))
+        cursor.execute("""
+            INSERT INTO price_history (product_id, price_list_id, old_price, new_price, changed_at)
+            SELECT product_id, ?, old_price, new_price, ? FROM temp.price_changes
+        """, (price_list_id, applied_at))
+        changed = cursor.rowcount
+        cursor.execute("""
+            UPDATE products SET sell_price = c.new_price
+            FROM temp.price_changes c WHERE c.product_id = products.id
+        """)
+        cursor.execute("UPDATE price_lists SET products_changed = ? WHERE id = ?", (changed, price_list_id))
+        cursor.execute("DELETE FROM temp.price_changes")
+    event_bus.publish(event_bus.PRICES_CHANGED, price_list_id=price_list_id, products=changed)
+    return changed
+
+def apply_due_price_lists(now=None):
+    """Applies scheduled lists whose start time has passed, oldest first. Returns [(id, products repriced)]."""
+    now = _timestamp(now or datetime.now())
+    due = [r[0] for r in get_connection().execute("""
+        SELECT id FROM price_lists WHERE status = 'scheduled' AND starts_at <= ? ORDER BY starts_at, id
+    """, (now,))]
+    return [(price_list_id, apply_price_list(price_list_id, now)) for price_list_id in due]
+
+def get_applied_price_lists(since):
+    """
+    [(id, applied_at, products_changed)] of lists applied at or after since,
+    including those another process applied (smart_pos.py prices due).
+    """
+    rows = get_connection().execute("""
+        SELECT id, applied_at, products_changed FROM price_lists
+        WHERE status = 'applied' AND applied_at >= ?
+        ORDER BY applied_at, id
+    """, (_timestamp(since),)).fetchall()
+    return [tuple(r) for r in rows]
+
+def next_price_list_start():
+    """Start time (datetime) of the next scheduled list, or None."""
+    row = get_connection().execute("SELECT MIN(starts_at) FROM price_lists WHERE status = 'scheduled'").fetchone()
+    return datetime.fromisoformat(row[0]) if row[0] else None
+
+def get_price_history(product_id: int, limit: int = 50):
+    rows = get_connection().execute("""
+        SELECT h.old_price, h.new_price, h.changed_at, l.name as price_list
+        FROM price_history h LEFT JOIN price_lists l ON l.id = h.price_list_id
+        WHERE h.product_id = ?
+        ORDER BY h.id DESC LIMIT ?
+    """, (product_id, limit)).fetchall()
+    return [dict(r) for r in rows]
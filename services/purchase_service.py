@@ -0,0 +1,213 @@
+# services/purchase_service.py
+# Goods receipts (GRNs): lines are scanned or imported into a draft, posting books them all in one transaction
+
+from database.connection import get_connection
+from services.inventory_service import get_low_stock_flags, publish_stock_changes
+
+HEADER_FIELDS = ('supplier', 'invoice_no', 'invoice_date', 'freight')
+
+def get_draft_purchase():
+    """The most recent GRN still being entered, or None."""
+    row = get_connection().execute("""
+        SELECT * FROM purchases WHERE status = 'draft' ORDER BY id DESC LIMIT 1
+    """).fetchone()
+    return dict(row) if row else None
+
+def create_purchase(supplier: str = None, invoice_no: str = None, invoice_date: str = None,
+                    freight: float = 0.0, user_id: int = None) -> int:
+    if freight < 0:
+        raise ValueError("Freight cannot be negative.")
+    conn = get_connection()
+    with conn:
+        return conn.execute("""
+            INSERT INTO purchases (supplier, invoice_no, invoice_date, freight, created_by)
+            VALUES (?, ?, ?, ?, ?)
+        """, (supplier or None, invoice_no or None, invoice_date or None, freight, user_id)).lastrowid
+
+def update_purchase(purchase_id: int, **fields):
+    """Edits a draft's supplier, invoice_no, invoice_date or freight."""
+    unknown = set(fields) - set(HEADER_FIELDS)
+    if unknown:
+        raise ValueError(f"Cannot update {', '.join(sorted(unknown))}.")
+    if fields.get('freight', 0) < 0:
+        raise ValueError("Freight cannot be negative.")
+    conn = get_connection()
+    _check_draft(conn, purchase_id)
+    if fields:
+        with conn:
+            conn.execute(f"UPDATE purchases SET {', '.join(f'{k} = ?' for k in fields)} WHERE id = ?",
+                         [*fields.values(), purchase_id])
+
+def _check_draft(conn, purchase_id):
+    row = conn.execute("SELECT status FROM purchases WHERE id = ?", (purchase_id,)).fetchone()
+    if not row:
+        raise ValueError(f"GRN {purchase_id} not found.")
+    if row['status'] != 'draft':
+        raise ValueError(f"GRN {purchase_id} is {row['status']}.")
+
+def _check_line(qty, unit_cost):
+    if qty is None or qty <= 0:
+        raise ValueError("Quantity must be positive.")
+    if unit_cost is not None and unit_cost < 0:
+        raise ValueError("Unit cost cannot be negative.")
+
+# One statement per line: adds to the product's line, or stages it at the given
+# cost (default: the product's current cost price)
+_LINE_SQL = """
+    INSERT INTO purchase_lines (purchase_id, product_id, qty, unit_cost, batch_no, expiry_date)
+    SELECT :purchase_id, id, :qty, COALESCE(:unit_cost, cost_price), :batch_no, :expiry_date
+    FROM products WHERE {match}
+    ON CONFLICT(purchase_id, product_id) DO UPDATE SET
+        qty = qty + excluded.qty,
+        unit_cost = COALESCE(:unit_cost, unit_cost),
+        batch_no = COALESCE(excluded.batch_no, batch_no),
+        expiry_date = COALESCE(excluded.expiry_date, expiry_date)
+"""
+
+def _line(purchase_id, qty, unit_cost=None, batch_no=None, expiry_date=None, **match):
+    _check_line(qty, unit_cost)
+    return dict(match, purchase_id=purchase_id, qty=qty, unit_cost=unit_cost,
+                batch_no=batch_no or None, expiry_date=expiry_date or None)
+
+def record_scan(purchase_id: int, code: str, qty: float = 1, unit_cost: float = None,
+                batch_no: str = None, expiry_date: str = None):
+    """Adds qty of the product with this barcode (or sku). Returns (product_id, line qty so far)."""
+    conn = get_connection()
+    _check_draft(conn, purchase_id)
+    with conn:
+        row = conn.execute(_LINE_SQL.format(match="barcode = :code OR sku = :code LIMIT 1")
+                           + " RETURNING product_id, qty",
+                           _line(purchase_id, qty, unit_cost, batch_no, expiry_date, code=code)).fetchone()
+    if not row:
+        raise ValueError(f"No product with barcode or SKU '{code}'.")
+    return row['product_id'], row['qty']
+
+def add_lines(purchase_id: int, lines) -> int:
+    """
+    Stages many lines in one transaction. lines: dicts with product_id, qty
+    and optional unit_cost, batch_no, expiry_date. Returns the GRN's line count.
+    """
+    conn = get_connection()
+    _check_draft(conn, purchase_id)
+    params = [_line(purchase_id, l['qty'], l.get('unit_cost'), l.get('batch_no'), l.get('expiry_date'),
+                    product_id=l['product_id']) for l in lines]
+    with conn:
+        conn.executemany(_LINE_SQL.format(match="id = :product_id"), params)
+    return conn.execute("SELECT COUNT(*) FROM purchase_lines WHERE purchase_id = ?", (purchase_id,)).fetchone()[0]
+
+def import_lines(purchase_id: int, path: str):
+    """
+    Stages lines from a supplier's CSV/XLSX (columns: barcode or sku, qty,
+    unit_cost, batch_no, expiry_date) in one transaction; bad rows are
+    skipped. Returns {rows, added, errors: [(line_no, message)]}.
+    """
+    from services.import_service import read_rows, _number, _text
+    conn = get_connection()
+    _check_draft(conn, purchase_id)
+    stats = {'rows': 0, 'added': 0, 'errors': []}
+    sql = _LINE_SQL.format(match="barcode = :code OR sku = :code LIMIT 1")
+    with conn:
+        for line_no, row in read_rows(path):
+            stats['rows'] += 1
+            try:
+                code = _text(row.get('barcode')) or _text(row.get('sku'))
+                if not code:
+                    raise ValueError("barcode or sku is required")
+                expiry = row.get('expiry_date')
+                params = _line(purchase_id, _number(row, 'qty'), _number(row, 'unit_cost'), _text(row.get('batch_no')),
+                               expiry.date().isoformat() if hasattr(expiry, 'date') else _text(expiry), code=code)
+                if conn.execute(sql, params).rowcount == 0:
+                    raise ValueError(f"no product with barcode or SKU '{code}'")
+                stats['added'] += 1
+            except ValueError as e:
+                stats['errors'].append((line_no, str(e)))
+    return stats
+
+def remove_line(purchase_id: int, product_id: int):
+    conn = get_connection()
+    _check_draft(conn, purchase_id)
+    with conn:
+        conn.execute("DELETE FROM purchase_lines WHERE purchase_id = ? AND product_id = ?", (purchase_id, product_id))
+
+def get_purchase_lines(purchase_id: int, product_id: int = None):
+    rows = get_connection().execute("""
+        SELECT l.product_id, p.name, p.unit, l.qty, l.unit_cost, ROUND(l.qty * l.unit_cost, 2) as amount,
+               l.batch_no, l.expiry_date, p.cost_price
+        FROM purchase_lines l
+        JOIN products p ON p.id = l.product_id
+        WHERE l.purchase_id = ? AND (? IS NULL OR l.product_id = ?)
+        ORDER BY p.name
+    """, (purchase_id, product_id, product_id)).fetchall()
+    return [dict(r) for r in rows]
+
+def post_purchase(purchase_id: int, user_id: int = None):
+    """
+    Books the GRN in one transaction: stock up, 'purchase' inventory logs,
+    a batch per line, and cost_price moved to the weighted average of the
+    stock on hand and the landed cost (unit cost plus its share of freight).
+    Returns {lines, qty, goods, freight, total_cost}.
+    """
+    conn = get_connection()
+    _check_draft(conn, purchase_id)
+    product_ids = [r[0] for r in conn.execute("SELECT product_id FROM purchase_lines WHERE purchase_id = ?",
+                                              (purchase_id,))]
+    if not product_ids:
+        raise ValueError("The GRN has no lines.")
+    low_before = get_low_stock_flags(product_ids)
+
+    with conn:
+        cursor = conn.cursor()
+        # Claims the draft first, so it can't be posted twice
+        cursor.execute("""
+            UPDATE purchases SET status = 'posted', posted_by = ?, posted_at = datetime('now','localtime')
+            WHERE id = ? AND status = 'draft'
+        """, (user_id, purchase_id))
+        if cursor.rowcount == 0:
+            raise ValueError(f"GRN {purchase_id} is no longer a draft.")
+        totals = cursor.execute("""
+            SELECT COUNT(*) as lines, SUM(l.qty) as qty, SUM(l.qty * l.unit_cost) as goods, MAX(p.freight) as freight
+            FROM purchase_lines l JOIN purchases p ON p.id = l.purchase_id
+            WHERE l.purchase_id = ?
+        """, (purchase_id,)).fetchone()
+        # Freight is spread over the lines in proportion to their value
+        landed = 1 + totals['freight'] / totals['goods'] if totals['goods'] else 1
+        params = {'id': purchase_id, 'landed': landed, 'user_id': user_id}
+
+        # Negative stock (sold before it was received) carries no cost into the average
+        cursor.execute("""
+            UPDATE products SET
+                cost_price = ROUND((MAX(products.stock, 0) * products.cost_price + l.qty * l.unit_cost * :landed)
+                                   / (MAX(products.stock, 0) + l.qty), 4),
+                stock = products.stock + l.qty
+            FROM purchase_lines l
+            WHERE l.purchase_id = :id AND l.product_id = products.id
+        """, params)
+        cursor.execute("""
+            INSERT INTO inventory_logs (product_id, change_qty, reason, user_id, purchase_id)
+            SELECT product_id, qty, 'purchase', :user_id, :id FROM purchase_lines WHERE purchase_id = :id
+        """, params)
+        cursor.execute("""
+            INSERT INTO product_batches (product_id, batch_no, expiry_date, qty, received_qty, cost_price)
+            SELECT product_id, COALESCE(batch_no, 'GRN-' || :id), expiry_date, qty, qty, ROUND(unit_cost * :landed, 4)
+            FROM purchase_lines WHERE purchase_id = :id
+        """, params)
+        total_cost = round(totals['goods'] + totals['freight'], 2)
+        cursor.execute("UPDATE purchases SET total_cost = ? WHERE id = ?", (total_cost, purchase_id))
+    publish_stock_changes(product_ids, low_before)
+    return {'lines': totals['lines'], 'qty': totals['qty'], 'goods': round(totals['goods'], 2),
+            'freight': totals['freight'], 'total_cost': total_cost}
+
+def cancel_purchase(purchase_id: int):
+    """Discards a draft GRN without touching stock."""
+    conn = get_connection()
+    _check_draft(conn, purchase_id)
+    with conn:
+        conn.execute("DELETE FROM purchase_lines WHERE purchase_id = ?", (purchase_id,))
+        conn.execute("UPDATE purchases SET status = 'cancelled' WHERE id = ?", (purchase_id,))
+
+def get_purchases(limit: int = 100):
+    rows = get_connection().execute("""
+        SELECT p.*, (SELECT COUNT(*) FROM purchase_lines l WHERE l.purchase_id = p.id) as lines
+        FROM purchases p ORDER BY p.id DESC LIMIT ?
+    """, (limit,)).fetchall()
+    return [dict(r) for r in rows]
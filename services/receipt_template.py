@@ -0,0 +1,228 @@
+# services/receipt_template.py
+# Compiled receipt layouts shared by the thermal printer and the PDF renderer
+
+import textwrap
+from datetime import datetime
+from database.connection import get_connection
+
+
+# ── Paper formats ─────────────────────────────────────────────────────────
+# chars      : characters per line on the printed receipt
+# page_mm    : page width used by the PDF renderer
+# margin_mm  : left/right margin used by the PDF renderer
+# feed_lines : blank lines fed after the footer so the cutter clears the text
+PAPER_FORMATS = {
+    '58': {'chars': 32, 'page_mm': 58,  'margin_mm': 3,  'feed_lines': 3},
+    '80': {'chars': 48, 'page_mm': 80,  'margin_mm': 3,  'feed_lines': 3},
+    'A4': {'chars': 90, 'page_mm': 210, 'margin_mm': 15, 'feed_lines': 0},
+}
+
+# Settings that change the static parts of a receipt. Older installs store the
+# address/phone under the settings-screen keys, so both spellings are read.
+TEMPLATE_SETTING_KEYS = (
+    'shop_name', 'shop_address', 'address', 'shop_phone', 'phone',
+    'gst_number', 'receipt_footer', 'upi_id', 'paper_width',
+)
+
+
+def normalize_paper(value):
+    """Maps stored paper settings ('80', '80mm', 'a4', ...) to a PAPER_FORMATS key."""
+    value = (value or '80').strip().lower().replace('mm', '')
+    if value == 'a4':
+        return 'A4'
+    return value if value in PAPER_FORMATS else '80'
+
+
+# ── Text alignment helpers ────────────────────────────────────────────────
+def center(text, width):
+    return text.center(width)
+
+def left_right(left, right, width):
+    space = width - len(left) - len(right)
+    if space < 1: space = 1
+    return left + ' ' * space + right
+
+def divider(char='-', width=48):
+    return char * width
+
+def item_line(name, qty, rate, total, width=48):
+    if isinstance(qty, str):
+        # Column headings are passed through as text
+        qty_str, rate_str, total_str = qty, rate, total
+    else:
+        qty_str   = f'{qty:.0f}' if qty == int(qty) else f'{qty:.2f}'
+        rate_str  = f'{rate:.2f}'
+        total_str = f'{total:.2f}'
+    # Format: NAME(left) QTY(4) RATE(7) TOTAL(7)
+    right_part = f'{qty_str:>4} {rate_str:>7} {total_str:>7}'
+    name_width = width - len(right_part) - 1
+    # Truncate name if too long
+    if len(name) > name_width:
+        name = name[:name_width-2] + '..'
+    return f'{name:<{name_width}} {right_part}'
+
+
+# ── Compiled template ─────────────────────────────────────────────────────
+class ReceiptTemplate:
+    """
+    A receipt layout for one paper format and one set of shop settings.
+    Header, item table header and footer are built once in __init__;
+    render() only formats the invoice meta, item and total sections.
+
+    Lines are (tag, content) tuples. Tags: center_bold, center, center_small,
+    lr / lr_bold (content is a (left, right) tuple), normal, small, divider,
+    blank and qr_marker (content is the UPI id).
+    """
+    def __init__(self, paper, settings):
+        self.paper = paper
+        fmt = PAPER_FORMATS[paper]
+        self.width = fmt['chars']
+        self.page_mm = fmt['page_mm']
+        self.margin_mm = fmt['margin_mm']
+
+        self.shop_name = settings.get('shop_name') or 'MY SHOP'
+        self.upi_id = settings.get('upi_id') or ''
+        shop_address = settings.get('shop_address') or settings.get('address') or ''
+        shop_phone = settings.get('shop_phone') or settings.get('phone') or ''
+        gst_number = settings.get('gst_number') or ''
+        footer_msg = settings.get('receipt_footer') or 'Thank you! Visit Again.'
+
+        W = self.width
+        self.divider_line = ('divider', divider('-', W))
+        self.double_divider_line = ('divider', divider('=', W))
+
+        # HEADER
+        header = [('center_bold', self.shop_name.upper())]
+        if shop_address:
+            for addr_line in textwrap.wrap(shop_address, W-2):
+                header.append(('center', addr_line))
+        if shop_phone or gst_number:
+            ph_gst = f'Ph:{shop_phone}  GST:{gst_number}' if gst_number else f'Ph:{shop_phone}'
+            header.append(('center_small', ph_gst))
+        header.append(self.divider_line)
+        self.header = tuple(header)
+
+        # ITEMS HEADER
+        self.items_header = (
+            ('normal', item_line('ITEM', 'QTY', 'RATE', 'TOTAL', W)),
+            self.divider_line,
+        )
+
+        # FOOTER (QR image itself is drawn by the renderer with the bill amount)
+        footer = []
+        if self.upi_id:
+            footer.append(('qr_marker', self.upi_id))
+            footer.append(('center_small', f'Scan to pay: {self.upi_id}'))
+            footer.append(self.divider_line)
+        for fline in textwrap.wrap(footer_msg, W-2):
+            footer.append(('center', fline))
+        footer.append(('center_small', 'Powered by Smart POS'))
+        footer.extend([('blank', '')] * fmt['feed_lines'])
+        self.footer = tuple(footer)
+
+    def render(self, invoice_data):
+        """Returns the full list of receipt lines for one invoice."""
+        lines = list(self.header)
+        lines.extend(self._meta_section(invoice_data))
+        lines.extend(self.items_header)
+        lines.extend(self._items_section(invoice_data))
+        lines.append(self.divider_line)
+        lines.extend(self._totals_section(invoice_data))
+        lines.extend(self.footer)
+        return lines
+
+    def _meta_section(self, invoice_data):
+        inv_no = invoice_data.get('invoice_number', 'N/A')
+        inv_date = invoice_data.get('created_at', datetime.now().strftime('%d/%m/%Y %H:%M'))
+        if isinstance(inv_date, str) and len(inv_date) > 16:
+            inv_date = inv_date[:16]
+        cashier  = invoice_data.get('cashier_name', 'Staff')
+        customer = invoice_data.get('customer_name', 'Walk-in')
+        return [
+            ('lr', (f'Invoice:{inv_no}', str(inv_date))),
+            ('lr', (f'Cashier:{cashier}', f'Customer:{customer}')),
+            self.divider_line,
+        ]
+
+    def _items_section(self, invoice_data):
+        W = self.width
+        lines = []
+        for item in invoice_data.get('items', []):
+            name    = item.get('product_name', item.get('name', 'Item'))
+            qty     = item.get('qty', 1)
+            rate    = item.get('unit_price', 0)
+            total   = item.get('line_total', qty * rate)
+            gst_r   = item.get('gst_rate', 0)
+            gst_amt = item.get('gst_amt', 0)
+            disc    = item.get('discount', item.get('discount_pct', 0))
+
+            lines.append(('normal', item_line(name, qty, rate, total, W)))
+            if gst_r > 0 or disc > 0:
+                note_parts = []
+                if disc > 0: note_parts.append(f'Disc {disc:.0f}%')
+                if gst_r > 0: note_parts.append(f'GST {gst_r:.0f}%: Rs{gst_amt:.2f}')
+                lines.append(('small', '  ' + '  '.join(note_parts)))
+        return lines
+
+    def _totals_section(self, invoice_data):
+        subtotal = invoice_data.get('subtotal', 0)
+        disc_amt = invoice_data.get('discount_amt', 0)
+        cgst     = invoice_data.get('cgst_amt', 0)
+        sgst     = invoice_data.get('sgst_amt', 0)
+        total    = invoice_data.get('total', 0)
+        received = invoice_data.get('amount_received', total)
+        payment  = invoice_data.get('payment_mode', 'Cash').upper()
+        change   = received - total
+
+        lines = [('lr', ('Subtotal:', f'Rs{subtotal:.2f}'))]
+        if disc_amt > 0:
+            lines.append(('lr', ('Discount:', f'-Rs{disc_amt:.2f}')))
+        lines.append(('lr', ('CGST:', f'Rs{cgst:.2f}')))
+        lines.append(('lr', ('SGST:', f'Rs{sgst:.2f}')))
+        lines.append(self.double_divider_line)
+        lines.append(('lr_bold', ('TOTAL:', f'Rs{total:.2f}')))
+        lines.append(self.double_divider_line)
+
+        if payment == 'CASH':
+            lines.append(('lr', ('Cash Received:', f'Rs{received:.2f}')))
+            lines.append(('lr', ('Change Due:', f'Rs{change:.2f}')))
+        lines.append(('lr', ('Payment Mode:', payment)))
+        lines.append(self.divider_line)
+        return lines
+
+
+# ── Template cache ────────────────────────────────────────────────────────
+_compiled = {}
+
+def load_template_settings():
+    """Reads every receipt-related setting in a single query."""
+    conn = get_connection()
+    placeholders = ','.join('?' * len(TEMPLATE_SETTING_KEYS))
+    rows = conn.execute(
+        f'SELECT key, value FROM settings WHERE key IN ({placeholders})',
+        TEMPLATE_SETTING_KEYS
+    ).fetchall()
+    return {row[0]: row[1] for row in rows}
+
+def get_template(paper=None):
+    """
+    Returns the compiled template for the current settings.
+    The settings values themselves form the version key, so a template is
+    compiled once and reused until a shop or printer setting changes.
+    """
+    settings = load_template_settings()
+    paper = normalize_paper(paper or settings.get('paper_width'))
+    version = tuple(settings.get(k) for k in TEMPLATE_SETTING_KEYS)
+    key = (paper, version)
+
+    template = _compiled.get(key)
+    if template is None:
+        # Templates from an older settings version can never be requested again
+        for stale in [k for k in _compiled if k[1] != version]:
+            del _compiled[stale]
+        template = ReceiptTemplate(paper, settings)
+        _compiled[key] = template
+    return template
+
+def clear_template_cache():
+    _compiled.clear()
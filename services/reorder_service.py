@@ -0,0 +1,126 @@
+# services/reorder_service.py
+# Reorder suggestions for every product at once from recent sales velocity (NumPy)
+
+import math
+from datetime import date, datetime, timedelta
+import numpy as np
+from database.connection import get_connection
+from services import sales_snapshot
+
+# Velocity is a blend of moving averages: recent weeks react to trends,
+# the quarter smooths out one-off bulk sales
+WINDOWS = ((7, 0.5), (28, 0.3), (91, 0.2))  # (days, weight)
+HISTORY_DAYS = max(days for days, _ in WINDOWS)
+DEFAULT_LEAD_DAYS = 7    # supplier delivery time
+DEFAULT_COVER_DAYS = 14  # stock wanted on hand after a delivery
+
+
+def _setting(conn, key, default):
+    row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+    try:
+        return float(row[0]) if row else default
+    except ValueError:
+        return default
+
+
+def load_daily_sales(as_of, conn):
+    """
+    (product_ids, days_ago, qty) arrays for sales in the HISTORY_DAYS before as_of.
+    Reads the columnar sales snapshot when it covers the window, else aggregates in SQL.
+    """
+    first = as_of - timedelta(days=HISTORY_DAYS)
+    days = sales_snapshot.load_manifest()['days']
+    if days and days[-1] >= (as_of - timedelta(days=1)).isoformat():
+        cols = sales_snapshot.open_snapshot()
+        as_of_number = (as_of - sales_snapshot.EPOCH).days
+        mask = (cols['date'] >= as_of_number - HISTORY_DAYS) & (cols['date'] < as_of_number)
+        return (cols['product_id'][mask].astype(np.int64), as_of_number - cols['date'][mask],
+                cols['qty'][mask])
+
+    from services.report_service import day_bounds
+    rows = conn.execute("""
+        SELECT ii.product_id, substr(i.created_at, 1, 10), SUM(ii.qty)
+        FROM invoices i
+        JOIN invoice_items ii ON ii.invoice_id = i.id
+        WHERE i.created_at >= ? AND i.created_at < ?
+        GROUP BY ii.product_id, substr(i.created_at, 1, 10)
+    """, day_bounds(first.isoformat(), (as_of - timedelta(days=1)).isoformat())).fetchall()
+    if not rows:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0)
+    product_ids, days, qty = zip(*rows)
+    days_ago = {d: (as_of - date.fromisoformat(d)).days for d in set(days)}
+    return (np.array(product_ids, np.int64), np.fromiter((days_ago[d] for d in days), np.int64, len(days)),
+            np.array(qty, np.float64))
+
+
+def compute_suggestions(as_of=None, conn=None):
+    """
+    Suggested order quantities for all active products, as rows
+    (product_id, velocity, days_of_cover, suggested_qty) for products that need one.
+    """
+    conn = conn or get_connection()
+    as_of = date.fromisoformat(as_of) if isinstance(as_of, str) else (as_of or date.today())
+    lead_days = _setting(conn, 'reorder_lead_days', DEFAULT_LEAD_DAYS)
+    cover_days = _setting(conn, 'reorder_cover_days', DEFAULT_COVER_DAYS)
+
+    products = conn.execute("""
+        SELECT id, stock, low_stock_qty, unit FROM products WHERE is_active = 1 ORDER BY id
+    """).fetchall()
+    if not products:
+        return []
+    ids = np.fromiter((p[0] for p in products), np.int64, len(products))
+    stock = np.fromiter((p[1] or 0 for p in products), np.float64, len(products))
+    safety = np.fromiter((p[2] or 0 for p in products), np.float64, len(products))
+    whole_units = np.fromiter((p[3] in ('pcs', 'box') for p in products), bool, len(products))
+
+    sold_ids, days_ago, qty = load_daily_sales(as_of, conn)
+    index = np.searchsorted(ids, sold_ids)
+    known = (index < len(ids)) & (ids[np.minimum(index, len(ids) - 1)] == sold_ids)
+    index, days_ago, qty = index[known], days_ago[known], qty[known]
+
+    velocity = np.zeros(len(ids))
+    for window, weight in WINDOWS:
+        in_window = days_ago <= window
+        velocity += weight * np.bincount(index[in_window], weights=qty[in_window], minlength=len(ids)) / window
+
+    target = velocity * (lead_days + cover_days) + safety
+    suggested = np.maximum(target - stock, 0)
+    suggested = np.where(whole_units, np.ceil(suggested), np.round(suggested, 3))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cover = np.where(velocity > 0, np.maximum(stock, 0) / velocity, np.nan)
+
+    need = np.nonzero((suggested > 0) & (velocity > 0))[0]
+    return [(int(ids[i]), round(float(velocity[i]), 3),
+             None if math.isnan(cover[i]) else round(float(cover[i]), 1), float(suggested[i]))
+            for i in need]
+
+
+def save_suggestions(rows):
+    """Replaces purchase_suggestions with rows from compute_suggestions()."""
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    conn = get_connection()
+    with conn:
+        conn.execute("DELETE FROM purchase_suggestions")
+        conn.executemany("""
+            INSERT INTO purchase_suggestions (product_id, velocity, days_of_cover, suggested_qty, computed_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, [(*row, now) for row in rows])
+    return len(rows)
+
+
+def refresh_suggestions(as_of=None):
+    return save_suggestions(compute_suggestions(as_of))
+
+
+def get_suggestions(limit=None):
+    """Saved suggestions with product details, most urgent (least cover) first."""
+    conn = get_connection()
+    rows = conn.execute("""
+        SELECT s.product_id, p.name, p.stock, p.unit, s.velocity, s.days_of_cover,
+               s.suggested_qty, s.computed_at
+        FROM purchase_suggestions s
+        JOIN products p ON p.id = s.product_id
+        ORDER BY s.days_of_cover, s.suggested_qty DESC
+        LIMIT ?
+    """, (limit if limit is not None else -1,)).fetchall()
+    return [dict(r) for r in rows]
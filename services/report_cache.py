@@ -0,0 +1,169 @@
+# services/report_cache.py
+# Result cache for date-range reports: memory LRU, plus JSON on disk for closed ranges
+
+import os
+import json
+import sys
+import time
+import threading
+from collections import OrderedDict
+from datetime import date
+import database.connection
+from database.connection import get_connection
+from services import event_bus
+
+MEMORY_BUDGET = 32 * 2**20  # bytes, approximate
+OPEN_ENTRY_TTL = 5 * 60     # seconds
+
+# Bump a report's version whenever its columns or their meaning change, so
+# disk entries written by older code are never read back
+REPORT_VERSIONS = {'products': 2}  # v2: rows carry product_id
+
+_entries = OrderedDict()    # key -> (rows, size, closed, stored_at), most recently used last
+_used = 0
+_subscribed = False
+_generation = 0             # bumped by every invalidation
+_lock = threading.Lock()
+_stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+
+
+def cache_dir():
+    """Disk cache folder next to the database file."""
+    base = os.path.splitext(os.path.abspath(database.connection.DB_PATH))[0]
+    return base + '_report_cache'
+
+
+def cached_report(report, start_date, end_date, compute, conn=None):
+    """
+    Returns compute(start_date, end_date, conn) for the range, from the cache when possible.
+    Closed ranges are stored as computed: names joined from products (for
+    example) stay as they were at cache time until clear() is called.
+    """
+    global _subscribed
+    key = (report, start_date, end_date)
+    with _lock:
+        if not _subscribed:
+            event_bus.subscribe(event_bus.INVOICE_COMMITTED, _on_invoice_committed)
+            _subscribed = True
+        generation = _generation
+        entry = _entries.get(key)
+        if entry is not None and (entry[2] or time.monotonic() - entry[3] < OPEN_ENTRY_TTL):
+            _entries.move_to_end(key)
+            _stats['hits'] += 1
+            return entry[0]
+
+    conn = conn or get_connection()
+    closed = is_closed_range(start_date, end_date, conn)
+    rows = _load_disk(key) if closed else None
+    hit = rows is not None
+    if not hit:
+        rows = compute(start_date, end_date, conn)
+        if closed:
+            _save_disk(key, rows)
+    _put(key, rows, closed, generation, 'disk_hits' if hit else 'misses')
+    return rows
+
+
+def is_closed_range(start_date, end_date, conn):
+    """True if every day in the range is over and none of its invoices is still open."""
+    if end_date >= date.today().isoformat():
+        return False
+    from services.report_service import day_bounds
+    row = conn.execute("""
+        SELECT 1 FROM invoices WHERE day_closed = 0 AND created_at >= ? AND created_at < ? LIMIT 1
+    """, day_bounds(start_date, end_date)).fetchone()
+    return row is None
+
+
+def _put(key, rows, closed, generation, stat):
+    global _used
+    size = _deep_size(rows)
+    with _lock:
+        _stats[stat] += 1
+        if not closed and generation != _generation:
+            return # an invoice landed while computing; the rows may already be stale
+        old = _entries.pop(key, None)
+        if old is not None:
+            _used -= old[1]
+        if size > MEMORY_BUDGET:
+            return
+        _entries[key] = (rows, size, closed, time.monotonic())
+        _used += size
+        while _used > MEMORY_BUDGET:
+            _, evicted = _entries.popitem(last=False)
+            _used -= evicted[1]
+
+
+def _invalidate_day(day):
+    global _used, _generation
+    with _lock:
+        _generation += 1
+        for key in [k for k, e in _entries.items() if not e[2] and k[1] <= day <= k[2]]:
+            _used -= _entries.pop(key)[1]
+
+def _on_invoice_committed(event, invoice):
+    _invalidate_day(invoice.created_at[:10])
+
+
+# ── Disk layer (closed ranges only) ──────────────────────────────────────
+def _disk_path(key):
+    report, start_date, end_date = key
+    name = f"{report}_v{REPORT_VERSIONS.get(report, 1)}_{start_date}_{end_date}.json"
+    return os.path.join(cache_dir(), name)
+
+def _load_disk(key):
+    try:
+        with open(_disk_path(key), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _save_disk(key, rows):
+    path = _disk_path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(rows, f)
+        os.replace(tmp, path) # readers never see a half-written file
+    except OSError as e:
+        print(f"Report cache write failed: {e}")
+
+
+def _deep_size(obj):
+    """Approximate memory footprint of a report result (lists/dicts of scalars)."""
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(_deep_size(k) + _deep_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(_deep_size(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+def stats():
+    with _lock:
+        return dict(_stats, entries=len(_entries), bytes=_used)
+
+
+def clear(disk=True):
+    """Empties the memory cache, and the disk cache too unless disk=False."""
+    global _used, _generation
+    with _lock:
+        _entries.clear()
+        _used = 0
+        _generation += 1
+    folder = cache_dir()
+    if disk and os.path.isdir(folder):
+        for name in os.listdir(folder):
+            if name.endswith('.json'):
+                os.remove(os.path.join(folder, name))
+
+
+def reset():
+    """Forgets everything held in memory, including the event subscriptions."""
+    global _subscribed
+    event_bus.unsubscribe(event_bus.INVOICE_COMMITTED, _on_invoice_committed)
+    _subscribed = False
+    clear(disk=False)
+    with _lock:
+        for k in _stats:
+            _stats[k] = 0
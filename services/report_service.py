@@ -1,13 +1,33 @@
+from datetime import date, timedelta
 from database.connection import get_connection
+from services import top_sellers, report_cache, gst_return_service
 import csv
 
-def get_daily_summary(date_str: str):
-    conn = get_connection()
+# Report functions take an optional conn so they can run on a worker thread's
+# own read connection (database.connection.get_read_connection).
+# Dates are filtered as created_at >= start AND created_at < end + 1 day,
+# which can use idx_invoices_created_at; date(created_at) cannot.
+
+def day_bounds(start_date: str, end_date: str = None):
+    """Half-open created_at range [start, end + 1 day) for 'YYYY-MM-DD' dates."""
+    end = date.fromisoformat(end_date or start_date) + timedelta(days=1)
+    return start_date, end.isoformat()
+
+def iter_date_chunks(start_date: str, end_date: str, chunk_days: int):
+    """Splits an inclusive date range into consecutive (start, end) ranges of chunk_days."""
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    while start <= end:
+        chunk_end = min(start + timedelta(days=chunk_days - 1), end)
+        yield start.isoformat(), chunk_end.isoformat()
+        start = chunk_end + timedelta(days=1)
+
+def get_daily_summary(date_str: str, conn=None):
+    conn = conn or get_connection()
     cursor = conn.cursor()
     cursor.execute("""
         SELECT COUNT(id) as bills, SUM(total) as sales, SUM(cgst_amt + sgst_amt) as tax
-        FROM invoices WHERE date(created_at) = date(?)
-    """, (date_str,))
+        FROM invoices WHERE created_at >= ? AND created_at < ?
+    """, day_bounds(date_str))
     row = cursor.fetchone()
     return {
         "bills": row['bills'] or 0,
@@ -15,8 +35,8 @@ def get_daily_summary(date_str: str):
         "tax": row['tax'] or 0.0
     }
 
-def get_day_summary(date_str: str):
-    conn = get_connection()
+def get_day_summary(date_str: str, conn=None):
+    conn = conn or get_connection()
     cursor = conn.cursor()
     cursor.execute("""
         SELECT COUNT(id) as invoice_count, SUM(total) as grand_total,
@@ -26,8 +46,8 @@ def get_day_summary(date_str: str):
                SUM(CASE WHEN payment_mode='credit' THEN total ELSE 0 END) as credit_total,
                SUM(cgst_amt) as cgst_total, SUM(sgst_amt) as sgst_total,
                MAX(day_closed) as already_closed
-        FROM invoices WHERE date(created_at) = date(?)
-    """, (date_str,))
+        FROM invoices WHERE created_at >= ? AND created_at < ?
+    """, day_bounds(date_str))
     row = cursor.fetchone()
     
     inv_count = row['invoice_count'] or 0
@@ -63,8 +83,8 @@ def close_day(date_str: str, user_id: int):
             cursor.execute("""
                 UPDATE invoices 
                 SET day_closed = 1, day_closed_at = ? 
-                WHERE date(created_at) = date(?)
-            """, (now, date_str))
+                WHERE created_at >= ? AND created_at < ?
+            """, (now, *day_bounds(date_str)))
             
             # Create log
             cursor.execute("""
@@ -73,25 +93,50 @@ def close_day(date_str: str, user_id: int):
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (date_str, summary['cash_total'], summary['upi_total'], summary['card_total'], summary['credit_total'],
                   summary['grand_total'], summary['invoice_count'], user_id, now))
+            
+            # Freeze the day's top sellers so later lookups are O(K)
+            top_sellers.save_snapshot(cursor, date_str)
+            gst_return_service.save_snapshot(cursor, date_str)
     except Exception as e:
         raise ValueError(f"Failed to close day: {e}")
 
-def get_product_sales(start_date: str, end_date: str):
-    conn = get_connection()
+def update_derived_data(conn=None):
+    """
+    Brings data derived from closed days up to date after close_day commits:
+    the columnar sales snapshot and the stock checkpoints. A failing step
+    never undoes the close or skips the other one. Returns
+    {snapshot_rows, checkpoints, errors: [message]}.
+    """
+    from services.sales_snapshot import append_closed_days
+    from services.stock_ledger import write_checkpoints
+    conn = conn or get_connection()
+    stats = {'snapshot_rows': 0, 'checkpoints': 0, 'errors': []}
+    try:
+        stats['snapshot_rows'] = append_closed_days(conn)
+    except Exception as e:
+        stats['errors'].append(f"Sales snapshot update failed: {e}")
+    try:
+        stats['checkpoints'] = write_checkpoints(conn)
+    except Exception as e:
+        stats['errors'].append(f"Stock checkpoint failed: {e}")
+    return stats
+
+def get_product_sales(start_date: str, end_date: str, conn=None):
+    conn = conn or get_connection()
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT p.name, SUM(ii.qty) as qty_sold, SUM(ii.line_total) as revenue
+        SELECT p.name, SUM(ii.qty) as qty_sold, SUM(ii.line_total) as revenue, p.id as product_id
         FROM invoice_items ii
         JOIN invoices i ON ii.invoice_id = i.id
         JOIN products p ON ii.product_id = p.id
-        WHERE date(i.created_at) BETWEEN date(?) AND date(?)
+        WHERE i.created_at >= ? AND i.created_at < ?
         GROUP BY p.id
         ORDER BY qty_sold DESC
-    """, (start_date, end_date))
+    """, day_bounds(start_date, end_date))
     return [dict(row) for row in cursor.fetchall()]
 
-def get_gst_summary(start_date: str, end_date: str):
-    conn = get_connection()
+def get_gst_summary(start_date: str, end_date: str, conn=None):
+    conn = conn or get_connection()
     cursor = conn.cursor()
     cursor.execute("""
         SELECT ii.gst_rate, 
@@ -101,10 +146,35 @@ def get_gst_summary(start_date: str, end_date: str):
                SUM(ii.gst_amt) as total_tax
         FROM invoice_items ii
         JOIN invoices i ON ii.invoice_id = i.id
-        WHERE date(i.created_at) BETWEEN date(?) AND date(?)
+        WHERE i.created_at >= ? AND i.created_at < ?
         GROUP BY ii.gst_rate
-    """, (start_date, end_date))
+    """, day_bounds(start_date, end_date))
     return [dict(row) for row in cursor.fetchall()]
+
+# ── Chunked reports ──────────────────────────────────────────────────────
+# Generators yielding (chunks_done, chunks_total, rows_so_far) so a long range
+# can show progress and partial results; the last yield is the full report.
+# Each chunk goes through report_cache, so closed weeks are computed once.
+
+def iter_gst_summary(start_date: str, end_date: str, conn=None, chunk_days: int = 7):
+    chunks = list(iter_date_chunks(start_date, end_date, chunk_days))
+    totals = {}
+    for done, (chunk_start, chunk_end) in enumerate(chunks, start=1):
+        for row in report_cache.cached_report('gst', chunk_start, chunk_end, get_gst_summary, conn):
+            acc = totals.setdefault(row['gst_rate'], dict(row, taxable_value=0.0, cgst=0.0, sgst=0.0, total_tax=0.0))
+            for key in ('taxable_value', 'cgst', 'sgst', 'total_tax'):
+                acc[key] += row[key]
+        yield done, len(chunks), sorted(totals.values(), key=lambda r: r['gst_rate'])
+
+def iter_product_sales(start_date: str, end_date: str, conn=None, chunk_days: int = 7):
+    chunks = list(iter_date_chunks(start_date, end_date, chunk_days))
+    totals = {}
+    for done, (chunk_start, chunk_end) in enumerate(chunks, start=1):
+        for row in report_cache.cached_report('products', chunk_start, chunk_end, get_product_sales, conn):
+            acc = totals.setdefault(row['product_id'], dict(row, qty_sold=0, revenue=0.0))
+            acc['qty_sold'] += row['qty_sold']
+            acc['revenue'] += row['revenue']
+        yield done, len(chunks), sorted(totals.values(), key=lambda r: r['qty_sold'], reverse=True)
     
 def export_csv(data: list, filepath: str):
     if not data: return
@@ -113,3 +183,16 @@ def export_csv(data: list, filepath: str):
         writer = csv.DictWriter(f, fieldnames=keys)
         writer.writeheader()
         writer.writerows(data)
+
+def get_invoice_register(start_date: str, end_date: str, conn=None):
+    conn = conn or get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT i.invoice_number, i.created_at, c.name as customer, i.subtotal, i.discount_amt,
+               i.cgst_amt, i.sgst_amt, i.total, i.payment_mode, i.payment_status
+        FROM invoices i
+        LEFT JOIN customers c ON i.customer_id = c.id
+        WHERE i.created_at >= ? AND i.created_at < ?
+        ORDER BY i.id
+    """, day_bounds(start_date, end_date))
+    return [dict(row) for row in cursor.fetchall()]
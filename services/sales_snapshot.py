@@ -0,0 +1,193 @@
+# services/sales_snapshot.py
+# Append-only columnar copy of closed days' invoice lines (.npy per column), read with np.memmap
+
+import os
+import json
+import threading
+from datetime import date
+import numpy as np
+import database.connection
+from database.connection import get_connection
+
+# One file per column; 'date' is days since 1970-01-01
+COLUMNS = {
+    'date': np.int32,
+    'hour': np.int8,
+    'invoice_id': np.int64,
+    'product_id': np.int32,
+    'qty': np.float64,
+    'line_total': np.float64,
+    'gst_rate': np.float32,
+    'payment_mode': np.int8,
+}
+PAYMENT_CODES = {'cash': 0, 'upi': 1, 'card': 2, 'credit': 3}  # anything else is -1
+
+# .npy header padded to a fixed size, so appending only rewrites the shape in place
+HEADER_LEN = 128
+FLUSH_ROWS = 500_000
+EPOCH = date(1970, 1, 1)
+
+_lock = threading.Lock()
+
+
+def snapshot_dir():
+    """Column files folder next to the database file."""
+    base = os.path.splitext(os.path.abspath(database.connection.DB_PATH))[0]
+    return base + '_columns'
+
+
+def load_manifest():
+    try:
+        with open(os.path.join(snapshot_dir(), 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {'rows': 0, 'days': [], 'last_invoice_id': 0}
+    if 'last_invoice_id' not in manifest: # written before the high-water mark existed
+        ids = open_snapshot(manifest['rows'])['invoice_id']
+        manifest['last_invoice_id'] = int(ids.max()) if len(ids) else 0
+    return manifest
+
+
+def _save_manifest(manifest):
+    path = os.path.join(snapshot_dir(), 'manifest.json')
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp, path) # the manifest is the commit point for appended rows
+
+
+def _header(dtype, rows):
+    text = repr({'descr': np.dtype(dtype).str, 'fortran_order': False, 'shape': (rows,)})
+    text = text.ljust(HEADER_LEN - 10 - 1) + '\n'
+    return b'\x93NUMPY\x01\x00' + (HEADER_LEN - 10).to_bytes(2, 'little') + text.encode('latin1')
+
+
+def append_closed_days(conn=None):
+    """
+    Appends every closed day not yet in the snapshot, plus lines billed on
+    already-appended days after their close (invoice ids above the manifest's
+    high-water mark). Returns the number of rows added. Safe to re-run: rows
+    past the manifest's count (from an interrupted append) are truncated away first.
+    """
+    conn = conn or get_connection()
+    with _lock:
+        os.makedirs(snapshot_dir(), exist_ok=True)
+        manifest = load_manifest()
+        done = set(manifest['days'])
+        days = [r[0] for r in conn.execute("SELECT DISTINCT close_date FROM day_close_log ORDER BY close_date")
+                if r[0] not in done]
+
+        for name, dtype in COLUMNS.items():
+            path = os.path.join(snapshot_dir(), f"{name}.npy")
+            if not os.path.exists(path):
+                with open(path, 'wb') as f:
+                    f.write(_header(dtype, 0))
+            with open(path, 'r+b') as f:
+                f.truncate(HEADER_LEN + manifest['rows'] * np.dtype(dtype).itemsize)
+
+        # Late lines go in the first flush, before any new day can raise the high-water mark past them
+        added, pending, pending_days = 0, _late_rows(manifest, days, conn), []
+        for day in days:
+            pending.extend(_day_rows(day, conn))
+            pending_days.append(day)
+            if len(pending) >= FLUSH_ROWS:
+                added += _flush(manifest, pending, pending_days)
+                pending, pending_days = [], []
+        if pending or pending_days:
+            added += _flush(manifest, pending, pending_days)
+        return added
+
+
+_LINES = """
+    SELECT i.id, i.created_at, i.payment_mode, ii.product_id, ii.qty, ii.line_total, ii.gst_rate
+    FROM invoices i
+    JOIN invoice_items ii ON ii.invoice_id = i.id
+"""
+
+def _row(r):
+    day_number = (date.fromisoformat(r[1][:10]) - EPOCH).days
+    return (day_number, int(r[1][11:13] or 0), r[0], r[3], r[4], r[5], r[6] or 0.0,
+            PAYMENT_CODES.get(r[2], -1))
+
+
+def _day_rows(day, conn):
+    from services.report_service import day_bounds
+    rows = conn.execute(_LINES + "WHERE i.created_at >= ? AND i.created_at < ?", day_bounds(day))
+    return [_row(r) for r in rows]
+
+
+def _late_rows(manifest, new_days, conn):
+    """Lines of appended days from invoices above the high-water mark, i.e. billed after the close."""
+    done, new_days = set(manifest['days']), set(new_days)
+    rows = conn.execute(_LINES + "WHERE i.id > ? ORDER BY i.id", (manifest['last_invoice_id'],))
+    return [_row(r) for r in rows if r[1][:10] in done and r[1][:10] not in new_days]
+
+
+def _flush(manifest, rows, days):
+    columns = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+    total = manifest['rows'] + len(rows)
+    for (name, dtype), values in zip(COLUMNS.items(), columns):
+        path = os.path.join(snapshot_dir(), f"{name}.npy")
+        with open(path, 'r+b') as f:
+            f.seek(0, os.SEEK_END)
+            f.write(np.asarray(values, dtype=dtype).tobytes())
+            f.seek(0)
+            f.write(_header(dtype, total))
+    manifest['rows'] = total
+    manifest['days'] = sorted(set(manifest['days']) | set(days))
+    manifest['last_invoice_id'] = max([manifest['last_invoice_id'], *columns[2]])
+    _save_manifest(manifest)
+    return len(rows)
+
+
+def open_snapshot(rows=None):
+    """{column: read-only np.memmap} for the committed rows."""
+    rows = load_manifest()['rows'] if rows is None else rows
+    return {name: np.memmap(os.path.join(snapshot_dir(), f"{name}.npy"), dtype=dtype, mode='r',
+                            offset=HEADER_LEN, shape=(rows,)) if rows else np.empty(0, dtype)
+            for name, dtype in COLUMNS.items()}
+
+
+# ── Analytics over the memory-mapped columns ─────────────────────────────
+def _range_mask(cols, start_date=None, end_date=None):
+    mask = np.ones(len(cols['date']), dtype=bool)
+    if start_date:
+        mask &= cols['date'] >= (date.fromisoformat(start_date) - EPOCH).days
+    if end_date:
+        mask &= cols['date'] <= (date.fromisoformat(end_date) - EPOCH).days
+    return mask
+
+
+def hourly_heatmap(start_date=None, end_date=None, cols=None):
+    """7x24 revenue array, rows Monday..Sunday, columns hour of day."""
+    cols = cols or open_snapshot()
+    mask = _range_mask(cols, start_date, end_date)
+    weekday = (cols['date'][mask] + 3) % 7 # 1970-01-01 was a Thursday
+    cell = weekday.astype(np.int64) * 24 + cols['hour'][mask]
+    return np.bincount(cell, weights=cols['line_total'][mask], minlength=7 * 24).reshape(7, 24)
+
+
+def basket_sizes(start_date=None, end_date=None, cols=None):
+    """Array where [n] is the number of invoices with n lines."""
+    cols = cols or open_snapshot()
+    invoices = cols['invoice_id'][_range_mask(cols, start_date, end_date)]
+    if not len(invoices):
+        return np.zeros(1, dtype=np.int64)
+    lines_per_invoice = np.bincount(invoices - invoices.min())
+    return np.bincount(lines_per_invoice[lines_per_invoice > 0])
+
+
+def product_velocity(start_date=None, end_date=None, top=20, cols=None):
+    """[{product_id, qty_per_day, revenue}] for the top fastest-moving products."""
+    cols = cols or open_snapshot()
+    mask = _range_mask(cols, start_date, end_date)
+    days = cols['date'][mask]
+    if not len(days):
+        return []
+    products = cols['product_id'][mask]
+    qty = np.bincount(products, weights=cols['qty'][mask])
+    revenue = np.bincount(products, weights=cols['line_total'][mask])
+    span = int(days.max() - days.min()) + 1
+    best = np.argsort(qty)[::-1][:top]
+    return [{'product_id': int(pid), 'qty_per_day': round(float(qty[pid]) / span, 3),
+             'revenue': round(float(revenue[pid]), 2)} for pid in best if qty[pid] > 0]
@@ -0,0 +1,78 @@
+# services/stock_ledger.py
+# inventory_logs as the stock ledger: per-product checkpoints, stock as of a moment, reconciliation
+
+from datetime import datetime
+from database.connection import get_connection
+
+# Latest checkpoint per product (SQLite returns the bare columns of the MAX row)
+_LATEST_CHECKPOINTS = """
+    SELECT product_id, MAX(log_id) as log_id, qty FROM stock_checkpoints GROUP BY product_id
+"""
+
+def write_checkpoints(conn=None) -> int:
+    """
+    Checkpoints every product whose ledger moved since the last run, in one
+    statement over the new log rows only. Returns the number of rows written.
+    """
+    conn = conn or get_connection()
+    with conn:
+        last = conn.execute("SELECT COALESCE(MAX(log_id), 0) FROM stock_checkpoints").fetchone()[0]
+        upto = conn.execute("SELECT COALESCE(MAX(id), 0) FROM inventory_logs").fetchone()[0]
+        if upto <= last:
+            return 0
+        return conn.execute(f"""
+            INSERT INTO stock_checkpoints (product_id, log_id, qty)
+            SELECT t.product_id, ?, COALESCE(c.qty, 0) + t.delta
+            FROM (SELECT product_id, SUM(change_qty) as delta FROM inventory_logs
+                  WHERE id > ? AND id <= ? GROUP BY product_id) t
+            LEFT JOIN ({_LATEST_CHECKPOINTS}) c ON c.product_id = t.product_id
+        """, (upto, last, upto)).rowcount
+
+def stock_as_of(product_id: int, at: str = None, conn=None) -> float:
+    """Ledger stock of a product at a moment ('YYYY-MM-DD HH:MM:SS', default now): checkpoint plus tail."""
+    conn = conn or get_connection()
+    at = at or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    checkpoint = conn.execute("""
+        SELECT log_id, qty FROM stock_checkpoints
+        WHERE product_id = ? AND created_at <= ?
+        ORDER BY log_id DESC LIMIT 1
+    """, (product_id, at)).fetchone()
+    log_id, qty = (checkpoint['log_id'], checkpoint['qty']) if checkpoint else (0, 0.0)
+    tail = conn.execute("""
+        SELECT COALESCE(SUM(change_qty), 0) FROM inventory_logs
+        WHERE product_id = ? AND id > ? AND created_at <= ?
+    """, (product_id, log_id, at)).fetchone()[0]
+    return qty + tail
+
+def reconcile(conn=None):
+    """
+    Products whose stock column disagrees with the ledger, as
+    [{product_id, name, stock, ledger_qty, difference}].
+    """
+    conn = conn or get_connection()
+    rows = conn.execute(f"""
+        SELECT product_id, name, stock, ledger_qty, stock - ledger_qty as difference
+        FROM (
+            SELECT p.id as product_id, p.name, p.stock,
+                   COALESCE(c.qty, 0) + COALESCE((SELECT SUM(l.change_qty) FROM inventory_logs l
+                                                  WHERE l.product_id = p.id AND l.id > COALESCE(c.log_id, 0)), 0)
+                       as ledger_qty
+            FROM products p
+            LEFT JOIN ({_LATEST_CHECKPOINTS}) c ON c.product_id = p.id
+        )
+        WHERE ABS(stock - ledger_qty) > 1e-6
+        ORDER BY ABS(difference) DESC
+    """).fetchall()
+    return [dict(r) for r in rows]
+
+def apply_ledger(mismatches, conn=None) -> int:
+    """Sets products.stock to the ledger quantity for reconcile() results."""
+    from services.inventory_service import get_low_stock_flags, publish_stock_changes
+    conn = conn or get_connection()
+    product_ids = [m['product_id'] for m in mismatches]
+    low_before = get_low_stock_flags(product_ids)
+    with conn:
+        conn.executemany("UPDATE products SET stock = ? WHERE id = ?",
+                         [(m['ledger_qty'], m['product_id']) for m in mismatches])
+    publish_stock_changes(product_ids, low_before)
+    return len(mismatches)
@@ -0,0 +1,138 @@
+# services/stock_take_service.py
+# Stock-take sessions: scans accumulate in stock_take_counts, closing applies every variance in one transaction
+
+from database.connection import get_connection
+from services.inventory_service import get_low_stock_flags, publish_stock_changes
+from services.batch_service import consume_fefo
+
+def get_open_stock_take():
+    row = get_connection().execute("SELECT * FROM stock_takes WHERE status = 'open'").fetchone()
+    return dict(row) if row else None
+
+def start_stock_take(user_id: int = None, note: str = '') -> int:
+    """Opens a session; only one can be open at a time."""
+    conn = get_connection()
+    with conn:
+        if conn.execute("SELECT 1 FROM stock_takes WHERE status = 'open'").fetchone():
+            raise ValueError("A stock take is already open.")
+        return conn.execute("INSERT INTO stock_takes (note, started_by) VALUES (?, ?)",
+                            (note or None, user_id)).lastrowid
+
+def _check_open(conn, take_id):
+    row = conn.execute("SELECT status FROM stock_takes WHERE id = ?", (take_id,)).fetchone()
+    if not row:
+        raise ValueError(f"Stock take {take_id} not found.")
+    if row['status'] != 'open':
+        raise ValueError(f"Stock take {take_id} is {row['status']}.")
+
+# One statement per scan: adds to the count, or stages the product with its current stock
+_COUNT_SQL = """
+    INSERT INTO stock_take_counts (take_id, product_id, counted_qty, system_qty)
+    SELECT ?, id, ?, stock FROM products WHERE {match}
+    ON CONFLICT(take_id, product_id) DO UPDATE SET
+        counted_qty = CASE WHEN ? THEN excluded.counted_qty ELSE counted_qty + excluded.counted_qty END,
+        counted_at = datetime('now','localtime')
+"""
+
+def record_scan(take_id: int, barcode: str, qty: float = 1, replace: bool = False):
+    """
+    Counts qty of the product with this barcode (or sku). Returns
+    (product_id, counted_qty so far). replace=True overwrites the count.
+    """
+    conn = get_connection()
+    _check_open(conn, take_id)
+    with conn:
+        row = conn.execute(_COUNT_SQL.format(match="barcode = ? OR sku = ? LIMIT 1")
+                           + " RETURNING product_id, counted_qty",
+                           (take_id, qty, barcode, barcode, replace)).fetchone()
+    if not row:
+        raise ValueError(f"No product with barcode or SKU '{barcode}'.")
+    return row['product_id'], row['counted_qty']
+
+def record_counts(take_id: int, counts, replace: bool = False) -> int:
+    """Stages many (product_id, qty) counts in one transaction, e.g. from a handheld's export."""
+    conn = get_connection()
+    _check_open(conn, take_id)
+    with conn:
+        conn.executemany(_COUNT_SQL.format(match="id = ?"), ((take_id, qty, product_id, replace) for product_id, qty in counts))
+    return conn.execute("SELECT COUNT(*) FROM stock_take_counts WHERE take_id = ?", (take_id,)).fetchone()[0]
+
+def get_stock_take_lines(take_id: int, product_id: int = None):
+    """Counted products (or just product_id) with system qty, counted qty and variance, largest variance value first."""
+    conn = get_connection()
+    rows = conn.execute("""
+        SELECT c.product_id, p.name, p.unit, c.system_qty, c.counted_qty,
+               c.counted_qty - c.system_qty as variance,
+               (c.counted_qty - c.system_qty) * p.cost_price as variance_value
+        FROM stock_take_counts c
+        JOIN products p ON p.id = c.product_id
+        WHERE c.take_id = ? AND (? IS NULL OR c.product_id = ?)
+        ORDER BY ABS(variance_value) DESC, p.name
+    """, (take_id, product_id, product_id)).fetchall()
+    return [dict(r) for r in rows]
+
+def close_stock_take(take_id: int, user_id: int = None):
+    """
+    Applies every variance (counted - stock at the first scan) on top of the
+    current stock, logged as 'stock_take', all in one transaction.
+    Returns {counted, adjusted, net_qty, net_value}.
+    """
+    conn = get_connection()
+    _check_open(conn, take_id)
+    changed = [r[0] for r in conn.execute("""
+        SELECT product_id FROM stock_take_counts WHERE take_id = ? AND counted_qty != system_qty
+    """, (take_id,))]
+    low_before = get_low_stock_flags(changed)
+    
+    with conn:
+        summary = conn.execute("""
+            SELECT COUNT(*) as counted,
+                   COALESCE(SUM(c.counted_qty != c.system_qty), 0) as adjusted,
+                   COALESCE(SUM(c.counted_qty - c.system_qty), 0) as net_qty,
+                   ROUND(COALESCE(SUM((c.counted_qty - c.system_qty) * p.cost_price), 0), 2) as net_value
+            FROM stock_take_counts c
+            JOIN products p ON p.id = c.product_id
+            WHERE c.take_id = ?
+        """, (take_id,)).fetchone()
+        conn.execute("""
+            INSERT INTO inventory_logs (product_id, change_qty, reason, user_id)
+            SELECT product_id, counted_qty - system_qty, 'stock_take', ?
+            FROM stock_take_counts
+            WHERE take_id = ? AND counted_qty != system_qty
+        """, (user_id, take_id))
+        conn.execute("""
+            UPDATE products SET stock = stock + c.counted_qty - c.system_qty
+            FROM stock_take_counts c
+            WHERE c.take_id = ? AND c.product_id = products.id AND c.counted_qty != c.system_qty
+        """, (take_id,))
+        # Batches follow the count: surplus is a batch of unknown expiry, shortfall leaves FEFO
+        conn.execute("""
+            INSERT INTO product_batches (product_id, batch_no, qty, received_qty)
+            SELECT product_id, 'STOCK_TAKE', counted_qty - system_qty, counted_qty - system_qty
+            FROM stock_take_counts
+            WHERE take_id = ? AND counted_qty > system_qty
+        """, (take_id,))
+        shortfalls = conn.execute("""
+            SELECT product_id, system_qty - counted_qty FROM stock_take_counts
+            WHERE take_id = ? AND counted_qty < system_qty
+        """, (take_id,)).fetchall()
+        cursor = conn.cursor()
+        for product_id, qty in shortfalls:
+            consume_fefo(cursor, product_id, qty)
+        conn.execute("""
+            UPDATE stock_takes SET status = 'closed', closed_by = ?, closed_at = datetime('now','localtime')
+            WHERE id = ?
+        """, (user_id, take_id))
+    publish_stock_changes(changed, low_before)
+    return dict(summary)
+
+def cancel_stock_take(take_id: int, user_id: int = None):
+    """Discards the session's counts without touching stock."""
+    conn = get_connection()
+    _check_open(conn, take_id)
+    with conn:
+        conn.execute("DELETE FROM stock_take_counts WHERE take_id = ?", (take_id,))
+        conn.execute("""
+            UPDATE stock_takes SET status = 'cancelled', closed_by = ?, closed_at = datetime('now','localtime')
+            WHERE id = ?
+        """, (user_id, take_id))
@@ -0,0 +1,130 @@
+# services/top_sellers.py
+# Per-day top sellers kept current from INVOICE_COMMITTED; closed days read daily_top_products
+
+import threading
+from datetime import date
+from database.connection import get_connection
+from services import event_bus
+
+TOP_K = 10  # entries kept per day; get_top_products(k) serves any k <= TOP_K in O(k)
+
+
+class DayLeaderboard:
+    def __init__(self, day, k=TOP_K):
+        self.day = day
+        self.k = k
+        self.totals = {}         # product_id -> [name, qty_sold, revenue]
+        self.top = []            # product ids, best first, at most k
+        self.last_invoice_id = 0 # invoices up to this id are already counted
+
+    @classmethod
+    def load(cls, day, k=TOP_K, conn=None):
+        board = cls(day, k)
+        conn = conn or get_connection()
+        rows = conn.execute("""
+            SELECT ii.product_id, MAX(ii.product_name) as name, SUM(ii.qty) as qty_sold,
+                   SUM(ii.line_total) as revenue, MAX(i.id) as last_id
+            FROM invoice_items ii
+            JOIN invoices i ON ii.invoice_id = i.id
+            WHERE i.created_at >= ? AND i.created_at < date(?, '+1 day')
+            GROUP BY ii.product_id
+        """, (day, day)).fetchall()
+        for r in rows:
+            board.totals[r['product_id']] = [r['name'], r['qty_sold'], r['revenue']]
+            board.last_invoice_id = max(board.last_invoice_id, r['last_id'])
+        board.rerank()
+        return board
+
+    def rerank(self):
+        self.top = sorted(self.totals, key=self._sort_key)[:self.k]
+
+    def _sort_key(self, product_id):
+        name, qty, revenue = self.totals[product_id]
+        return (-qty, -revenue, name)
+
+    def add_invoice(self, invoice):
+        if invoice.id <= self.last_invoice_id:
+            return
+        self.last_invoice_id = invoice.id
+        for item in invoice.items:
+            entry = self.totals.setdefault(item.product_id, [item.product_name, 0, 0.0])
+            entry[1] += item.qty
+            entry[2] += item.line_total
+            self._promote(item.product_id)
+
+    def _promote(self, product_id):
+        if product_id in self.top:
+            pass
+        elif len(self.top) < self.k:
+            self.top.append(product_id)
+        elif self._sort_key(product_id) < self._sort_key(self.top[-1]):
+            self.top[-1] = product_id
+        else:
+            return
+        self.top.sort(key=self._sort_key)
+
+    def top_k(self, k):
+        return [{'product_id': pid, 'name': self.totals[pid][0],
+                 'qty_sold': self.totals[pid][1], 'revenue': self.totals[pid][2]}
+                for pid in self.top[:k]]
+
+
+_today = None
+_lock = threading.Lock()
+
+
+def _on_invoice_committed(event, invoice):
+    with _lock:
+        if _today is not None and invoice.created_at.startswith(_today.day):
+            _today.add_invoice(invoice)
+
+
+def get_top_products(day=None, k=5):
+    """Top k products sold on day (default today): [{product_id, name, qty_sold, revenue}]."""
+    global _today
+    today = date.today().isoformat()
+    day = day or today
+    if day == today and k <= TOP_K:
+        with _lock:
+            if _today is None:
+                event_bus.subscribe(event_bus.INVOICE_COMMITTED, _on_invoice_committed)
+            if _today is None or _today.day != day:
+                _today = DayLeaderboard.load(day)
+            return _today.top_k(k)
+
+    if k <= TOP_K and not has_open_invoices(day):
+        rows = get_connection().execute("""
+            SELECT product_id, name, qty_sold, revenue FROM daily_top_products
+            WHERE close_date = ? ORDER BY rank LIMIT ?
+        """, (day, k)).fetchall()
+        if rows:
+            return [dict(r) for r in rows]
+    # Day not closed yet, billed after its close, or k beyond the snapshot: aggregate it
+    return DayLeaderboard.load(day, k).top_k(k)
+
+
+def has_open_invoices(day, conn=None):
+    """True if day has invoices not yet covered by a day close (e.g. billed after it)."""
+    conn = conn or get_connection()
+    return conn.execute("""
+        SELECT 1 FROM invoices WHERE day_closed = 0 AND created_at >= ? AND created_at < date(?, '+1 day') LIMIT 1
+    """, (day, day)).fetchone() is not None
+
+
+def save_snapshot(cursor, day):
+    """Writes the day's top TOP_K into daily_top_products. Called inside close_day's transaction."""
+    board = DayLeaderboard.load(day, conn=cursor.connection)
+    cursor.execute("DELETE FROM daily_top_products WHERE close_date = ?", (day,))
+    cursor.executemany("""
+        INSERT INTO daily_top_products (close_date, rank, product_id, name, qty_sold, revenue)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, [(day, rank, e['product_id'], e['name'], e['qty_sold'], e['revenue'])
+          for rank, e in enumerate(board.top_k(TOP_K), start=1)])
+
+
+def reset():
+    """Drops today's board; it is rebuilt from the database on the next read."""
+    global _today
+    with _lock:
+        event_bus.unsubscribe(event_bus.INVOICE_COMMITTED, _on_invoice_committed)
+        _today = None
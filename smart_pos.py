@@ -0,0 +1,336 @@
+"""
+Smart POS command-line tool for batch jobs. It never imports Qt, and each
+command imports only the services it needs, so it is safe to run from cron
+or Task Scheduler while the till is open.
+
+    python smart_pos.py import products catalog.csv
+    python smart_pos.py import products supplier.xlsx --dry-run --diff changes.csv
+    python smart_pos.py export invoices march.csv --from 2024-03-01 --to 2024-03-31
+    python smart_pos.py export lines 2024.csv.gz --from 2024-01-01 --to 2024-12-31
+    python smart_pos.py report day --date 2024-03-31
+    python smart_pos.py gstr1 2024-03 gstr1_march.json
+    python smart_pos.py prices due
+    python smart_pos.py grn delivery.csv --supplier "Metro" --freight 250 --post
+    python smart_pos.py labels shelf.pdf --ids 12 13 14 --copies 2
+    python smart_pos.py backup D:\\Backups
+    python smart_pos.py close-day --user admin
+
+Product CSV/XLSX columns: name, sku, barcode, category, unit, cost_price,
+sell_price, gst_rate (percent), stock, low_stock_qty, expiry_date, hsn_code.
+Rows update the product with the same sku (or barcode); blank cells keep
+its current values.
+Customer CSV columns: name, phone, email, address, gstin.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import date
+
+
+# ── Output helpers ────────────────────────────────────────────────────────
+def write_rows(rows, args):
+    """Writes a list of dicts to a file (--csv FILE: .csv, .csv.gz or .xlsx), JSON (--json) or a plain table."""
+    if getattr(args, 'csv', None):
+        from services.export_service import export_rows
+        export_rows(rows, args.csv)
+        print(f"Wrote {len(rows)} rows to {args.csv}")
+    elif getattr(args, 'json', False):
+        json.dump(rows, sys.stdout, indent=2, default=str)
+        print()
+    elif not rows:
+        print("No data.")
+    else:
+        keys = list(rows[0].keys())
+        cells = [[_fmt(row[k]) for k in keys] for row in rows]
+        widths = [max(len(k), *(len(c[i]) for c in cells)) for i, k in enumerate(keys)]
+        print('  '.join(k.ljust(w) for k, w in zip(keys, widths)))
+        for c in cells:
+            print('  '.join(v.ljust(w) for v, w in zip(c, widths)))
+
+def _fmt(value):
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return '' if value is None else str(value)
+
+# ── Commands ──────────────────────────────────────────────────────────────
+def cmd_import(args):
+    if args.kind == 'products':
+        from services.import_service import import_products
+        stats = import_products(args.file, dry_run=args.dry_run)
+        for line_no, error in stats['errors']:
+            print(f"line {line_no}: {error}", file=sys.stderr)
+        if args.dry_run:
+            if args.diff:
+                write_rows(stats['diff'], argparse.Namespace(csv=args.diff))
+            print(f"Dry run: {stats['inserted']} new, {stats['updated']} changed, "
+                  f"{stats['unchanged']} unchanged, {stats['failed']} invalid, "
+                  f"{len(stats['new_categories'])} new categories.")
+        else:
+            print(f"Imported {stats['rows'] - stats['failed']} products ({stats['inserted']} new, "
+                  f"{stats['updated']} updated), {stats['failed']} failed "
+                  f"in {stats['seconds']:.1f}s ({stats['rows_per_sec']} rows/s).")
+        return 1 if stats['failed'] else 0
+
+    with open(args.file, newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.DictReader(f))
+    added, failed = 0, 0
+    from services.customer_service import add_customer
+    for line_no, row in enumerate(rows, start=2):
+        try:
+            add_customer(row['name'].strip(), row.get('phone') or None,
+                         row.get('email') or '', row.get('address') or '', row.get('gstin'))
+            added += 1
+        except Exception as e:
+            failed += 1
+            print(f"line {line_no}: {e}", file=sys.stderr)
+
+    print(f"Imported {added} {args.kind}, {failed} failed.")
+    return 1 if failed else 0
+
+def cmd_export(args):
+    from services.export_service import export
+    dataset = {'lines': 'invoice_lines'}.get(args.kind, args.kind)
+    stats = export(dataset, args.file, args.start, args.end)
+    print(f"Wrote {stats['rows']} rows to {args.file} in {stats['seconds']}s "
+          f"({stats['rows_per_sec']} rows/s)")
+
+def cmd_report(args):
+    from services import report_service, report_cache
+    if args.kind == 'day':
+        rows = [report_service.get_day_summary(args.date)]
+    elif args.kind == 'daily':
+        rows = [dict(date=args.date, **report_service.get_daily_summary(args.date))]
+    elif args.kind == 'gst':
+        rows = report_cache.cached_report('gst', args.start, args.end, report_service.get_gst_summary)
+    else:
+        rows = report_cache.cached_report('products', args.start, args.end, report_service.get_product_sales)
+    write_rows(rows, args)
+
+def cmd_gstr1(args):
+    from services.gst_return_service import build_gstr1, write_return
+    report = build_gstr1(args.month)
+    for path in write_return(report, args.file):
+        print(f"Wrote {path}")
+    write_rows(report['rates'], argparse.Namespace())
+    missing = sum(1 for row in report['hsn'] if not row['hsn_code'])
+    if missing:
+        print(f"warning: {missing} HSN summary rows have no HSN code; set hsn_code on those products",
+              file=sys.stderr)
+
+def cmd_analytics(args):
+    from services.analytics_service import product_analytics, year_over_year
+    run = year_over_year if args.yoy else product_analytics
+    result = run(args.start, args.end, k=args.top, workers=args.workers)
+    if args.json:
+        json.dump(result, sys.stdout, indent=2, default=str)
+        print()
+    elif args.csv:
+        write_rows(result['top_products'], args)
+        stem, ext = os.path.splitext(args.csv)
+        if stem.lower().endswith('.csv'): # name.csv.gz
+            stem, ext = stem[:-4], stem[-4:] + ext
+        by_month = f"{stem}_by_month{ext}"
+        write_rows(result['by_month'], argparse.Namespace(csv=by_month))
+    else:
+        write_rows(result['by_month'], args)
+        print()
+        write_rows(result['top_products'], args)
+
+def cmd_snapshot(args):
+    from services.sales_snapshot import append_closed_days, load_manifest
+    added = append_closed_days()
+    print(f"Added {added} rows; the sales snapshot holds {load_manifest()['rows']} rows.")
+
+def cmd_ledger(args):
+    from services import stock_ledger
+    if args.action == 'checkpoint':
+        print(f"Checkpointed {stock_ledger.write_checkpoints()} products.")
+        return 0
+    mismatches = stock_ledger.reconcile()
+    write_rows(mismatches, args)
+    if mismatches and args.fix:
+        print(f"Set stock from the ledger for {stock_ledger.apply_ledger(mismatches)} products.")
+        return 0
+    return 1 if mismatches else 0
+
+def cmd_reorder(args):
+    from services.reorder_service import refresh_suggestions, get_suggestions
+    count = refresh_suggestions(args.date)
+    print(f"{count} products need reordering.")
+    write_rows(get_suggestions(args.top), args)
+
+def cmd_prices(args):
+    from services import price_service
+    if args.action == 'due':
+        for price_list_id, changed in price_service.apply_due_price_lists():
+            print(f"Applied price list {price_list_id}: {changed} prices changed.")
+        return 0
+    write_rows(price_service.get_price_lists(), args)
+
+def cmd_grn(args):
+    from services import purchase_service
+    purchase_id = purchase_service.create_purchase(args.supplier, args.invoice_no, args.invoice_date, args.freight)
+    stats = purchase_service.import_lines(purchase_id, args.file)
+    for line_no, error in stats['errors']:
+        print(f"line {line_no}: {error}", file=sys.stderr)
+    print(f"GRN {purchase_id}: staged {stats['added']} of {stats['rows']} rows.")
+    if args.post:
+        summary = purchase_service.post_purchase(purchase_id)
+        print(f"Posted {summary['lines']} lines, {summary['qty']:g} units, landed cost {summary['total_cost']:.2f}.")
+    return 1 if stats['errors'] else 0
+
+def cmd_labels(args):
+    from database.connection import get_connection
+    from services.label_service import print_labels
+    ids = args.ids or [r[0] for r in get_connection().execute("SELECT id FROM products WHERE is_active = 1 ORDER BY id")]
+    if args.stock:
+        stock = dict(get_connection().execute("SELECT id, stock FROM products").fetchall())
+        copies = {i: max(int(stock.get(i) or 0), 0) for i in ids}
+    else:
+        copies = dict.fromkeys(ids, args.copies)
+    stats = print_labels(copies, args.file, sheet=args.sheet, workers=args.workers)
+    pages = f" on {stats['pages']} pages" if stats['pages'] else ""
+    print(f"Wrote {stats['labels']} labels{pages} to {args.file} in {stats['seconds']:.1f}s "
+          f"({stats['rendered']} barcodes rendered, the rest cached).")
+
+def cmd_backup(args):
+    from services.backup_service import backup_to_local
+    print(backup_to_local(args.dir))
+
+def cmd_close_day(args):
+    from database.connection import get_connection
+    from services.report_service import close_day, update_derived_data
+    row = get_connection().execute("SELECT id FROM users WHERE username = ?", (args.user,)).fetchone()
+    if not row:
+        raise ValueError(f"Unknown user '{args.user}'.")
+    close_day(args.date, row['id'])
+    print(f"Day {args.date} closed.")
+    errors = update_derived_data()['errors']
+    for message in errors:
+        print(message, file=sys.stderr)
+    return 1 if errors else 0
+
+def cmd_migrate(args):
+    from database.migrate import run_migrations
+    run_migrations()
+
+
+# ── Entry point ───────────────────────────────────────────────────────────
+def build_parser():
+    today = date.today().isoformat()
+    parser = argparse.ArgumentParser(prog='smart_pos', description="Smart POS batch tool")
+    parser.add_argument('--db', help="database file (default: smart_pos.db in the current folder)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('import', help="import products (CSV/XLSX) or customers (CSV)")
+    p.add_argument('kind', choices=['products', 'customers'])
+    p.add_argument('file')
+    p.add_argument('--dry-run', action='store_true', help="products: report what would change, write nothing")
+    p.add_argument('--diff', metavar='FILE', help="with --dry-run, write the row-by-row changes to a CSV")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser('export', help="export products, customers, invoices or invoice lines")
+    p.add_argument('kind', choices=['products', 'customers', 'invoices', 'lines'])
+    p.add_argument('file', help="a .csv, .csv.gz or .xlsx file")
+    p.add_argument('--from', dest='start', default=today)
+    p.add_argument('--to', dest='end', default=today)
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser('report', help="print a sales report")
+    p.add_argument('kind', choices=['day', 'daily', 'gst', 'products'])
+    p.add_argument('--date', default=today, help="for day/daily reports")
+    p.add_argument('--from', dest='start', default=today)
+    p.add_argument('--to', dest='end', default=today)
+    out = p.add_mutually_exclusive_group()
+    out.add_argument('--csv', metavar='FILE')
+    out.add_argument('--json', action='store_true')
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser('gstr1', help="build the month's GSTR-1 return (B2B, B2CS, HSN, documents)")
+    p.add_argument('month', help="YYYY-MM")
+    p.add_argument('file', help="a .json file (GSTN layout) or .csv (one file per section)")
+    p.set_defaults(func=cmd_gstr1)
+
+    p = sub.add_parser('analytics', help="top products and monthly totals over a long range, month by month in parallel")
+    p.add_argument('--from', dest='start', default=date.today().replace(month=1, day=1).isoformat())
+    p.add_argument('--to', dest='end', default=today)
+    p.add_argument('--top', type=int, default=20)
+    p.add_argument('--workers', type=int, help="worker processes (default: one per core)")
+    p.add_argument('--yoy', action='store_true', help="compare with the same dates a year earlier")
+    out = p.add_mutually_exclusive_group()
+    out.add_argument('--csv', metavar='FILE')
+    out.add_argument('--json', action='store_true')
+    p.set_defaults(func=cmd_analytics)
+
+    p = sub.add_parser('snapshot', help="append closed days to the columnar sales snapshot")
+    p.set_defaults(func=cmd_snapshot)
+
+    p = sub.add_parser('ledger', help="checkpoint the stock ledger or check stock against it")
+    p.add_argument('action', choices=['checkpoint', 'reconcile'])
+    p.add_argument('--fix', action='store_true', help="reconcile: set mismatched stock to the ledger quantity")
+    out = p.add_mutually_exclusive_group()
+    out.add_argument('--csv', metavar='FILE')
+    out.add_argument('--json', action='store_true')
+    p.set_defaults(func=cmd_ledger)
+
+    p = sub.add_parser('reorder', help="recalculate purchase suggestions from sales velocity")
+    p.add_argument('--date', default=today, help="calculate as of this day (sales before it count)")
+    p.add_argument('--top', type=int, default=20, help="suggestions to print")
+    out = p.add_mutually_exclusive_group()
+    out.add_argument('--csv', metavar='FILE')
+    out.add_argument('--json', action='store_true')
+    p.set_defaults(func=cmd_reorder)
+
+    p = sub.add_parser('prices', help="list price lists or apply the ones whose start time has passed")
+    p.add_argument('action', choices=['list', 'due'])
+    out = p.add_mutually_exclusive_group()
+    out.add_argument('--csv', metavar='FILE')
+    out.add_argument('--json', action='store_true')
+    p.set_defaults(func=cmd_prices)
+
+    p = sub.add_parser('grn', help="receive a supplier delivery (CSV/XLSX) as a goods receipt")
+    p.add_argument('file', help="columns: barcode or sku, qty, unit_cost, batch_no, expiry_date")
+    p.add_argument('--supplier')
+    p.add_argument('--invoice-no')
+    p.add_argument('--invoice-date')
+    p.add_argument('--freight', type=float, default=0.0, help="spread over the lines by value")
+    p.add_argument('--post', action='store_true', help="book it into stock now (default: leave a draft)")
+    p.set_defaults(func=cmd_grn)
+
+    p = sub.add_parser('labels', help="barcode labels as an A4 sheet PDF or ZPL for a label printer")
+    p.add_argument('file', help="a .pdf or .zpl file")
+    p.add_argument('--ids', type=int, nargs='+', metavar='ID', help="product ids (default: every active product)")
+    p.add_argument('--copies', type=int, default=1, help="labels per product")
+    p.add_argument('--stock', action='store_true', help="one label per unit in stock instead of --copies")
+    p.add_argument('--sheet', choices=['65-up', '21-up'], default='65-up')
+    p.add_argument('--workers', type=int, help="render processes (default: one per core)")
+    p.set_defaults(func=cmd_labels)
+
+    p = sub.add_parser('backup', help="copy the database into a folder")
+    p.add_argument('dir')
+    p.set_defaults(func=cmd_backup)
+
+    p = sub.add_parser('close-day', help="lock the day's invoices and log the totals")
+    p.add_argument('--date', default=today)
+    p.add_argument('--user', default='admin')
+    p.set_defaults(func=cmd_close_day)
+
+    p = sub.add_parser('migrate', help="apply pending database migrations")
+    p.set_defaults(func=cmd_migrate)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.db:
+        from database.connection import set_db_path
+        set_db_path(args.db)
+    try:
+        return args.func(args) or 0
+    except Exception as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,10 +7,11 @@ import sqlite3
 import database.connection
 from database.schema import create_tables
 from database.seed import seed_database
-from database.migrations.add_day_close import run_migration
+from database.migrate import run_migrations
+from services import event_bus, top_sellers, report_cache, customer_service
 
 @pytest.fixture(autouse=True)
-def db_session(monkeypatch):
+def db_session(monkeypatch, tmp_path):
     conn = sqlite3.connect(":memory:")
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
@@ -19,10 +20,16 @@ def db_session(monkeypatch):
         return conn
         
     monkeypatch.setattr(database.connection, "get_connection", mock_get_connection)
+    monkeypatch.setattr(database.connection, "_db_connection", conn)
+    monkeypatch.setattr(database.connection, "DB_PATH", str(tmp_path / "test.db"))
     
     create_tables(conn)
     seed_database()
-    run_migration()
+    run_migrations()
     
     yield conn
+    event_bus.clear()
+    top_sellers.reset()
+    report_cache.reset()
+    customer_service.reset()
     conn.close()
@@ -0,0 +1,50 @@
+import json
+import sqlite3
+import smart_pos
+import database.connection
+from database.connection import get_connection
+from services import analytics_service
+
+def _sale(day, product_id, qty, price):
+    conn = get_connection()
+    with conn:
+        invoice_id = conn.execute("""
+            INSERT INTO invoices (invoice_number, subtotal, total, created_at) VALUES (?, ?, ?, ?)
+        """, (f"AN-{day}-{product_id}", qty * price, qty * price, f"{day} 12:00:00")).lastrowid
+        conn.execute("""
+            INSERT INTO invoice_items (invoice_id, product_id, product_name, qty, unit_price, line_total)
+            VALUES (?, ?, 'Analytics Item', ?, ?, ?)
+        """, (invoice_id, product_id, qty, price, qty * price))
+
+def _write_db_file():
+    # Worker processes open the database file, not the test's in-memory connection.
+    # backup() waits forever on a source with an open write, so commit first.
+    get_connection().commit()
+    target = sqlite3.connect(database.connection.DB_PATH)
+    get_connection().backup(target)
+    target.close()
+
+def test_month_shards_clip_to_range():
+    assert analytics_service.month_shards('2024-01-15', '2024-03-02') == [
+        ('2024-01-15', '2024-01-31'), ('2024-02-01', '2024-02-29'), ('2024-03-01', '2024-03-02')]
+
+def test_parallel_shards_merge_like_one_query():
+    a = get_connection().execute("INSERT INTO products (name, sell_price) VALUES ('An A', 10)").lastrowid
+    b = get_connection().execute("INSERT INTO products (name, sell_price) VALUES ('An B', 10)").lastrowid
+    _sale('2024-01-10', a, 5, 10.0)
+    _sale('2024-02-10', a, 5, 10.0)
+    _sale('2024-03-10', b, 8, 10.0)
+    _write_db_file()
+
+    result = analytics_service.product_analytics('2024-01-01', '2024-03-31', k=2, workers=2)
+    assert [(p['product_id'], p['qty_sold'], p['invoices']) for p in result['top_products']] == [(a, 10, 2), (b, 8, 1)]
+    assert result['totals'] == {'invoices': 3, 'revenue': 180.0}
+    assert [m['month'] for m in result['by_month']] == ['2024-01', '2024-02', '2024-03']
+    assert analytics_service.product_analytics('2024-01-01', '2024-03-31', k=2, workers=1) == result
+
+def test_cli_json_output_is_pure_json(capsys):
+    _write_db_file()
+    assert smart_pos.main(['analytics', '--from', '2024-01-01', '--to', '2024-02-29',
+                           '--workers', '1', '--json']) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert [m['month'] for m in result['by_month']] == ['2024-01', '2024-02']
@@ -0,0 +1,52 @@
+from database.connection import get_connection
+from services import batch_service
+from services.billing_service import BillingCart
+from services.inventory_service import add_product, adjust_stock
+from services.invoice_service import create_invoice
+
+def _sell(product_id, qty):
+    cart = BillingCart()
+    cart.add_item({'product_id': product_id, 'name': 'Batch Item', 'unit_price': 10.0, 'gst_rate': 0.0}, qty)
+    return create_invoice(1, None, cart.calculate_totals())
+
+def _left(product_id):
+    return [(b['batch_no'], b['qty']) for b in batch_service.get_batches(product_id)]
+
+def test_sales_take_earliest_expiry_first():
+    product_id = add_product('Syrup', stock=4, expiry_date='2025-03-31')
+    batch_service.receive_batch(product_id, 5, '2024-12-31', 'B-EARLY')
+    batch_service.receive_batch(product_id, 5, None, 'B-NODATE')
+    assert _left(product_id) == [('B-EARLY', 5), ('OPENING', 4), ('B-NODATE', 5)]
+
+    invoice = _sell(product_id, 7)
+    assert _left(product_id) == [('OPENING', 2), ('B-NODATE', 5)]
+    allocated = get_connection().execute("""
+        SELECT b.batch_no, a.qty FROM batch_allocations a JOIN product_batches b ON b.id = a.batch_id
+        WHERE a.invoice_id = ? ORDER BY b.expiry_date
+    """, (invoice.id,)).fetchall()
+    assert [tuple(r) for r in allocated] == [('B-EARLY', 5), ('OPENING', 2)]
+
+    adjust_stock(product_id, -3, 'damage')
+    assert _left(product_id) == [('B-NODATE', 4)]
+    stock = get_connection().execute("SELECT stock FROM products WHERE id = ?", (product_id,)).fetchone()[0]
+    assert stock == 4
+
+def test_stock_put_back_has_no_batch_number_and_purchases_are_received():
+    product_id = add_product('Biscuits', stock=0)
+    adjust_stock(product_id, 2, 'return')
+    adjust_stock(product_id, 3, 'purchase', user_id=1)
+    assert _left(product_id) == [(None, 2), (None, 3)]
+    logs = get_connection().execute(
+        "SELECT reason, change_qty, user_id FROM inventory_logs WHERE product_id = ? ORDER BY id", (product_id,)).fetchall()
+    assert [tuple(r) for r in logs] == [('return', 2, None), ('purchase', 3, 1)]
+
+def test_expiry_queries():
+    product_id = add_product('Milk', stock=0)
+    for expiry, qty in (('2024-05-01', 2), ('2024-05-20', 3), ('2024-07-01', 1), ('2024-05-10', 0)):
+        batch_service.receive_batch(product_id, qty or 1, expiry)
+    _sell(product_id, 2) # empties the 2024-05-01 batch
+
+    expired = batch_service.get_expired_batches('2024-05-15')
+    assert [b['expiry_date'] for b in expired if b['product_id'] == product_id] == ['2024-05-10']
+    soon = batch_service.get_expiring_batches(30, as_of='2024-05-15')
+    assert [(b['expiry_date'], b['qty']) for b in soon if b['product_id'] == product_id] == [('2024-05-20', 3)]
@@ -0,0 +1,38 @@
+from database.connection import get_connection
+from services.customer_service import add_customer, get_all_customers, get_customer, search_customers
+
+def _names(customers):
+    return [c.name for c in customers]
+
+def test_word_prefix_search_follows_inserts_updates_and_deletes():
+    ramesh = add_customer('Ramesh Patel', '9824000001', email='orders@kirana.in')
+    add_customer('Rameshwar Shah', '9824000002')
+    add_customer('Anita Ramani', '9824000003')
+
+    assert _names(search_customers('ramesh')) == ['Ramesh Patel', 'Rameshwar Shah']
+    assert _names(search_customers('ram pat')) == ['Ramesh Patel']
+    assert _names(search_customers('kirana')) == ['Ramesh Patel']
+    assert _names(search_customers('"pat*')) == ['Ramesh Patel']     # quotes can't break the query
+    assert search_customers('esh') == []                              # words match from their start
+
+    conn = get_connection()
+    with conn:
+        conn.execute("UPDATE customers SET name = 'Suresh Patel' WHERE id = ?", (ramesh.id,))
+        conn.execute("UPDATE customers SET outstanding = 10 WHERE id = ?", (ramesh.id,))
+    assert _names(search_customers('ramesh')) == ['Rameshwar Shah']
+    assert _names(get_all_customers('suresh')) == ['Suresh Patel']
+    with conn:
+        conn.execute("DELETE FROM customers WHERE id = ?", (ramesh.id,))
+    assert search_customers('suresh') == []
+    assert get_customer(ramesh.id) is None
+
+def test_phone_prefix_search_and_lookup_by_id():
+    first = add_customer('Kavita Joshi', '9900011122')
+    add_customer('Vijay Rao', '9900011133')
+    add_customer('Meena Iyer', '9911100000')
+
+    assert _names(search_customers('99000')) == ['Kavita Joshi', 'Vijay Rao']
+    assert _names(search_customers('99000 111 33')) == ['Vijay Rao']
+    assert _names(search_customers('99000', limit=1)) == ['Kavita Joshi']
+    assert len(search_customers('', limit=2)) == 2
+    assert get_customer(first.id).phone == '9900011122'
@@ -0,0 +1,65 @@
+from database.connection import get_connection
+from services.billing_service import BillingCart
+from services.invoice_service import create_invoice
+from services import customer_service
+from services.customer_service import add_customer, get_customer, get_customer_summary, search_customers, settle_dues
+
+def _credit_bill(customer_id, amount):
+    conn = get_connection()
+    with conn:
+        pid = conn.execute("INSERT INTO products (name, sell_price, stock, is_active) VALUES ('Summary Dal', ?, 10, 1)",
+                           (amount,)).lastrowid
+    cart = BillingCart()
+    cart.add_item({'product_id': pid, 'name': 'Summary Dal', 'unit_price': amount, 'gst_rate': 0.0}, 1)
+    return create_invoice(1, customer_id, cart.calculate_totals(), payment_mode='credit')
+
+def _scanned():
+    row = get_connection().execute(
+        "SELECT COUNT(*), TOTAL(outstanding > 0), TOTAL(outstanding) FROM customers").fetchone()
+    return {'customers': row[0], 'with_dues': int(row[1]), 'dues': round(row[2], 2)}
+
+def test_summary_counters_follow_bills_payments_and_deletes():
+    ravi = add_customer('Ravi Summary', '9300000001')
+    add_customer('Gita Summary', '9300000002')
+    _credit_bill(ravi.id, 250)
+    assert get_customer_summary() == _scanned()
+    assert get_customer_summary('ravi') == {'customers': 1, 'with_dues': 1, 'dues': 250}
+
+    settle_dues(ravi.id, 250, user_id=1)
+    assert get_customer_summary() == _scanned()
+    assert get_customer_summary('summary')['with_dues'] == 0
+    conn = get_connection()
+    with conn:
+        conn.execute("UPDATE customers SET outstanding = 40 WHERE id = ?", (ravi.id,))
+        conn.execute("DELETE FROM customers WHERE phone = '9300000002'")
+    assert get_customer_summary() == _scanned()
+    assert get_customer_summary('9300') == {'customers': 1, 'with_dues': 1, 'dues': 40}
+
+def test_get_customer_is_an_identity_map_refreshed_when_dues_change():
+    asha = add_customer('Asha Map', '9300000011')
+    first = get_customer(asha.id)
+    assert get_customer(asha.id) is first
+    assert get_customer(987654) is None
+
+    _credit_bill(asha.id, 120)
+    billed = get_customer(asha.id)
+    assert billed is not first and billed.outstanding == 120
+
+    settle_dues(asha.id, 20, user_id=1)
+    assert get_customer(asha.id).outstanding == 100
+
+def test_screen_filter_and_search_agree_on_numbers_no_phone_starts_with():
+    add_customer('Hotel 4455', '9300000021')
+    add_customer('Kiran Summary', '9300000022', email='4455@kirana.in')
+    assert [c.name for c in search_customers('4455')] == ['Hotel 4455', 'Kiran Summary']
+    assert get_customer_summary('4455')['customers'] == 2
+    assert [c.name for c in search_customers('93000000')] == ['Hotel 4455', 'Kiran Summary']
+
+def test_identity_map_keeps_only_recent_customers(monkeypatch):
+    monkeypatch.setattr(customer_service, 'CACHED_CUSTOMERS', 2)
+    ids = [add_customer(f'Map {i}', f'930000010{i}').id for i in range(3)]
+    first = get_customer(ids[0])
+    get_customer(ids[1])
+    assert get_customer(ids[0]) is first # a hit makes it the most recent
+    get_customer(ids[2])
+    assert list(customer_service._customers) == [ids[0], ids[2]]
@@ -0,0 +1,48 @@
+from database.connection import get_connection
+from services import event_bus
+from services.billing_service import BillingCart
+from services.customer_service import add_customer, settle_dues
+from services.inventory_service import adjust_stock
+from services.invoice_service import create_invoice
+
+def _record(*events):
+    received = []
+    for name in events:
+        event_bus.subscribe(name, lambda event, **payload: received.append((event, payload)))
+    return received
+
+def test_failing_subscriber_does_not_break_publisher():
+    received = _record('ping')
+    event_bus.subscribe('ping', lambda event, **payload: 1 / 0)
+    event_bus.publish('ping', value=1)
+    assert received == [('ping', {'value': 1})]
+
+def test_invoice_commit_publishes_invoice_and_stock():
+    cursor = get_connection().cursor()
+    cursor.execute("INSERT INTO products (name, sell_price, stock, low_stock_qty) VALUES ('Bus Oil', 100, 6, 5)")
+    pid = cursor.lastrowid
+    cart = BillingCart()
+    cart.add_item({'product_id': pid, 'name': 'Bus Oil', 'unit_price': 100.0}, 2)
+
+    received = _record(event_bus.INVOICE_COMMITTED, event_bus.STOCK_CHANGED)
+    invoice = create_invoice(1, None, cart.calculate_totals())
+
+    assert received[0] == (event_bus.INVOICE_COMMITTED, {'invoice': invoice})
+    name, payload = received[1]
+    assert name == event_bus.STOCK_CHANGED
+    assert payload['changes'][0]['id'] == pid and payload['changes'][0]['stock'] == 4
+
+def test_stock_adjust_and_dues_publish():
+    cursor = get_connection().cursor()
+    cursor.execute("INSERT INTO products (name, stock) VALUES ('Bus Salt', 10)")
+    pid = cursor.lastrowid
+    customer = add_customer('Bus Customer', '9000000002')
+    cursor.execute("UPDATE customers SET outstanding = 500 WHERE id = ?", (customer.id,))
+    get_connection().commit()
+
+    received = _record(event_bus.STOCK_CHANGED, event_bus.DUES_SETTLED)
+    adjust_stock(pid, 5, 'purchase')
+    settle_dues(customer.id, 200, user_id=1)
+
+    assert received[0][1]['changes'][0]['stock'] == 15
+    assert received[1] == (event_bus.DUES_SETTLED, {'customer_id': customer.id, 'amount': 200})
@@ -0,0 +1,50 @@
+import csv
+import gzip
+import tracemalloc
+from openpyxl import load_workbook
+from database.connection import get_connection
+from services import export_service
+
+DAY = '2024-03-05'
+
+def _seed_lines(n):
+    conn = get_connection()
+    with conn:
+        product_id = conn.execute("INSERT INTO products (name, sell_price) VALUES ('Export Item', 10)").lastrowid
+        cur = conn.execute("""
+            INSERT INTO invoices (invoice_number, subtotal, total, created_at)
+            VALUES ('EXP-1', 0, 0, ?)
+        """, (f"{DAY} 10:00:00",))
+        conn.executemany("""
+            INSERT INTO invoice_items (invoice_id, product_id, product_name, qty, unit_price, line_total)
+            VALUES (?, ?, ?, 1, 10, 10)
+        """, ((cur.lastrowid, product_id, f"Item {i}") for i in range(n)))
+
+def test_csv_gz_streams_with_flat_memory(tmp_path):
+    _seed_lines(20000)
+    out = tmp_path / 'lines.csv.gz'
+    tracemalloc.start()
+    stats = export_service.export('invoice_lines', str(out), DAY, DAY)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert stats['rows'] == 20000 and stats['rows_per_sec'] > 0
+    assert peak < 8 * 2**20 # a few batches, never the whole result
+    with gzip.open(out, 'rt', newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert rows[0][0] == 'invoice_number' and len(rows) == 20001
+
+def test_xlsx_export(tmp_path):
+    _seed_lines(5)
+    out = tmp_path / 'lines.xlsx'
+    assert export_service.export('invoice_lines', str(out), DAY, DAY)['rows'] == 5
+    ws = load_workbook(out, read_only=True).active
+    assert [r[4] for r in ws.iter_rows(min_row=2, values_only=True)] == [f"Item {i}" for i in range(5)]
+
+def test_cancelled_export_leaves_no_file(tmp_path):
+    _seed_lines(export_service.BATCH_SIZE * 2)
+    out = tmp_path / 'lines.csv'
+    gen = export_service.iter_export('invoice_lines', str(out), DAY, DAY)
+    next(gen)
+    gen.close()
+    assert list(tmp_path.iterdir()) == []
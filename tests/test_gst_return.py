@@ -0,0 +1,66 @@
+import json
+from datetime import date
+import pytest
+from database.connection import get_connection
+from services.billing_service import BillingCart
+from services.customer_service import add_customer
+from services.gst_return_service import build_gstr1, write_return
+from services.inventory_service import add_product
+from services.invoice_service import create_invoice
+from services.report_service import close_day
+
+MONTH = date.today().strftime('%Y-%m')
+
+def _bill(customer_id, *lines):
+    cart = BillingCart()
+    for pid, name, price, rate, qty in lines:
+        cart.add_item({'product_id': pid, 'name': name, 'unit_price': price, 'gst_rate': rate}, qty)
+    return create_invoice(1, customer_id, cart.calculate_totals())
+
+def _sales():
+    tea = add_product('GST Tea', sell_price=100.0, stock=50, hsn_code='0902')
+    soap = add_product('GST Soap', sell_price=50.0, stock=50, hsn_code='3401')
+    trader = add_customer('GST Trader', '9100000001', gstin='24aaacb1234c1z5')
+    _bill(None, (tea, 'GST Tea', 100.0, 5.0, 2), (soap, 'GST Soap', 50.0, 18.0, 1))
+    _bill(trader.id, (tea, 'GST Tea', 100.0, 5.0, 10))
+
+def test_gstr1_sections():
+    _sales()
+    report = build_gstr1(MONTH)
+
+    assert [(r['ctin'], r['taxable_value'], r['cgst']) for r in report['b2b']] == [('24AAACB1234C1Z5', 1000.0, 25.0)]
+    assert [(r['gst_rate'], r['taxable_value'], r['cgst'], r['sgst']) for r in report['b2cs']] == \
+        [(5.0, 200.0, 5.0, 5.0), (18.0, 50.0, 4.5, 4.5)]
+    assert [(r['hsn_code'], r['qty'], r['taxable_value']) for r in report['hsn']] == \
+        [('0902', 12, 1200.0), ('3401', 1, 50.0)]
+    assert report['rates'][0]['taxable_value'] == 1200.0
+    assert report['docs'][0]['total'] == 2
+
+def test_closed_day_snapshot_matches_live_build(tmp_path):
+    _sales()
+    live = build_gstr1(MONTH)
+    close_day(date.today().isoformat(), user_id=1)
+    from_snapshot = build_gstr1(MONTH)
+
+    assert from_snapshot.pop('snapshot_days') == 1 and live.pop('snapshot_days') == 0
+    assert from_snapshot == live
+
+    out = tmp_path / 'gstr1.json'
+    write_return(from_snapshot, str(out))
+    gstn = json.loads(out.read_text())
+    assert gstn['b2b'][0]['inv'][0]['itms'][0]['itm_det']['txval'] == 1000.0
+
+def test_sale_after_close_is_added_to_the_snapshot():
+    tea = add_product('Late Tea', sell_price=100.0, stock=50, hsn_code='0902')
+    _bill(None, (tea, 'Late Tea', 100.0, 5.0, 1))
+    close_day(date.today().isoformat(), user_id=1)
+    _bill(None, (tea, 'Late Tea', 100.0, 5.0, 3))
+
+    report = build_gstr1(MONTH)
+    assert report['docs'][0]['total'] == 2
+    assert [(r['hsn_code'], r['qty']) for r in report['hsn']] == [('0902', 4)]
+    assert report['snapshot_days'] == 1
+
+def test_invalid_gstin_rejected():
+    with pytest.raises(ValueError):
+        add_customer('Bad GSTIN', '9100000002', gstin='12345')
@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+import smart_pos
+from database.connection import get_connection
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def test_core_imports_without_qt():
+    code = (
+        "import sys\n"
+        "import services.billing_service, services.invoice_service, services.inventory_service\n"
+        "import services.customer_service, services.report_service, services.backup_service\n"
+        "import services.printer_service, utils.barcode_handler, utils.whatsapp_share, smart_pos\n"
+        "assert 'PySide6' not in sys.modules, 'Qt was imported'\n"
+    )
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+
+def test_cli_report_and_export(tmp_path, capsys):
+    conn = get_connection()
+    conn.execute("INSERT INTO customers (name, phone) VALUES ('CLI Customer', '9000000001')")
+
+    assert smart_pos.main(['report', 'day', '--json']) == 0
+    assert '"invoice_count": 0' in capsys.readouterr().out
+
+    out = tmp_path / 'customers.csv'
+    assert smart_pos.main(['export', 'customers', str(out)]) == 0
+    assert 'CLI Customer' in out.read_text(encoding='utf-8')
+
+def test_cli_import_products(tmp_path):
+    src = tmp_path / 'products.csv'
+    src.write_text("name,barcode,sell_price,gst_rate,stock\nCLI Tea,8900001,120,5,12\n", encoding='utf-8')
+    assert smart_pos.main(['import', 'products', str(src)]) == 0
+
+    row = get_connection().execute("""
+        SELECT p.stock, g.rate FROM products p JOIN gst_rates g ON p.gst_rate_id = g.id
+        WHERE p.barcode = '8900001'
+    """).fetchone()
+    assert (row['stock'], row['rate']) == (12, 5.0)
@@ -0,0 +1,71 @@
+from openpyxl import Workbook
+from database.connection import get_connection
+from services import import_service, event_bus
+
+HEADER = "name,sku,barcode,category,unit,cost_price,sell_price,gst_rate,stock\n"
+
+def _csv(tmp_path, body, name='catalog.csv'):
+    path = tmp_path / name
+    path.write_text(HEADER + body, encoding='utf-8')
+    return str(path)
+
+def _product(sku):
+    return get_connection().execute("SELECT * FROM products WHERE sku = ?", (sku,)).fetchone()
+
+def test_import_upserts_in_chunks_and_logs_opening_stock(tmp_path):
+    rows = ''.join(f"Item {i},IMP-{i},890{i:05d},Snacks,pcs,5,{10 + i % 3},18,{i % 2 * 4}\n" for i in range(120))
+    stats = import_service.import_products(_csv(tmp_path, rows + "Bad,IMP-X,,,,abc,1,,\n"))
+    assert (stats['inserted'], stats['updated'], stats['failed']) == (120, 0, 1)
+    assert stats['errors'][0][0] == 122
+    assert stats['new_categories'] == ['Snacks']
+    assert _product('IMP-1')['stock'] == 4
+    logged = get_connection().execute("""
+        SELECT COUNT(*) FROM inventory_logs l JOIN products p ON p.id = l.product_id
+        WHERE p.sku LIKE 'IMP-%' AND l.reason = 'purchase'
+    """).fetchone()[0]
+    assert logged == 60
+
+    # Price list update: matched by sku, blank cells keep values, stock left alone
+    stats = import_service.iter_import(_csv(tmp_path, "Item 1 New,IMP-1,,,,,99,,50\n", 'prices.csv'), chunk_size=1)
+    stats = list(stats)[-1]
+    assert (stats['inserted'], stats['updated']) == (0, 1)
+    product = _product('IMP-1')
+    assert (product['name'], product['sell_price'], product['cost_price'], product['stock']) == ('Item 1 New', 99, 5, 4)
+
+def test_updates_record_price_history_and_low_stock_crossings(tmp_path):
+    import_service.import_products(_csv(tmp_path, "Ghee,G-1,,,,300,350,5,8\nOil,O-1,,,,100,120,5,9\n"))
+    crossed = []
+    event_bus.subscribe(event_bus.LOW_STOCK_CHANGED, lambda event, products: crossed.append(products))
+    path = tmp_path / 'update.csv'
+    path.write_text("name,sku,sell_price,low_stock_qty\nGhee,G-1,375,10\nOil,O-1,120,\n", encoding='utf-8')
+    stats = import_service.import_products(str(path))
+
+    assert (stats['inserted'], stats['updated']) == (0, 2)
+    history = get_connection().execute("""
+        SELECT p.sku, h.old_price, h.new_price FROM price_history h JOIN products p ON p.id = h.product_id
+        WHERE p.sku IN ('G-1', 'O-1')
+    """).fetchall()
+    assert [tuple(r) for r in history] == [('G-1', 350, 375)]
+    assert [[p['name'] for p in products] for products in crossed] == [['Ghee']]
+
+def test_dry_run_reports_diff_without_writing(tmp_path):
+    import_service.import_products(_csv(tmp_path, "Tea,T-1,,,,40,50,5,10\nSugar,S-1,,,,30,35,5,0\n"))
+    path = _csv(tmp_path, "Tea,T-1,,,,40,55,5,10\nSugar,S-1,,,,30,35,5,0\nSalt,,8901,,kg,10,12,0,3\n", 'next.csv')
+    stats = import_service.import_products(path, dry_run=True)
+    assert (stats['inserted'], stats['updated'], stats['unchanged']) == (1, 1, 1)
+    assert [d['changes'] for d in stats['diff'] if d['action'] == 'update'] == ['sell_price: 50.0 -> 55.0']
+    assert _product('T-1')['sell_price'] == 50
+    assert get_connection().execute("SELECT COUNT(*) FROM products WHERE barcode = '8901'").fetchone()[0] == 0
+
+def test_xlsx_import_and_barcode_clash(tmp_path):
+    import_service.import_products(_csv(tmp_path, "Existing,E-1,1111,,,1,2,,\n"))
+    wb = Workbook()
+    wb.active.append(['Name', 'SKU', 'Barcode', 'Sell_Price'])
+    wb.active.append(['Numeric Barcode', 'X-1', 4006381333931, 12.5])
+    wb.active.append(['Clash', 'X-2', 1111, 3]) # barcode belongs to E-1 under another sku
+    path = str(tmp_path / 'catalog.xlsx')
+    wb.save(path)
+    stats = import_service.import_products(path)
+    assert _product('X-1')['barcode'] == '4006381333931'
+    assert stats['errors'] == [(3, "barcode 1111 belongs to sku E-1")]
+    assert _product('X-2') is None and _product('E-1')['name'] == 'Existing'
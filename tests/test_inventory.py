@@ -35,3 +35,37 @@ def test_stock_increase():
     cursor.execute("SELECT stock FROM products WHERE id = ?", (pid,))
     stock = cursor.fetchone()['stock']
     assert stock == 15.0
+
+def test_low_stock_flag_maintained_by_triggers():
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO products (name, stock, low_stock_qty, is_active) VALUES ('Flag Item', 8, 5, 1)")
+    pid = cursor.lastrowid
+    flag = lambda: cursor.execute("SELECT is_low_stock FROM products WHERE id = ?", (pid,)).fetchone()[0]
+    assert flag() == 0
+    
+    adjust_stock(pid, -4.0, 'sale')
+    assert flag() == 1
+    
+    cursor.execute("UPDATE products SET low_stock_qty = 2 WHERE id = ?", (pid,))
+    assert flag() == 0
+    
+    plan = cursor.execute("EXPLAIN QUERY PLAN SELECT id FROM products WHERE is_low_stock = 1").fetchall()
+    assert 'idx_products_low_stock' in str([tuple(r) for r in plan])
+
+def test_threshold_crossing_publishes_event():
+    from services import event_bus
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO products (name, stock, low_stock_qty, is_active) VALUES ('Cross Item', 7, 5, 1)")
+    pid = cursor.lastrowid
+    conn.commit()
+    
+    crossed = []
+    event_bus.subscribe(event_bus.LOW_STOCK_CHANGED, lambda event, products: crossed.append(products))
+    adjust_stock(pid, -1.0, 'sale') # 6: still above
+    adjust_stock(pid, -2.0, 'sale') # 4: crosses down
+    adjust_stock(pid, -1.0, 'sale') # 3: already low
+    adjust_stock(pid, 10.0, 'purchase') # 13: clears
+    
+    assert [[(p['id'], p['is_low_stock']) for p in products] for products in crossed] == [[(pid, 1)], [(pid, 0)]]
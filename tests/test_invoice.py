@@ -0,0 +1,39 @@
+import pytest
+from database.connection import get_connection
+from services.billing_service import BillingCart
+from services.invoice_service import create_invoice
+
+def _cart_with(name, price, stock, qty):
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO products (name, sell_price, stock, is_active) VALUES (?, ?, ?, 1)",
+                   (name, price, stock))
+    pid = cursor.lastrowid
+    cart = BillingCart()
+    cart.add_item({'product_id': pid, 'name': name, 'unit_price': price, 'gst_rate': 0.0}, qty)
+    return pid, cart.calculate_totals()
+
+def test_create_invoice_saves_lines_and_stock():
+    pid, totals = _cart_with('Invoice Soap', 40.0, 10, 3)
+    invoice = create_invoice(user_id=1, customer_id=None, cart_totals=totals, payment_mode='Cash')
+
+    assert invoice.invoice_number.startswith('INV-')
+    assert invoice.payment_mode == 'cash'
+    assert len(invoice.items) == 1 and invoice.items[0].qty == 3
+
+    conn = get_connection()
+    assert conn.execute("SELECT stock FROM products WHERE id = ?", (pid,)).fetchone()['stock'] == 7
+    log = conn.execute("SELECT change_qty, reason FROM inventory_logs WHERE invoice_id = ?",
+                       (invoice.id,)).fetchone()
+    assert (log['change_qty'], log['reason']) == (-3, 'sale')
+
+def test_invoice_numbers_are_sequential():
+    _, totals = _cart_with('Invoice Pen', 10.0, 10, 1)
+    first = create_invoice(1, None, totals)
+    second = create_invoice(1, None, totals)
+    assert int(second.invoice_number[-4:]) == int(first.invoice_number[-4:]) + 1
+
+def test_credit_invoice_needs_customer():
+    _, totals = _cart_with('Invoice Rice', 50.0, 10, 1)
+    with pytest.raises(ValueError):
+        create_invoice(1, None, totals, payment_mode='credit')
@@ -0,0 +1,29 @@
+from services import label_service
+from services.inventory_service import add_product
+
+def test_symbology_for():
+    assert label_service.symbology_for('8901234567890') == 'ean13'
+    assert label_service.symbology_for('8901234567894') == 'code128' # bad check digit
+    assert label_service.symbology_for('SKU-001') == 'code128'
+
+def test_pdf_sheets_reuse_cached_barcodes(tmp_path):
+    tea = add_product('Label Tea', barcode='8901234567890', sell_price=45)
+    rice = add_product('Label Rice 5kg Premium Basmati Extra Long Grain', sku='RICE-5', sell_price=520)
+    blank = add_product('Label Nothing')
+    copies = {tea: 3, rice: 70, blank: 5}
+
+    items = label_service.get_label_items(copies)
+    assert [(i['product_id'], i['symbology']) for i in items] == [(tea, 'ean13'), (rice, 'code128')]
+
+    path = str(tmp_path / 'labels.pdf')
+    stats = label_service.print_labels(copies, path)
+    assert (stats['labels'], stats['pages'], stats['rendered']) == (73, 2, 2)
+    with open(path, 'rb') as f:
+        assert f.read(5) == b'%PDF-'
+    assert label_service.print_labels(copies, path, sheet='65-up')['rendered'] == 0
+
+    zpl = str(tmp_path / 'labels.zpl')
+    label_service.print_labels({tea: 3}, zpl)
+    with open(zpl, encoding='utf-8') as f:
+        text = f.read()
+    assert '^BEN' in text and '^FD890123456789^FS' in text and '^PQ3' in text
@@ -0,0 +1,49 @@
+import pytest
+from forms.login_form import LoginForm, MAX_FAILED_ATTEMPTS, hash_pin, check_pin
+from database.connection import get_connection
+
+@pytest.fixture(autouse=True)
+def clear_pin_cache():
+    LoginForm.clear_pin_cache()
+    yield
+    LoginForm.clear_pin_cache()
+
+def test_valid_login():
+    user = LoginForm().validate('admin', 'admin123')
+    assert user.username == 'admin'
+    assert user.role == 'admin'
+
+def test_lockout_persists_across_forms():
+    for _ in range(MAX_FAILED_ATTEMPTS):
+        with pytest.raises(ValueError, match="Invalid"):
+            LoginForm().validate('admin', 'wrong')
+    # A fresh form (e.g. after restarting the app) still sees the lock
+    with pytest.raises(ValueError, match="locked"):
+        LoginForm().validate('admin', 'admin123')
+
+def test_success_resets_failures():
+    form = LoginForm()
+    for _ in range(MAX_FAILED_ATTEMPTS - 1):
+        with pytest.raises(ValueError):
+            form.validate('admin', 'wrong')
+    form.validate('admin', 'admin123')
+    row = get_connection().execute("SELECT * FROM login_attempts WHERE username='admin'").fetchone()
+    assert row is None
+
+def test_pin_hash_roundtrip():
+    h = hash_pin('4321')
+    assert check_pin('4321', h)
+    assert not check_pin('1234', h)
+    assert not check_pin('4321', 'garbage')
+
+def test_cashier_switch_with_pin():
+    form = LoginForm()
+    form.set_pin(1, '2468')
+    assert [u.username for u in form.get_switchable_users()] == ['admin']
+    assert form.verify_pin(1, '2468').username == 'admin'
+    with pytest.raises(ValueError, match="Incorrect PIN"):
+        form.verify_pin(1, '0000')
+
+def test_invalid_pin_rejected():
+    with pytest.raises(ValueError):
+        LoginForm().set_pin(1, '12')
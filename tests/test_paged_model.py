@@ -0,0 +1,32 @@
+import pytest
+pytest.importorskip('PySide6')
+from PySide6.QtCore import Qt
+from database.connection import get_connection
+from ui.paged_model import Column, PagedQueryModel
+
+def _model():
+    columns = [Column("Name", "p.name", lambda r: r['name']), Column("Price", "p.sell_price", lambda r: str(r['sell_price']))]
+    model = PagedQueryModel(columns, "p.id, p.name, p.sell_price", "products p", "p.id")
+    model.PAGE_SIZE = 7
+    return model
+
+def test_keyset_pages_cover_every_row_once():
+    conn = get_connection()
+    with conn:
+        # Duplicate sort keys must still page cleanly on the id tie-break
+        conn.executemany("INSERT INTO products (name, sell_price) VALUES (?, ?)",
+                         [(f"Paged {i % 5}", i % 3) for i in range(40)])
+    model = _model()
+    model.set_filter(["p.name LIKE ?"], ["Paged %"])
+    assert model.rowCount() == 7 and model.canFetchMore()
+    while model.canFetchMore():
+        model.fetchMore()
+    ids = [r['id'] for r in model.rows]
+    assert len(ids) == len(set(ids)) == 40 == model.count()
+
+    model.sort(1, Qt.DescendingOrder)
+    while model.canFetchMore():
+        model.fetchMore()
+    keys = [(r['sell_price'], r['id']) for r in model.rows]
+    assert keys == sorted(keys, reverse=True) and len(keys) == 40
+    assert model.data(model.index(0, 1)) == '2.0'
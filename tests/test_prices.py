@@ -0,0 +1,81 @@
+import pytest
+from database.connection import get_connection
+from services import event_bus, price_service
+from services.inventory_service import add_product
+
+def _category(name):
+    conn = get_connection()
+    with conn:
+        return conn.execute("INSERT INTO categories (name) VALUES (?)", (name,)).lastrowid
+
+def _price(product_id):
+    return get_connection().execute("SELECT sell_price FROM products WHERE id = ?", (product_id,)).fetchone()[0]
+
+def test_most_specific_rule_wins_and_history_is_kept():
+    dairy = _category('Price Dairy')
+    milk = add_product('Price Milk', category_id=dairy, gst_rate_id=2, cost_price=40, sell_price=50)
+    cheese = add_product('Price Cheese', category_id=dairy, gst_rate_id=4, cost_price=80, sell_price=100)
+    soap = add_product('Price Soap', gst_rate_id=4, cost_price=20, sell_price=30)
+
+    price_list_id = price_service.create_price_list('Festive', '2024-10-01 06:00', [
+        {'kind': 'add', 'value': 1},                                            # everything else
+        {'kind': 'percent', 'value': 10, 'category_id': dairy},                 # dairy
+        {'kind': 'markup', 'value': 50, 'category_id': dairy, 'gst_rate_id': 4, 'round_to': 5},
+    ])
+    events = []
+    event_bus.subscribe(event_bus.PRICES_CHANGED, lambda name, **payload: events.append(payload))
+
+    assert price_service.apply_due_price_lists('2024-10-01 05:59') == []
+    assert _price(milk) == 50
+    applied = price_service.apply_due_price_lists('2024-10-01 06:00')
+
+    assert _price(milk) == 55    # +10%
+    assert _price(cheese) == 120 # cost 80 + 50%, rounded to 5
+    assert _price(soap) == 31    # +1
+    assert applied == [(price_list_id, events[0]['products'])]
+    assert events[0]['price_list_id'] == price_list_id
+    history = price_service.get_price_history(cheese)
+    assert history[0]['old_price'] == 100 and history[0]['new_price'] == 120
+    assert history[0]['price_list'] == 'Festive'
+
+    # A list is applied once, and an applied list can't be cancelled
+    with pytest.raises(ValueError):
+        price_service.apply_price_list(price_list_id)
+    with pytest.raises(ValueError):
+        price_service.cancel_price_list(price_list_id)
+
+def test_markup_skips_products_without_cost_and_inactive_products():
+    snacks = _category('Price Snacks')
+    costed = add_product('Price Chips', category_id=snacks, cost_price=10, sell_price=12)
+    uncosted = add_product('Price Namkeen', category_id=snacks, cost_price=0, sell_price=25)
+    retired = add_product('Price Wafers', category_id=snacks, cost_price=10, sell_price=12)
+    conn = get_connection()
+    with conn:
+        conn.execute("UPDATE products SET is_active = 0 WHERE id = ?", (retired,))
+
+    price_list_id = price_service.create_price_list('Snacks', '2024-11-01', [
+        {'kind': 'markup', 'value': 50, 'category_id': snacks}])
+    assert price_service.preview_price_list(price_list_id)[0] == 1
+    price_service.apply_price_list(price_list_id)
+    assert (_price(costed), _price(uncosted), _price(retired)) == (15, 25, 12)
+
+def test_applied_lists_are_found_by_time_applied():
+    first = price_service.create_price_list('Applied A', '2024-12-01', [{'kind': 'add', 'value': 1}])
+    second = price_service.create_price_list('Applied B', '2024-12-01', [{'kind': 'add', 'value': 1}])
+    price_service.apply_price_list(first, '2024-12-02 08:00')
+    price_service.apply_price_list(second, '2024-12-02 09:30')
+    assert [i for i, _, _ in price_service.get_applied_price_lists('2024-12-02 08:00')] == [first, second]
+    assert price_service.get_applied_price_lists('2024-12-02 09:30:01') == []
+
+def test_scheduling_and_validation():
+    with pytest.raises(ValueError):
+        price_service.create_price_list('Bad', '2024-13-01', [{'kind': 'add', 'value': 1}])
+    with pytest.raises(ValueError):
+        price_service.create_price_list('Bad', '2024-10-01', [{'kind': 'double', 'value': 1}])
+
+    later = price_service.create_price_list('Later', '2030-01-01 09:00', [{'kind': 'percent', 'value': 5}])
+    sooner = price_service.create_price_list('Sooner', '2029-01-01', [{'kind': 'percent', 'value': 5}])
+    assert price_service.next_price_list_start().isoformat() == '2029-01-01T00:00:00'
+    price_service.cancel_price_list(sooner)
+    assert price_service.next_price_list_start().isoformat() == '2030-01-01T09:00:00'
+    assert price_service.get_price_lists()[0]['id'] == later
@@ -0,0 +1,53 @@
+import pytest
+from database.connection import get_connection
+from services import purchase_service
+from services.batch_service import get_batches
+from services.inventory_service import add_product
+
+def _product(product_id):
+    return dict(get_connection().execute("SELECT stock, cost_price FROM products WHERE id = ?",
+                                         (product_id,)).fetchone())
+
+def test_post_books_stock_logs_batches_and_landed_average_cost():
+    oil = add_product('GRN Oil', barcode='8900000000111', cost_price=100, stock=10)
+    salt = add_product('GRN Salt', sku='SALT-1', cost_price=20, stock=0)
+    grn = purchase_service.create_purchase('Metro Wholesale', 'MW-778', freight=50)
+
+    purchase_service.record_scan(grn, '8900000000111', 5, unit_cost=110, expiry_date='2025-01-31')
+    purchase_service.record_scan(grn, '8900000000111', 5)            # same line, cost kept
+    assert purchase_service.add_lines(grn, [{'product_id': salt, 'qty': 30, 'unit_cost': 10}]) == 2
+    with pytest.raises(ValueError):
+        purchase_service.record_scan(grn, 'NOPE')
+    with pytest.raises(ValueError):
+        purchase_service.record_scan(grn, 'SALT-1', 0)
+
+    summary = purchase_service.post_purchase(grn)
+    # goods 10 x 110 + 30 x 10 = 1400; freight 50 lifts every cost by 50/1400
+    assert summary == {'lines': 2, 'qty': 40, 'goods': 1400, 'freight': 50, 'total_cost': 1450}
+    landed = 1 + 50 / 1400
+    assert _product(oil) == {'stock': 20, 'cost_price': round((10 * 100 + 10 * 110 * landed) / 20, 4)}
+    assert _product(salt) == {'stock': 30, 'cost_price': round(10 * landed, 4)}
+
+    logs = get_connection().execute("""
+        SELECT product_id, change_qty FROM inventory_logs WHERE purchase_id = ? AND reason = 'purchase'
+        ORDER BY product_id
+    """, (grn,)).fetchall()
+    assert [tuple(r) for r in logs] == [(oil, 10), (salt, 30)]
+    assert [(b['batch_no'], b['expiry_date'], b['qty']) for b in get_batches(oil)] == \
+        [(f'GRN-{grn}', '2025-01-31', 10), ('OPENING', None, 10)]
+
+    with pytest.raises(ValueError):
+        purchase_service.post_purchase(grn) # already posted
+
+def test_import_lines_skips_bad_rows(tmp_path):
+    add_product('GRN Soap', sku='SOAP-1', cost_price=15)
+    path = tmp_path / 'delivery.csv'
+    path.write_text("sku,qty,unit_cost,batch_no\nSOAP-1,12,14.5,B7\nMISSING,3,1,\nSOAP-1,-2,1,\n")
+    grn = purchase_service.create_purchase('Local')
+    stats = purchase_service.import_lines(grn, str(path))
+    assert (stats['rows'], stats['added'], [line for line, _ in stats['errors']]) == (3, 1, [3, 4])
+    [line] = purchase_service.get_purchase_lines(grn)
+    assert (line['qty'], line['unit_cost'], line['batch_no']) == (12, 14.5, 'B7')
+
+    purchase_service.cancel_purchase(grn)
+    assert purchase_service.get_draft_purchase() is None
@@ -0,0 +1,61 @@
+import pytest
+from database.connection import get_connection
+from services.receipt_template import get_template, normalize_paper
+from services.printer_service import build_receipt_lines, print_to_pdf
+
+INVOICE = {
+    'invoice_number': 'INV-0001',
+    'created_at': '2024-01-15 10:30:00',
+    'cashier_name': 'Admin',
+    'customer_name': 'Walk-in',
+    'items': [
+        {'name': 'Basmati Rice 5kg Premium Long Grain', 'qty': 2.0, 'unit_price': 450.0,
+         'gst_rate': 5.0, 'gst_amt': 45.0, 'line_total': 945.0},
+        {'name': 'Soap', 'qty': 1.0, 'unit_price': 40.0, 'gst_rate': 0.0, 'gst_amt': 0.0, 'line_total': 40.0},
+    ],
+    'subtotal': 940.0, 'discount_amt': 0.0, 'cgst_amt': 22.5, 'sgst_amt': 22.5,
+    'total': 985.0, 'payment_mode': 'Cash', 'amount_received': 1000.0,
+}
+
+def set_setting(key, value):
+    conn = get_connection()
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
+
+def test_normalize_paper():
+    assert normalize_paper('58mm') == '58'
+    assert normalize_paper('80') == '80'
+    assert normalize_paper('a4') == 'A4'
+    assert normalize_paper(None) == '80'
+
+def test_template_reused_until_settings_change():
+    set_setting('shop_name', 'Kirana Store')
+    first = get_template('80')
+    assert get_template('80') is first
+
+    set_setting('shop_name', 'Kirana Mart')
+    second = get_template('80')
+    assert second is not first
+    assert second.header[0] == ('center_bold', 'KIRANA MART')
+
+def test_lines_fit_paper_width():
+    set_setting('address', 'Shop 12, Main Market Road, Near Bus Stand, Ahmedabad 380001')
+    for paper, width in (('58', 32), ('80', 48), ('A4', 90)):
+        lines, _ = build_receipt_lines(INVOICE, paper=paper)
+        for tag, content in lines:
+            if tag in ('normal', 'divider', 'center'):
+                assert len(content) <= width
+
+def test_render_only_changes_invoice_sections():
+    template = get_template('80')
+    lines = template.render(INVOICE)
+    assert tuple(lines[:len(template.header)]) == template.header
+    assert tuple(lines[-len(template.footer):]) == template.footer
+    assert ('lr_bold', ('TOTAL:', 'Rs985.00')) in lines
+    assert ('lr', ('Change Due:', 'Rs15.00')) in lines
+
+def test_pdf_uses_same_template(tmp_path):
+    set_setting('upi_id', 'shop@upi')
+    path = print_to_pdf(INVOICE, str(tmp_path / 'receipt.pdf'), paper='A4')
+    with open(path, 'rb') as f:
+        assert f.read(4) == b'%PDF'
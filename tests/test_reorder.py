@@ -0,0 +1,44 @@
+from datetime import date, timedelta
+from database.connection import get_connection
+from services import reorder_service
+
+AS_OF = date(2024, 6, 1)
+
+def _daily_sales(product_id, qty_per_day, days):
+    conn = get_connection()
+    with conn:
+        for n in range(1, days + 1):
+            day = (AS_OF - timedelta(days=n)).isoformat()
+            invoice_id = conn.execute("""
+                INSERT INTO invoices (invoice_number, subtotal, total, created_at) VALUES (?, 0, 0, ?)
+            """, (f"RO-{product_id}-{day}", f"{day} 10:00:00")).lastrowid
+            conn.execute("""
+                INSERT INTO invoice_items (invoice_id, product_id, product_name, qty, unit_price, line_total)
+                VALUES (?, ?, 'Reorder Item', ?, 1, ?)
+            """, (invoice_id, product_id, qty_per_day, qty_per_day))
+
+def _product(name, stock, low=5):
+    return get_connection().execute("""
+        INSERT INTO products (name, sell_price, stock, low_stock_qty) VALUES (?, 1, ?, ?)
+    """, (name, stock, low)).lastrowid
+
+def test_steady_seller_gets_lead_and_cover_quantity():
+    fast = _product('Fast Mover', stock=20)
+    stocked = _product('Well Stocked', stock=10000)
+    _daily_sales(fast, 10, 91)
+    _daily_sales(stocked, 10, 91)
+
+    rows = {r[0]: r for r in reorder_service.compute_suggestions(AS_OF)}
+    # 10/day over every window; (7 lead + 14 cover) days + 5 safety - 20 on hand
+    assert rows[fast] == (fast, 10.0, 2.0, 195.0)
+    assert stocked not in rows
+
+    reorder_service.save_suggestions(rows.values())
+    assert [r['name'] for r in reorder_service.get_suggestions()] == ['Fast Mover']
+
+def test_recent_trend_weighs_more():
+    recent = _product('New Hit', stock=0, low=0)
+    _daily_sales(recent, 7, 7)
+    velocity = reorder_service.compute_suggestions(AS_OF)[0][1]
+    # 0.5 * 7 + 0.3 * 49/28 + 0.2 * 49/91
+    assert velocity == round(3.5 + 0.3 * 49 / 28 + 0.2 * 49 / 91, 3)
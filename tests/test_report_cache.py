@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+from database.connection import get_connection
+from services import report_cache, report_service
+from services.billing_service import BillingCart
+from services.invoice_service import create_invoice
+
+def _counting(fn):
+    calls = []
+    def compute(start, end, conn):
+        calls.append((start, end))
+        return fn(start, end, conn)
+    return compute, calls
+
+def _closed_invoice(day):
+    cursor = get_connection().cursor()
+    cursor.execute("""
+        INSERT INTO invoices (invoice_number, subtotal, total, created_at, day_closed)
+        VALUES (?, 100, 105, ?, 1)
+    """, (f"CACHE-{day}", f"{day} 11:00:00"))
+
+def test_closed_range_is_kept_on_disk():
+    day = (date.today() - timedelta(days=3)).isoformat()
+    _closed_invoice(day)
+    compute, calls = _counting(report_service.get_gst_summary)
+
+    first = report_cache.cached_report('gst', day, day, compute)
+    report_cache.clear(disk=False) # simulate a restart
+    second = report_cache.cached_report('gst', day, day, compute)
+
+    assert first == second and len(calls) == 1
+    assert report_cache.stats()['disk_hits'] == 1
+
+def test_open_day_invalidated_by_commit():
+    today = date.today().isoformat()
+    compute, calls = _counting(lambda start, end, conn: report_service.get_daily_summary(start, conn))
+    assert report_cache.cached_report('daily', today, today, compute)['bills'] == 0
+    assert report_cache.cached_report('daily', today, today, compute)['bills'] == 0
+    assert len(calls) == 1
+
+    cursor = get_connection().cursor()
+    cursor.execute("INSERT INTO products (name, sell_price, stock) VALUES ('Cache Item', 10, 10)")
+    cart = BillingCart()
+    cart.add_item({'product_id': cursor.lastrowid, 'name': 'Cache Item', 'unit_price': 10.0})
+    create_invoice(1, None, cart.calculate_totals())
+
+    assert report_cache.cached_report('daily', today, today, compute)['bills'] == 1
+    assert len(calls) == 2
+
+def test_memory_budget_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(report_cache, 'MEMORY_BUDGET', 2000)
+    big = lambda start, end, conn: [{'row': 'x' * 500}]
+    for i in range(5):
+        report_cache.cached_report('big', f'2000-01-0{i + 1}', f'2000-01-0{i + 1}', big)
+    s = report_cache.stats()
+    assert s['bytes'] <= 2000 and s['entries'] < 5
+
+def test_version_bump_ignores_old_disk_entries(monkeypatch):
+    day = (date.today() - timedelta(days=3)).isoformat()
+    _closed_invoice(day)
+    compute, calls = _counting(report_service.get_gst_summary)
+    report_cache.cached_report('gst', day, day, compute)
+    report_cache.clear(disk=False)
+
+    monkeypatch.setitem(report_cache.REPORT_VERSIONS, 'gst', 99)
+    report_cache.cached_report('gst', day, day, compute)
+    assert len(calls) == 2
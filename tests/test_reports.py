@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+from database.connection import get_connection
+from services import report_service
+
+def _invoice(number, created_at, rate, line_total, gst_amt, product_id):
+    cursor = get_connection().cursor()
+    cursor.execute("""
+        INSERT INTO invoices (invoice_number, subtotal, total, cgst_amt, sgst_amt, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (number, line_total - gst_amt, line_total, gst_amt / 2, gst_amt / 2, created_at))
+    cursor.execute("""
+        INSERT INTO invoice_items (invoice_id, product_id, product_name, qty, unit_price, gst_rate, gst_amt, line_total)
+        VALUES (?, ?, 'Report Item', 1, ?, ?, ?, ?)
+    """, (cursor.lastrowid, product_id, line_total, rate, gst_amt, line_total))
+
+def _product():
+    cursor = get_connection().cursor()
+    cursor.execute("INSERT INTO products (name) VALUES ('Report Item')")
+    return cursor.lastrowid
+
+def test_date_range_includes_whole_end_day():
+    pid = _product()
+    _invoice('R-1', '2024-03-01 00:00:00', 5.0, 105.0, 5.0, pid)
+    _invoice('R-2', '2024-03-31 23:59:59', 5.0, 210.0, 10.0, pid)
+    _invoice('R-3', '2024-04-01 00:00:00', 5.0, 999.0, 1.0, pid)
+
+    rows = report_service.get_gst_summary('2024-03-01', '2024-03-31')
+    assert len(rows) == 1 and rows[0]['total_tax'] == 15.0
+    assert report_service.get_daily_summary('2024-03-31')['bills'] == 1
+
+def test_chunked_gst_matches_single_query():
+    pid = _product()
+    start = date(2024, 1, 1)
+    for i in range(40):
+        day = (start + timedelta(days=i)).isoformat()
+        _invoice(f'C-{i}', f'{day} 10:00:00', [5.0, 12.0, 18.0][i % 3], 100.0 + i, 5.0 + i, pid)
+
+    partials = list(report_service.iter_gst_summary('2024-01-01', '2024-02-09', chunk_days=7))
+    assert [p[:2] for p in partials] == [(i, 6) for i in range(1, 7)]
+    assert partials[-1][2] == report_service.get_gst_summary('2024-01-01', '2024-02-09')
+
+def test_report_uses_created_at_index():
+    plan = get_connection().execute("""
+        EXPLAIN QUERY PLAN SELECT COUNT(*) FROM invoices WHERE created_at >= ? AND created_at < ?
+    """, report_service.day_bounds('2024-01-01', '2024-01-31')).fetchall()
+    assert 'idx_invoices_created_at' in str([tuple(r) for r in plan])
+
+def test_derived_data_errors_are_returned_not_raised(monkeypatch):
+    pid = _product()
+    _invoice('R-9', '2024-05-02 11:00:00', 5.0, 105.0, 5.0, pid)
+    get_connection().commit()
+    report_service.close_day('2024-05-02', 1)
+
+    from services import stock_ledger
+    def broken(conn=None):
+        raise RuntimeError("disk full")
+    monkeypatch.setattr(stock_ledger, 'write_checkpoints', broken)
+    stats = report_service.update_derived_data()
+    assert stats['snapshot_rows'] == 1
+    assert stats['errors'] == ["Stock checkpoint failed: disk full"]
@@ -0,0 +1,55 @@
+import os
+import numpy as np
+from database.connection import get_connection
+from services import sales_snapshot
+
+def _closed_sale(day, hour, product_id, qty, lines=1, day_closed=1):
+    conn = get_connection()
+    with conn:
+        invoice_id = conn.execute("""
+            INSERT INTO invoices (invoice_number, subtotal, total, payment_mode, created_at, day_closed)
+            VALUES (?, 0, 0, 'upi', ?, ?)
+        """, (f"SNAP-{day}-{hour}", f"{day} {hour:02d}:15:00", day_closed)).lastrowid
+        conn.executemany("""
+            INSERT INTO invoice_items (invoice_id, product_id, product_name, qty, unit_price, line_total)
+            VALUES (?, ?, 'Snap Item', ?, 10, ?)
+        """, [(invoice_id, product_id, qty, qty * 10)] * lines)
+        conn.execute("INSERT OR IGNORE INTO day_close_log (close_date, grand_total, invoice_count) VALUES (?, 0, 0)", (day,))
+
+def test_append_is_incremental_and_readable_as_npy():
+    pid = get_connection().execute("INSERT INTO products (name, sell_price) VALUES ('Snap', 10)").lastrowid
+    _closed_sale('2024-03-04', 9, pid, 2, lines=3)   # a Monday
+    assert sales_snapshot.append_closed_days() == 3
+    _closed_sale('2024-03-05', 18, pid, 1)
+    assert sales_snapshot.append_closed_days() == 1
+    assert sales_snapshot.append_closed_days() == 0
+
+    qty = np.load(os.path.join(sales_snapshot.snapshot_dir(), 'qty.npy'))
+    assert qty.tolist() == [2, 2, 2, 1]
+
+    heat = sales_snapshot.hourly_heatmap()
+    assert heat[0, 9] == 60 and heat[1, 18] == 10
+    assert sales_snapshot.basket_sizes().tolist() == [0, 1, 0, 1]
+    assert sales_snapshot.product_velocity() == [{'product_id': pid, 'qty_per_day': 3.5, 'revenue': 70.0}]
+
+def test_interrupted_append_is_truncated(tmp_path):
+    pid = get_connection().execute("INSERT INTO products (name, sell_price) VALUES ('Snap', 10)").lastrowid
+    _closed_sale('2024-03-04', 9, pid, 2)
+    sales_snapshot.append_closed_days()
+    with open(os.path.join(sales_snapshot.snapshot_dir(), 'qty.npy'), 'ab') as f:
+        f.write(b'\0' * 24) # rows written but never committed to the manifest
+
+    _closed_sale('2024-03-05', 10, pid, 5)
+    sales_snapshot.append_closed_days()
+    assert sales_snapshot.open_snapshot()['qty'].tolist() == [2, 5]
+
+def test_lines_billed_after_close_are_appended_once():
+    pid = get_connection().execute("INSERT INTO products (name, sell_price) VALUES ('Snap', 10)").lastrowid
+    _closed_sale('2024-03-04', 9, pid, 2)
+    assert sales_snapshot.append_closed_days() == 1
+    _closed_sale('2024-03-04', 21, pid, 4, day_closed=0)   # billed after the close
+    _closed_sale('2024-03-05', 10, pid, 1)
+    assert sales_snapshot.append_closed_days() == 2
+    assert sales_snapshot.append_closed_days() == 0
+    assert sorted(sales_snapshot.open_snapshot()['qty'].tolist()) == [1, 2, 4]
+    assert sales_snapshot.load_manifest()['last_invoice_id'] == 3
@@ -0,0 +1,36 @@
+from database.connection import get_connection
+from services import stock_ledger
+from services.inventory_service import add_product, adjust_stock
+
+def _log_time(product_id, when):
+    conn = get_connection()
+    with conn:
+        conn.execute("UPDATE inventory_logs SET created_at = ? WHERE product_id = ?", (when, product_id))
+        conn.execute("UPDATE stock_checkpoints SET created_at = ? WHERE product_id = ?", (when, product_id))
+
+def test_seeded_stock_starts_reconciled():
+    # The migration turned seed stock into opening balances
+    assert stock_ledger.reconcile() == []
+
+def test_checkpoint_plus_tail_and_as_of():
+    product_id = add_product('Ledger Item', stock=10)
+    adjust_stock(product_id, -3, 'sale')
+    _log_time(product_id, '2024-01-01 09:00:00')
+    assert stock_ledger.write_checkpoints() >= 1
+    assert stock_ledger.write_checkpoints() == 0
+
+    adjust_stock(product_id, 5, 'purchase')
+    assert stock_ledger.stock_as_of(product_id) == 12
+    assert stock_ledger.stock_as_of(product_id, '2024-01-01 12:00:00') == 7
+    assert stock_ledger.stock_as_of(product_id, '2023-12-31 23:59:59') == 0
+
+def test_reconcile_finds_and_fixes_drift():
+    product_id = add_product('Drifting Item', stock=4)
+    stock_ledger.write_checkpoints()
+    conn = get_connection()
+    with conn:
+        conn.execute("UPDATE products SET stock = 9 WHERE id = ?", (product_id,))
+    mismatches = stock_ledger.reconcile()
+    assert [(m['product_id'], m['ledger_qty'], m['difference']) for m in mismatches] == [(product_id, 4, 5)]
+    stock_ledger.apply_ledger(mismatches)
+    assert stock_ledger.reconcile() == []
@@ -0,0 +1,52 @@
+import pytest
+from database.connection import get_connection
+from services import stock_take_service
+from services.inventory_service import adjust_stock
+
+def _product(name, barcode, stock, cost=10):
+    conn = get_connection()
+    with conn:
+        return conn.execute("""
+            INSERT INTO products (name, barcode, cost_price, sell_price, stock) VALUES (?, ?, ?, ?, ?)
+        """, (name, barcode, cost, cost * 2, stock)).lastrowid
+
+def _stock(product_id):
+    return get_connection().execute("SELECT stock FROM products WHERE id = ?", (product_id,)).fetchone()[0]
+
+def test_close_applies_variances_in_one_batch():
+    rice = _product('Rice', 'ST-1', 10)
+    oil = _product('Oil', 'ST-2', 5)
+    soap = _product('Soap', 'ST-3', 3)
+    take = stock_take_service.start_stock_take(1)
+    with pytest.raises(ValueError):
+        stock_take_service.start_stock_take(1)
+
+    for _ in range(8):
+        stock_take_service.record_scan(take, 'ST-1')
+    assert stock_take_service.record_scan(take, 'ST-2', 6) == (oil, 6)
+    stock_take_service.record_counts(take, [(soap, 3)])
+    with pytest.raises(ValueError):
+        stock_take_service.record_scan(take, 'NOPE')
+
+    # A sale after rice was counted must not show up as shrinkage
+    adjust_stock(rice, -2, 'sale')
+    summary = stock_take_service.close_stock_take(take, 1)
+    assert summary == {'counted': 3, 'adjusted': 2, 'net_qty': -1, 'net_value': -10}
+    assert (_stock(rice), _stock(oil), _stock(soap)) == (6, 6, 3)
+
+    logs = get_connection().execute("""
+        SELECT product_id, change_qty FROM inventory_logs WHERE reason = 'stock_take' ORDER BY product_id
+    """).fetchall()
+    assert [tuple(r) for r in logs] == [(rice, -2), (oil, 1)]
+    with pytest.raises(ValueError):
+        stock_take_service.record_scan(take, 'ST-1')
+
+def test_cancel_leaves_stock_untouched():
+    item = _product('Tea', 'ST-9', 4)
+    take = stock_take_service.start_stock_take()
+    stock_take_service.record_scan(take, 'ST-9', 1)
+    assert stock_take_service.record_scan(take, 'ST-9', 7, replace=True) == (item, 7)
+    assert stock_take_service.get_stock_take_lines(take)[0]['variance'] == 3
+    stock_take_service.cancel_stock_take(take)
+    assert _stock(item) == 4
+    assert stock_take_service.get_open_stock_take() is None
@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+from database.connection import get_connection
+from services import top_sellers
+from services.billing_service import BillingCart
+from services.invoice_service import create_invoice
+from services.report_service import close_day
+
+def _products(*names):
+    cursor = get_connection().cursor()
+    ids = []
+    for name in names:
+        cursor.execute("INSERT INTO products (name, sell_price, stock) VALUES (?, 10, 100)", (name,))
+        ids.append(cursor.lastrowid)
+    get_connection().commit()
+    return ids
+
+def _sell(pid, name, qty):
+    cart = BillingCart()
+    cart.add_item({'product_id': pid, 'name': name, 'unit_price': 10.0}, qty)
+    return create_invoice(1, None, cart.calculate_totals())
+
+def test_board_updates_from_commits():
+    a, b, c = _products('Top A', 'Top B', 'Top C')
+    _sell(a, 'Top A', 3)
+    assert [p['name'] for p in top_sellers.get_top_products(k=2)] == ['Top A']
+
+    _sell(b, 'Top B', 5)
+    _sell(c, 'Top C', 1)
+    _sell(c, 'Top C', 4)
+    top = top_sellers.get_top_products(k=2)
+    assert [(p['name'], p['qty_sold']) for p in top] == [('Top B', 5), ('Top C', 5)]
+
+    # Matches a fresh aggregate of the same day
+    fresh = top_sellers.DayLeaderboard.load(date.today().isoformat()).top_k(2)
+    assert fresh == top
+
+def test_closed_day_served_from_snapshot():
+    (a,) = _products('Closed A')
+    _sell(a, 'Closed A', 2)
+    today = date.today().isoformat()
+    close_day(today, 1)
+
+    rows = get_connection().execute("SELECT name, rank FROM daily_top_products WHERE close_date = ?",
+                                    (today,)).fetchall()
+    assert [(r['name'], r['rank']) for r in rows] == [('Closed A', 1)]
+
+def test_sales_after_close_are_not_hidden_by_the_snapshot():
+    a, b = _products('Late A', 'Late B')
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    conn = get_connection()
+    first = _sell(a, 'Late A', 2)
+    with conn:
+        conn.execute("UPDATE invoices SET created_at = ? WHERE id = ?", (f"{yesterday} 10:00:00", first.id))
+    close_day(yesterday, 1)
+    assert top_sellers.get_top_products(yesterday, k=1)[0]['name'] == 'Late A'
+
+    late = _sell(b, 'Late B', 5)
+    with conn:
+        conn.execute("UPDATE invoices SET created_at = ? WHERE id = ?", (f"{yesterday} 22:00:00", late.id))
+    assert [p['name'] for p in top_sellers.get_top_products(yesterday, k=2)] == ['Late B', 'Late A']
@@ -0,0 +1,47 @@
+# ui/delegates.py
+# Item delegates for model-based tables
+
+from PySide6.QtCore import Qt, QEvent, QRect, Signal
+from PySide6.QtWidgets import QStyledItemDelegate, QStyleOptionButton, QStyle, QApplication
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """
+    Paints a row of push buttons in a cell instead of creating widgets per row.
+    Emits clicked(row, label) when one is released.
+    """
+    clicked = Signal(int, str)
+
+    def __init__(self, labels, parent=None):
+        super().__init__(parent)
+        self.labels = labels
+        self.pressed = None # (row, label) under the mouse button
+
+    def _rects(self, rect):
+        width = rect.width() // len(self.labels)
+        return [(label, QRect(rect.x() + i * width + 2, rect.y() + 2, width - 4, rect.height() - 4))
+                for i, label in enumerate(self.labels)]
+
+    def paint(self, painter, option, index):
+        style = option.widget.style() if option.widget else QApplication.style()
+        for label, rect in self._rects(option.rect):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = label
+            button.state = QStyle.State_Enabled | (
+                QStyle.State_Sunken if self.pressed == (index.row(), label) else QStyle.State_Raised)
+            style.drawControl(QStyle.CE_PushButton, button, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease):
+            return False
+        hit = next((label for label, rect in self._rects(option.rect)
+                    if rect.contains(event.position().toPoint())), None)
+        if event.type() == QEvent.MouseButtonPress:
+            self.pressed = (index.row(), hit) if hit else None
+            return hit is not None
+        was_pressed, self.pressed = self.pressed, None
+        if hit and was_pressed == (index.row(), hit):
+            self.clicked.emit(index.row(), hit)
+            return True
+        return False
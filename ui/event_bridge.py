@@ -0,0 +1,30 @@
+from PySide6.QtCore import QObject, Signal
+from services import event_bus
+
+
+class EventBridge(QObject):
+    """
+    Re-emits services.event_bus events as a Qt signal. Events published from
+    worker threads are queued to the UI thread, and connections to a screen
+    are dropped automatically when the screen is deleted.
+    """
+    event = Signal(str, dict)
+
+    def __init__(self, events):
+        super().__init__()
+        for name in events:
+            event_bus.subscribe(name, self._forward)
+
+    def _forward(self, name, **payload):
+        self.event.emit(name, payload)
+
+
+_bridge = None
+
+def get_bridge():
+    global _bridge
+    if _bridge is None:
+        _bridge = EventBridge((event_bus.INVOICE_COMMITTED, event_bus.STOCK_CHANGED,
+                               event_bus.LOW_STOCK_CHANGED, event_bus.DUES_SETTLED,
+                               event_bus.PRICES_CHANGED))
+    return _bridge
@@ -1,16 +1,17 @@
 from PySide6.QtWidgets import (QMainWindow, QTabWidget, QWidget, QVBoxLayout, 
-                               QHBoxLayout, QListWidget, QStackedWidget, QLabel, QMessageBox)
+                               QHBoxLayout, QListWidget, QStackedWidget, QLabel, QMessageBox,
+                               QPushButton)
 from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QShortcut, QKeySequence
+import threading
+from datetime import datetime
 from ui.screens.login_screen import LoginScreen
-from ui.screens.dashboard_screen import DashboardScreen
-from ui.screens.billing_screen import BillingScreen
-from ui.screens.inventory_screen import InventoryScreen
-from ui.screens.reports_screen import ReportsScreen
-from ui.screens.customers_screen import CustomersScreen
-from ui.screens.settings_screen import SettingsScreen
 from services.backup_service import check_backup_reminder
+from utils import startup_profile
 
 class MainWindow(QMainWindow):
+    PRICE_CHECK_MS = 60000 # picks up newly scheduled price lists within a minute
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Smart Billing System")
@@ -21,11 +22,71 @@ class MainWindow(QMainWindow):
         
         self.setCentralWidget(self.login_screen)
         
+        QShortcut(QKeySequence(Qt.Key_F12), self).activated.connect(self.show_switch_cashier)
+        
     def on_login_success(self, user):
+        startup_profile.mark('login_success')
+        from ui.screens.billing_screen import BillingScreen
         self.user = user
         self.billing = BillingScreen()
         self.billing.current_user = user # Set current user for invoice saving
+        from ui.event_bridge import get_bridge
+        get_bridge().event.connect(self.on_data_event)
         self.setup_main_ui()
+        # Price lists take effect at their start time while the till is open
+        self.price_timer = QTimer(self)
+        self.price_timer.setSingleShot(True)
+        self.price_timer.setTimerType(Qt.PreciseTimer)
+        self.price_timer.timeout.connect(self.run_price_lists)
+        self.prices_seen = (datetime.now(), set()) # applied_at and ids of the newest lists seen
+        # Runs once the billing screen has been painted and can take scans
+        QTimer.singleShot(0, self.on_billing_ready)
+        
+    def on_billing_ready(self):
+        startup_profile.mark('billing_ready')
+        startup_profile.finish()
+        # Load printing/PDF/QR libraries before the first bill is printed
+        from services.printer_service import warm_up
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+        self.run_price_lists()
+        
+    def run_price_lists(self):
+        """
+        Applies price lists that are due and picks up those another process
+        applied, then sleeps until the next start time.
+        """
+        from services.price_service import apply_due_price_lists, next_price_list_start
+        try:
+            applied = apply_due_price_lists()
+            applied += self.price_lists_applied_elsewhere({i for i, _ in applied})
+            next_start = next_price_list_start()
+        except Exception as e:
+            print(f"Price list scheduler error: {e}")
+            applied, next_start = [], None
+        if applied:
+            self.statusBar().showMessage(f"Price list applied: {sum(n for _, n in applied)} prices changed", 8000)
+        wait = self.PRICE_CHECK_MS
+        if next_start:
+            wait = min(wait, max(0, int((next_start - datetime.now()).total_seconds() * 1000)))
+        self.price_timer.start(wait)
+        
+    def price_lists_applied_elsewhere(self, applied_here):
+        """
+        Lists applied since the last check by another process (smart_pos.py
+        prices due), whose PRICES_CHANGED never reached this one: publishes it
+        here so the open bill and product lists reprice. Returns [(id, products)].
+        """
+        from services import event_bus
+        from services.price_service import get_applied_price_lists
+        since, seen = self.prices_seen
+        recent = get_applied_price_lists(since)
+        if recent:
+            latest = recent[-1][1]
+            self.prices_seen = (latest, {i for i, at, _ in recent if at == latest})
+        outside = [(i, n) for i, _, n in recent if i not in seen and i not in applied_here]
+        for price_list_id, changed in outside:
+            event_bus.publish(event_bus.PRICES_CHANGED, price_list_id=price_list_id, products=changed)
+        return outside
         
     def setup_main_ui(self):
         container = QWidget()
@@ -50,26 +111,19 @@ class MainWindow(QMainWindow):
         self.nav_buttons = []
         self.stacked = QStackedWidget()
         
-        # Screens
-        self.dashboard = DashboardScreen()
-        self.customers = CustomersScreen()
-        
-        self.customers.new_bill_requested.connect(self.switch_to_billing_with_customer)
+        # Screens other than billing are built on first navigation
+        self.screen_factories = {}
         
         # Add core screens
         self.add_screen("Billing (POS)", self.billing)
-        self.add_screen("Dashboard", self.dashboard)
-        self.add_screen("Customers", self.customers)
+        self.add_screen("Dashboard", self.create_dashboard)
+        self.add_screen("Customers", self.create_customers)
         
         # Admin screens
         if self.user.role == 'admin':
-            self.inventory = InventoryScreen()
-            self.reports = ReportsScreen()
-            self.settings = SettingsScreen(current_user=self.user)
-            
-            self.add_screen("Inventory", self.inventory)
-            self.add_screen("Reports", self.reports)
-            self.add_screen("Settings", self.settings)
+            self.add_screen("Inventory", self.create_inventory)
+            self.add_screen("Reports", self.create_reports)
+            self.add_screen("Settings", self.create_settings)
         else:
             # Add access denied screens for staff
             self.add_screen("Inventory", self.create_denied_screen())
@@ -79,9 +133,16 @@ class MainWindow(QMainWindow):
         sidebar_layout.addStretch()
         
         # User role indicator at bottom of sidebar
-        lbl_user = QLabel(f"👤 {self.user.full_name}\n({self.user.role.title()})")
-        lbl_user.setStyleSheet("color: #94A3B8; font-size: 12px; padding: 20px;")
-        sidebar_layout.addWidget(lbl_user)
+        self.lbl_user = QLabel()
+        self.lbl_user.setStyleSheet("color: #94A3B8; font-size: 12px; padding: 20px 20px 5px 20px;")
+        self.update_user_label()
+        sidebar_layout.addWidget(self.lbl_user)
+        
+        btn_switch = QPushButton("Switch Cashier [F12]")
+        btn_switch.setObjectName("nav_button")
+        btn_switch.setCursor(Qt.PointingHandCursor)
+        btn_switch.clicked.connect(self.show_switch_cashier)
+        sidebar_layout.addWidget(btn_switch)
         
         # Right Side (Topbar + Content)
         right_panel = QWidget()
@@ -99,6 +160,15 @@ class MainWindow(QMainWindow):
         self.lbl_page_title = QLabel("Billing (POS)")
         self.lbl_page_title.setObjectName("page_title")
         topbar_layout.addWidget(self.lbl_page_title)
+        topbar_layout.addStretch()
+        
+        # Low stock alert badge, kept current by LOW_STOCK_CHANGED events
+        self.btn_low_stock = QPushButton()
+        self.btn_low_stock.setObjectName("alert_badge")
+        self.btn_low_stock.setCursor(Qt.PointingHandCursor)
+        self.btn_low_stock.clicked.connect(self.show_low_stock)
+        topbar_layout.addWidget(self.btn_low_stock)
+        self.update_low_stock_badge()
         
         right_layout.addWidget(topbar)
         right_layout.addWidget(self.stacked)
@@ -117,10 +187,64 @@ class MainWindow(QMainWindow):
             QTimer.singleShot(1000, lambda: QMessageBox.information(self, "Backup Reminder", 
                   "Reminder: Last backup was more than 7 days ago. Go to Settings > Backup."))
 
+    def on_data_event(self, name, payload):
+        from services import event_bus
+        if name != event_bus.LOW_STOCK_CHANGED:
+            return
+        self.update_low_stock_badge()
+        entered = [p['name'] for p in payload['products'] if p['is_low_stock']]
+        if entered:
+            self.statusBar().showMessage(f"Low stock: {', '.join(entered[:3])}"
+                                         + (f" and {len(entered) - 3} more" if len(entered) > 3 else ""), 8000)
+
+    def update_low_stock_badge(self):
+        from services.inventory_service import count_low_stock
+        count = count_low_stock()
+        self.btn_low_stock.setText(f"⚠ {count} Low Stock")
+        self.btn_low_stock.setVisible(count > 0)
+
+    def show_low_stock(self):
+        if self.user.role != 'admin':
+            self.switch_screen(1, "Dashboard")
+            return
+        idx = 3 # Inventory
+        self.switch_screen(idx, self.nav_buttons[idx].text())
+        self.inventory.show_low_stock()
+
+    def create_dashboard(self):
+        from ui.screens.dashboard_screen import DashboardScreen
+        self.dashboard = DashboardScreen()
+        return self.dashboard
+        
+    def create_customers(self):
+        from ui.screens.customers_screen import CustomersScreen
+        self.customers = CustomersScreen()
+        self.customers.new_bill_requested.connect(self.switch_to_billing_with_customer)
+        return self.customers
+        
+    def create_inventory(self):
+        from ui.screens.inventory_screen import InventoryScreen
+        self.inventory = InventoryScreen()
+        return self.inventory
+        
+    def create_reports(self):
+        from ui.screens.reports_screen import ReportsScreen
+        self.reports = ReportsScreen()
+        return self.reports
+        
+    def create_settings(self):
+        from ui.screens.settings_screen import SettingsScreen
+        self.settings = SettingsScreen(current_user=self.user)
+        return self.settings
+
     def add_screen(self, title, widget):
-        from PySide6.QtWidgets import QPushButton
+        """Adds a nav button and page. widget may be a factory called on first visit."""
         idx = self.stacked.count()
         
+        if not isinstance(widget, QWidget):
+            self.screen_factories[idx] = widget
+            widget = QWidget() # placeholder until first navigation
+        
         btn = QPushButton(title)
         btn.setObjectName("nav_button")
         btn.setCheckable(True)
@@ -128,16 +252,45 @@ class MainWindow(QMainWindow):
         
         btn.clicked.connect(lambda checked=False, i=idx, t=title: self.switch_screen(i, t))
         
-        self.sidebar_container.layout().insertWidget(self.sidebar_container.layout().count() - 2, btn)
+        self.sidebar_container.layout().addWidget(btn) # screens are added before the stretch
         self.nav_buttons.append(btn)
         self.stacked.addWidget(widget)
         
     def switch_screen(self, index, title):
         for i, btn in enumerate(self.nav_buttons):
             btn.setChecked(i == index)
+        factory = self.screen_factories.pop(index, None)
+        if factory is not None:
+            placeholder = self.stacked.widget(index)
+            self.stacked.removeWidget(placeholder)
+            placeholder.deleteLater()
+            self.stacked.insertWidget(index, factory())
         self.stacked.setCurrentIndex(index)
         self.lbl_page_title.setText(title)
         
+    def update_user_label(self):
+        self.lbl_user.setText(f"👤 {self.user.full_name}\n({self.user.role.title()})")
+        
+    def show_switch_cashier(self):
+        if not hasattr(self, 'billing'):
+            return # still on the login screen
+        from ui.screens.login_screen import SwitchCashierDialog
+        dlg = SwitchCashierDialog(self.user, self)
+        if dlg.exec() and dlg.user:
+            self.switch_cashier(dlg.user)
+            
+    def switch_cashier(self, user):
+        """Hands the till to another cashier, keeping the open bill."""
+        role_changed = user.role != self.user.role
+        self.user = user
+        self.billing.current_user = user
+        if role_changed:
+            # Admin-only screens differ; rebuild the shell around the same billing screen
+            self.billing.setParent(None)
+            self.setup_main_ui()
+        else:
+            self.update_user_label()
+            
     def create_denied_screen(self):
         w = QWidget()
         l = QVBoxLayout(w)
@@ -151,12 +304,4 @@ class MainWindow(QMainWindow):
         # Find billing index (it's always 0 in this flow)
         self.switch_screen(0, "Billing (POS)")
         
-        # Try to find customer in combo box and set it
-        c_combo = self.billing.customer_combo
-        c_name = customer_obj.name
-        idx_combo = c_combo.findText(c_name)
-        if idx_combo >= 0:
-            c_combo.setCurrentIndex(idx_combo)
-        else:
-            c_combo.addItem(c_name)
-            c_combo.setCurrentText(c_name)
+        self.billing.set_customer(customer_obj)
@@ -0,0 +1,139 @@
+# ui/paged_model.py
+# Read-only table model that loads rows a page at a time with keyset pagination and sorts in SQL
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from database.connection import get_connection
+
+
+class Column:
+    """A model column: header text, SQL sort expression (None = not sortable) and display function."""
+    def __init__(self, header, sort_expr=None, display=None, align=None):
+        self.header = header
+        self.sort_expr = sort_expr
+        self.display = display or (lambda row: '')
+        self.align = align
+
+
+class PagedQueryModel(QAbstractTableModel):
+    """
+    Rows come from SELECT fields FROM from_sql and are fetched PAGE_SIZE at a
+    time as the view scrolls, continuing after the last loaded row's
+    (sort key, key) instead of using OFFSET. Sort expressions must not be
+    NULL, or rows would drop out of the keyset comparison.
+    """
+    PAGE_SIZE = 200
+
+    def __init__(self, columns, fields, from_sql, key_expr, sort_column=0, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.fields = fields
+        self.from_sql = from_sql
+        self.key_expr = key_expr
+        self.sort_column = sort_column
+        self.descending = False
+        self.where, self.params = [], []
+        self.rows = []
+        self.index_of = {} # key -> row number, for in-place updates
+        self.exhausted = False
+
+    # ── Query ────────────────────────────────────────────────────────────
+    def set_filter(self, where, params):
+        """Replaces the WHERE conditions (SQL strings, ANDed) and reloads from the first page."""
+        self.where, self.params = list(where), list(params)
+        self.reload()
+
+    def reload(self):
+        self.beginResetModel()
+        self.rows, self.index_of = [], {}
+        self._append(self._next_page())
+        self.endResetModel()
+
+    def _where_sql(self, where):
+        return f"WHERE {' AND '.join(where)}" if where else ''
+
+    def _next_page(self):
+        sort_expr = self.columns[self.sort_column].sort_expr
+        op, direction = ('<', 'DESC') if self.descending else ('>', 'ASC')
+        where, params = list(self.where), list(self.params)
+        if self.rows:
+            last = self.rows[-1]
+            where.append(f"({sort_expr}, {self.key_expr}) {op} (?, ?)")
+            params += [last['_sort'], last['_key']]
+        page = get_connection().execute(f"""
+            SELECT {sort_expr} as _sort, {self.key_expr} as _key, {self.fields}
+            FROM {self.from_sql}
+            {self._where_sql(where)}
+            ORDER BY {sort_expr} {direction}, {self.key_expr} {direction}
+            LIMIT {self.PAGE_SIZE}
+        """, params).fetchall()
+        self.exhausted = len(page) < self.PAGE_SIZE
+        return [dict(r) for r in page]
+
+    def _append(self, page):
+        for row in page:
+            self.index_of[row['_key']] = len(self.rows)
+            self.rows.append(row)
+
+    def count(self):
+        """Total matching rows, for status text."""
+        return get_connection().execute(f"SELECT COUNT(*) FROM {self.from_sql} {self._where_sql(self.where)}",
+                                        self.params).fetchone()[0]
+
+    def row(self, row):
+        return self.rows[row]
+
+    def update_row(self, key, values):
+        """Patches a loaded row (e.g. from a STOCK_CHANGED event) without a reload."""
+        row = self.index_of.get(key)
+        if row is None:
+            return
+        self.rows[row].update(values)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.columns) - 1))
+
+    # ── QAbstractTableModel ──────────────────────────────────────────────
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted:
+            return
+        page = self._next_page()
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+            self._append(page)
+            self.endInsertRows()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section].header
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        column = self.columns[index.column()]
+        row = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            return column.display(row)
+        if role == Qt.TextAlignmentRole and column.align is not None:
+            return int(column.align)
+        if role == Qt.BackgroundRole:
+            return self.background(row, index.column())
+        return None
+
+    def background(self, row, column):
+        """Override for per-row highlighting (a QColor or None)."""
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if self.columns[column].sort_expr is None:
+            return
+        self.sort_column = column
+        self.descending = order == Qt.DescendingOrder
+        self.reload()
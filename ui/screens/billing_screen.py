@@ -1,13 +1,18 @@
 from PySide6.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QLabel, 
                                QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
                                QHeaderView, QComboBox, QDoubleSpinBox, QFormLayout, 
-                               QFrame, QCompleter, QStyledItemDelegate)
-from PySide6.QtCore import Qt, QTimer
-from PySide6.QtGui import QShortcut, QKeySequence
+                               QFrame, QCompleter, QStyledItemDelegate, QApplication)
+from PySide6.QtCore import Qt, QTimer, QModelIndex
+from PySide6.QtGui import QShortcut, QKeySequence, QStandardItem, QStandardItemModel
 from services.billing_service import BillingCart
 from database.connection import get_connection
 from utils.barcode_handler import BarcodeHandler
-from utils.whatsapp_share import open_whatsapp
+from ui.whatsapp_share import open_whatsapp
+from ui.event_bridge import get_bridge
+from services import event_bus
+from services.customer_service import get_customer, search_customers
+
+CUSTOMER_SEARCH_MS = 250 # pause in typing before the customer index is searched
 
 class QtyDelegate(QStyledItemDelegate):
     def createEditor(self, parent, option, index):
@@ -22,16 +27,20 @@ class BillingScreen(QWidget):
         super().__init__()
         self.cart = BillingCart()
         self.products_data = {} # barcode/name -> product_dict map for quick lookup
-        self.barcode_handler = BarcodeHandler()
+        self.barcode_handler = BarcodeHandler(on_scan=QApplication.beep)
         self.setup_ui()
         self.setup_shortcuts()
-        self.load_products()
+        # Barcode scans go straight to the DB, so the name completer can be
+        # filled after the screen is shown
+        QTimer.singleShot(0, self.load_products)
+        get_bridge().event.connect(self.on_data_event, Qt.QueuedConnection)
 
     def load_products(self):
         conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT p.*, g.rate as gst_rate FROM products p LEFT JOIN gst_rates g ON p.gst_rate_id = g.id WHERE p.is_active=1")
-        self.products_data.clear()
+        # Built aside and swapped in whole, so lookups never mix old and new prices
+        products_data = {}
         
         completer_list = []
         for row in cursor.fetchall():
@@ -45,16 +54,34 @@ class BillingScreen(QWidget):
             barcode = p_dict['barcode']
             
             if barcode:
-                self.products_data[barcode] = p_dict
+                products_data[barcode] = p_dict
                 completer_list.append(barcode)
             
-            self.products_data[name] = p_dict
+            products_data[name] = p_dict
             completer_list.append(name)
             
+        self.products_data = products_data
         completer = QCompleter(completer_list, self)
         completer.setCaseSensitivity(Qt.CaseInsensitive)
         self.search_input.setCompleter(completer)
 
+    def on_data_event(self, name, payload):
+        if name == event_bus.PRICES_CHANGED:
+            self.reprice()
+
+    def reprice(self):
+        """Reloads prices after a price list is applied and moves the open bill onto them."""
+        self.load_products()
+        prices = {p['product_id']: p['sell_price'] for p in self.products_data.values()}
+        for pid, item in self.cart.items.items():
+            if pid in prices:
+                item['unit_price'] = prices[pid]
+        self.refresh_cart_table()
+        self.lbl_search_msg.setText("Prices updated")
+        self.lbl_search_msg.setStyleSheet("color: #10B981; font-size: 12px;")
+        self.lbl_search_msg.show()
+        QTimer.singleShot(3000, self.lbl_search_msg.hide)
+
     def setup_ui(self):
         main_layout = QHBoxLayout(self)
         
@@ -103,7 +130,19 @@ class BillingScreen(QWidget):
         cust_layout.addWidget(QLabel("Customer:"))
         self.customer_combo = QComboBox()
         self.customer_combo.setEditable(True)
-        self.customer_combo.addItem("Walk-in")
+        self.customer_combo.setInsertPolicy(QComboBox.NoInsert)
+        self.customer_combo.addItem("Walk-in", None)
+        # Typing searches the customer index; a picked match carries its customer id
+        self.customer_matches = QStandardItemModel(self)
+        self.customer_completer = QCompleter(self.customer_matches, self)
+        self.customer_completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.customer_completer.activated[QModelIndex].connect(self.pick_customer)
+        self.customer_combo.setCompleter(self.customer_completer)
+        self.customer_search_timer = QTimer(self)
+        self.customer_search_timer.setSingleShot(True)
+        self.customer_search_timer.setInterval(CUSTOMER_SEARCH_MS)
+        self.customer_search_timer.timeout.connect(self.find_customers)
+        self.customer_combo.lineEdit().textEdited.connect(self.customer_search_timer.start)
         cust_layout.addWidget(self.customer_combo)
         right_layout.addLayout(cust_layout)
         
@@ -305,6 +344,46 @@ class BillingScreen(QWidget):
         self.lbl_sgst.setText(f"Rs {t['sgst_total']:.2f}")
         self.lbl_grand_total.setText(f"Rs {t['grand_total']:.2f}")
         
+    def find_customers(self):
+        text = self.customer_combo.currentText().strip()
+        self.customer_matches.clear()
+        if not text or text == "Walk-in":
+            return
+        for c in search_customers(text, limit=20):
+            item = QStandardItem(f"{c.name} · {c.phone}" if c.phone else c.name)
+            item.setData(c.id, Qt.UserRole)
+            self.customer_matches.appendRow(item)
+        if self.customer_matches.rowCount():
+            self.customer_completer.complete()
+
+    def pick_customer(self, index):
+        self.set_customer(get_customer(index.data(Qt.UserRole)))
+
+    def set_customer(self, customer):
+        """Puts the customer (None: Walk-in) on the bill, keyed by id."""
+        combo = self.customer_combo
+        if customer is None:
+            combo.setCurrentIndex(0)
+            return
+        index = combo.findData(customer.id)
+        if index < 0:
+            combo.addItem(f"{customer.name} · {customer.phone}" if customer.phone else customer.name, customer.id)
+            index = combo.count() - 1
+        combo.setCurrentIndex(index)
+        # The completer may have left its own text in the line edit
+        combo.setEditText(combo.itemText(index))
+
+    def selected_customer(self):
+        """The picked customer, or None for Walk-in. Typed text that wasn't picked from the list is an error."""
+        combo = self.customer_combo
+        text = combo.currentText().strip()
+        if not text:
+            return None
+        if text != combo.itemText(combo.currentIndex()):
+            raise ValueError("Pick the customer from the search list, or choose Walk-in.")
+        customer_id = combo.currentData()
+        return get_customer(customer_id) if customer_id is not None else None
+
     def new_bill(self):
         self.cart.clear()
         self.bill_discount_input.setValue(0.0)
@@ -327,16 +406,13 @@ class BillingScreen(QWidget):
         user_id = getattr(self, 'current_user', None)
         user_id = user_id.id if user_id else 1
         
-        # Determine customer id
-        cust_name = self.customer_combo.currentText()
-        cust_id = None
-        if cust_name != "Walk-in":
-            from services.customer_service import get_all_customers
-            customers = get_all_customers(search=cust_name)
-            for c in customers:
-                if c.name == cust_name:
-                    cust_id = c.id
-                    break
+        try:
+            customer = self.selected_customer()
+        except ValueError as e:
+            QMessageBox.warning(self, 'Customer', str(e))
+            return
+        cust_id = customer.id if customer else None
+        cust_name = customer.name if customer else "Walk-in"
         
         pay_mode = self.payment_mode.currentText()
         received = float(self.amt_received.value())
@@ -400,16 +476,11 @@ class BillingScreen(QWidget):
             return
             
         # Get customer phone
-        from services.customer_service import get_all_customers
-        phone = None
-        c_name = self.customer_combo.currentText()
-        if c_name != "Walk-in":
-            # Very naive lookup by exact name
-            customers = get_all_customers(search=c_name)
-            for c in customers:
-                if c.name == c_name:
-                    phone = c.phone
-                    break
+        try:
+            customer = self.selected_customer()
+        except ValueError:
+            customer = None
+        phone = customer.phone if customer else None
                     
         # Construct invoice data
         conn = get_connection()
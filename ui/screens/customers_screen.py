@@ -1,11 +1,15 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                                QLineEdit, QPushButton, QTableWidget, QTableWidgetItem, 
                                QHeaderView, QDialog, QFormLayout, QMessageBox, QFrame,
-                               QSplitter, QScrollArea, QDoubleSpinBox)
-from PySide6.QtCore import Qt, Signal
+                               QSplitter, QScrollArea, QDoubleSpinBox, QTableView)
+from PySide6.QtCore import Qt, Signal, QTimer
 from PySide6.QtGui import QColor
-from services.customer_service import (get_all_customers, add_customer, 
+from services.customer_service import (get_customer, add_customer, customer_filter, get_customer_summary,
                                        get_customer_invoices, get_customer_dues, settle_dues)
+from services import event_bus
+from ui.paged_model import Column, PagedQueryModel
+from ui.delegates import ButtonDelegate
+from ui.event_bridge import get_bridge
 
 class StatCard(QFrame):
     def __init__(self, title, initial_value, color):
@@ -34,11 +38,15 @@ class AddCustomerDialog(QDialog):
         self.phone_input = QLineEdit()
         self.email_input = QLineEdit()
         self.address_input = QLineEdit()
+        self.gstin_input = QLineEdit()
+        self.gstin_input.setMaxLength(15)
+        self.gstin_input.setPlaceholderText("For B2B invoices")
         
         layout.addRow("Name *:", self.name_input)
         layout.addRow("Phone:", self.phone_input)
         layout.addRow("Email:", self.email_input)
         layout.addRow("Address:", self.address_input)
+        layout.addRow("GSTIN:", self.gstin_input)
         
         btn_save = QPushButton("Save Customer")
         btn_save.setStyleSheet("background-color: #3B82F6; color: white; padding: 8px; font-weight: bold; border-radius: 4px;")
@@ -56,7 +64,7 @@ class AddCustomerDialog(QDialog):
             return
             
         try:
-            add_customer(name, phone, email, address)
+            add_customer(name, phone, email, address, self.gstin_input.text())
             QMessageBox.information(self, "Success", "Customer added successfully")
             self.accept()
         except ValueError as e:
@@ -102,15 +110,38 @@ class CollectPaymentDialog(QDialog):
             QMessageBox.warning(self, "Error", str(e))
 
 
+class CustomersModel(PagedQueryModel):
+    OUTSTANDING_COLUMN = 2
+    ACTIONS_COLUMN = 4
+    
+    def __init__(self, parent=None):
+        right = Qt.AlignRight | Qt.AlignVCenter
+        columns = [
+            Column("Name", "name", lambda r: r['name']),
+            Column("Phone", "COALESCE(phone, '')", lambda r: r['phone'] or ''),
+            Column("Outstanding", "COALESCE(outstanding, 0)", lambda r: f"Rs {r['outstanding'] or 0:.2f}", right),
+            Column("Joined", "COALESCE(created_at, '')", lambda r: (r['created_at'] or '').split(' ')[0]),
+            Column("Actions"),
+        ]
+        super().__init__(columns, "id, name, phone, outstanding, created_at", "customers", "id", parent=parent)
+        
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.ForegroundRole and index.isValid() and index.column() == self.OUTSTANDING_COLUMN:
+            return QColor("#EF4444") if (self.row(index.row())['outstanding'] or 0) > 0 else QColor("#10B981")
+        return super().data(index, role)
+
+
 class CustomersScreen(QWidget):
     # This signal will be connected in main_window.py to switch to billing screen
     # sending the customer dict or ID
     new_bill_requested = Signal(object)
+    SEARCH_DELAY_MS = 250
     
     def __init__(self):
         super().__init__()
         self.setup_ui()
         self.load_data()
+        get_bridge().event.connect(self.on_event, Qt.QueuedConnection)
         
     def setup_ui(self):
         main_layout = QHBoxLayout(self)
@@ -127,7 +158,12 @@ class CustomersScreen(QWidget):
         toolbar = QHBoxLayout()
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search customers by name or phone...")
-        self.search_input.textChanged.connect(self.load_data)
+        # Typing restarts the timer, so the query runs once the user pauses
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.load_data)
+        self.search_input.textChanged.connect(self.search_timer.start)
         
         btn_add = QPushButton("+ Add Customer")
         btn_add.setStyleSheet("background-color: #10B981; color: white; padding: 8px; font-weight: bold; border-radius: 4px;")
@@ -148,14 +184,20 @@ class CustomersScreen(QWidget):
         summary_layout.addStretch()
         left_layout.addLayout(summary_layout)
         
-        # Table
-        self.table = QTableWidget(0, 5)
-        self.table.setHorizontalHeaderLabels(["Name", "Phone", "Outstanding", "Joined", "Actions"])
+        # Table: rows are paged in from SQL as the view scrolls
+        self.model = CustomersModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setDefaultSectionSize(32)
         self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
-        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeToContents)
+        self.table.setColumnWidth(CustomersModel.ACTIONS_COLUMN, 160)
+        self.actions = ButtonDelegate(["View", "New Bill"], self.table)
+        self.actions.clicked.connect(self.on_action)
+        self.table.setItemDelegateForColumn(CustomersModel.ACTIONS_COLUMN, self.actions)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(0, Qt.AscendingOrder)
         left_layout.addWidget(self.table)
         
         # Right side - Detail Panel
@@ -202,61 +244,47 @@ class CustomersScreen(QWidget):
         self.current_customer_id = None
         
     def load_data(self):
+        self.search_timer.stop()
         search = self.search_input.text().strip()
-        customers = get_all_customers(search if search else None)
-        
-        total_customers = len(customers)
-        dues_count = sum(1 for c in customers if c.outstanding > 0)
-        total_dues = sum(c.outstanding for c in customers)
-        
-        self.card_total.lbl_value.setText(str(total_customers))
-        self.card_dues_count.lbl_value.setText(str(dues_count))
-        self.card_total_dues.lbl_value.setText(f"Rs {total_dues:.2f}")
-        
-        self.table.setRowCount(len(customers))
-        for row, c in enumerate(customers):
-            self.table.setItem(row, 0, QTableWidgetItem(c.name))
-            self.table.setItem(row, 1, QTableWidgetItem(c.phone or ''))
-            
-            due_item = QTableWidgetItem(f"Rs {c.outstanding:.2f}")
-            if c.outstanding > 0:
-                due_item.setForeground(QColor("#EF4444")) # Red
-            else:
-                due_item.setForeground(QColor("#10B981")) # Green
-            self.table.setItem(row, 2, due_item)
-            
-            created_at_short = c.created_at.split(' ')[0] if c.created_at else ''
-            self.table.setItem(row, 3, QTableWidgetItem(created_at_short))
-            
-            # Actions
-            actions_widget = QWidget()
-            h_layout = QHBoxLayout(actions_widget)
-            h_layout.setContentsMargins(2, 2, 2, 2)
-            
-            btn_view = QPushButton("View")
-            btn_view.setCursor(Qt.PointingHandCursor)
-            btn_view.setStyleSheet("background-color: #F3F4F6; padding: 4px 8px; border-radius: 4px;")
-            
-            btn_bill = QPushButton("New Bill")
-            btn_bill.setCursor(Qt.PointingHandCursor)
-            btn_bill.setStyleSheet("background-color: #3B82F6; color: white; padding: 4px 8px; border-radius: 4px;")
-            
-            # Use lambda to capture the customer data accurately
-            btn_view.clicked.connect(lambda checked=False, cid=c.id: self.show_customer_detail(cid))
-            btn_bill.clicked.connect(lambda checked=False, cobj=c: self.request_new_bill(cobj))
+        self.model.set_filter(*customer_filter(search))
+        self.refresh_summary()
+        
+    def refresh_summary(self):
+        summary = get_customer_summary(self.search_input.text().strip())
+        self.card_total.lbl_value.setText(str(summary['customers']))
+        self.card_dues_count.lbl_value.setText(str(summary['with_dues']))
+        self.card_total_dues.lbl_value.setText(f"Rs {summary['dues']:.2f}")
+        
+    def on_event(self, name, payload):
+        if name == event_bus.DUES_SETTLED:
+            customer_id = payload['customer_id']
+        elif name == event_bus.INVOICE_COMMITTED and payload['invoice'].payment_mode == 'credit':
+            customer_id = payload['invoice'].customer_id
+        else:
+            return
+        customer = get_customer(customer_id)
+        if customer:
+            self.model.update_row(customer_id, {'outstanding': customer.outstanding})
+        self.refresh_summary()
+        if customer_id == self.current_customer_id:
+            self.show_customer_detail(customer_id)
             
-            h_layout.addWidget(btn_view)
-            h_layout.addWidget(btn_bill)
-            self.table.setCellWidget(row, 4, actions_widget)
+    def on_action(self, row, label):
+        customer_id = self.model.row(row)['id']
+        if label == "View":
+            self.show_customer_detail(customer_id)
+        else:
+            customer = get_customer(customer_id)
+            if customer:
+                self.request_new_bill(customer)
             
     def request_new_bill(self, customer_obj):
         self.new_bill_requested.emit(customer_obj)
         
     def show_customer_detail(self, customer_id):
         self.current_customer_id = customer_id
-        # Find customer from DB again to get latest info
-        customers = get_all_customers()
-        c = next((c for c in customers if c.id == customer_id), None)
+        # From the identity map, which drops a customer whenever their dues change
+        c = get_customer(customer_id)
         if not c: return
         
         self.lbl_detail_name.setText(c.name)
@@ -294,7 +322,6 @@ class CustomersScreen(QWidget):
             return
             
         dlg = CollectPaymentDialog(self.current_customer_id, outstanding, self)
-        if dlg.exec() == QDialog.Accepted:
-            self.load_data()
-            self.show_customer_detail(self.current_customer_id) # Refresh right panel
+        # The DUES_SETTLED event refreshes the row, the summary and the right panel
+        dlg.exec()
 
@@ -1,8 +1,19 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                                QFrame, QTableWidget, QTableWidgetItem, QHeaderView)
-from PySide6.QtCore import Qt, QTimer, QDate
-from services.report_service import get_daily_summary, get_product_sales
+import time
+from datetime import date
+from PySide6.QtCore import Qt
+from services.report_service import get_daily_summary
+from services.top_sellers import get_top_products
+from services.inventory_service import get_low_stock_products
+from services import event_bus
 from database.connection import get_connection
+from ui.event_bridge import get_bridge
+
+# Events keep the dashboard current; a full reload only catches changes made
+# outside this process (CLI imports, another till) and runs when the screen
+# is shown after this many seconds.
+FULL_RELOAD_AFTER = 10 * 60
 
 class StatCard(QFrame):
     def __init__(self, title, value, color):
@@ -26,10 +37,16 @@ class StatCard(QFrame):
 class DashboardScreen(QWidget):
     def __init__(self):
         super().__init__()
+        self.day = None
+        self.sales = 0.0
+        self.bills = 0
+        self.dues = 0.0
+        self.recent = []          # newest first, at most 5
+        self.low_stock = {}       # product_id -> (name, stock)
+        self.loaded_at = 0.0
         self.setup_ui()
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.load_data)
-        self.timer.start(60000) # 60s refresh
+        # Queued, so the services' own subscribers (top sellers) have run first
+        get_bridge().event.connect(self.on_event, Qt.QueuedConnection)
         self.load_data()
         
     def setup_ui(self):
@@ -118,51 +135,115 @@ class DashboardScreen(QWidget):
         layout.addLayout(tables_layout)
         layout.setStretch(2, 1)
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.day != date.today().isoformat() or time.monotonic() - self.loaded_at > FULL_RELOAD_AFTER:
+            self.load_data()
+
     def load_data(self):
-        today = QDate.currentDate().toString(Qt.ISODate)
+        today = date.today().isoformat()
         
         try:
             # 1. Summary Cards
             summary = get_daily_summary(today)
-            self.card_sales.lbl_value.setText(f"Rs {summary['sales']:.2f}")
-            self.card_bills.lbl_value.setText(str(summary['bills']))
+            self.sales = summary['sales']
+            self.bills = summary['bills']
             
             conn = get_connection()
             cursor = conn.cursor()
             
-            cursor.execute("SELECT COUNT(*) FROM products WHERE stock <= low_stock_qty AND is_active=1")
-            low_stock_count = cursor.fetchone()[0]
-            self.card_low_stock.lbl_value.setText(str(low_stock_count))
+            self.low_stock = {p['id']: (p['name'], p['stock']) for p in get_low_stock_products()}
             
             cursor.execute("SELECT SUM(outstanding) FROM customers")
-            dues = cursor.fetchone()[0] or 0.0
-            self.card_dues.lbl_value.setText(f"Rs {dues:.2f}")
+            self.dues = cursor.fetchone()[0] or 0.0
             
-            # 2. Top Products
-            top_p = get_product_sales(today, today)
-            self.top_products.setRowCount(min(5, len(top_p)))
-            for i, p in enumerate(top_p[:5]):
-                self.top_products.setItem(i, 0, QTableWidgetItem(p['name']))
-                self.top_products.setItem(i, 1, QTableWidgetItem(str(p['qty_sold'])))
-                self.top_products.setItem(i, 2, QTableWidgetItem(f"{p['revenue']:.2f}"))
-                
-            # 3. Recent Invoices
+            # 2. Recent Invoices
             cursor.execute("SELECT invoice_number, total, payment_mode, time(created_at) as t FROM invoices ORDER BY id DESC LIMIT 5")
-            invs = cursor.fetchall()
-            self.recent_inv.setRowCount(len(invs))
-            for i, inv in enumerate(invs):
-                self.recent_inv.setItem(i, 0, QTableWidgetItem(inv['invoice_number']))
-                self.recent_inv.setItem(i, 1, QTableWidgetItem(f"{inv['total']:.2f}"))
-                self.recent_inv.setItem(i, 2, QTableWidgetItem(inv['payment_mode']))
-                self.recent_inv.setItem(i, 3, QTableWidgetItem(inv['t']))
-                
-            # 4. Low stock List
-            cursor.execute("SELECT name, stock FROM products WHERE stock <= low_stock_qty AND is_active=1 LIMIT 10")
-            stocks = cursor.fetchall()
-            self.low_stock_list.setRowCount(len(stocks))
-            for i, st in enumerate(stocks):
-                self.low_stock_list.setItem(i, 0, QTableWidgetItem(st['name']))
-                self.low_stock_list.setItem(i, 1, QTableWidgetItem(str(st['stock'])))
-                
+            self.recent = [dict(r) for r in cursor.fetchall()]
+            
+            self.day = today
+            self.loaded_at = time.monotonic()
+            self.render_cards()
+            self.render_top_products()
+            self.render_recent()
+            self.render_low_stock()
         except Exception as e:
             print("Dashboard load error:", e)
+
+    # ── Live updates ─────────────────────────────────────────────────────
+    def on_event(self, name, payload):
+        if self.day != date.today().isoformat():
+            # Day rolled over: today's figures start from a fresh query
+            if self.isVisible():
+                self.load_data()
+            return
+        if name == event_bus.INVOICE_COMMITTED:
+            self.apply_invoice(payload['invoice'])
+        elif name == event_bus.LOW_STOCK_CHANGED:
+            self.apply_low_stock(payload['products'])
+        elif name == event_bus.STOCK_CHANGED:
+            self.apply_stock(payload['changes'])
+        elif name == event_bus.DUES_SETTLED:
+            self.dues -= payload['amount']
+            self.render_cards()
+
+    def apply_invoice(self, invoice):
+        if not invoice.created_at.startswith(self.day):
+            return
+        self.sales += invoice.total
+        self.bills += 1
+        if invoice.payment_mode == 'credit':
+            self.dues += invoice.total
+        self.recent = [{'invoice_number': invoice.invoice_number, 'total': invoice.total,
+                        'payment_mode': invoice.payment_mode, 't': invoice.created_at[11:19]}] + self.recent[:4]
+        self.render_cards()
+        self.render_top_products()
+        self.render_recent()
+
+    def apply_low_stock(self, products):
+        for p in products:
+            if p['is_low_stock']:
+                self.low_stock[p['id']] = (p['name'], p['stock'])
+            else:
+                self.low_stock.pop(p['id'], None)
+        self.render_cards()
+        self.render_low_stock()
+
+    def apply_stock(self, changes):
+        changed = False
+        for c in changes:
+            if c['id'] in self.low_stock and c['is_low_stock']:
+                self.low_stock[c['id']] = (c['name'], c['stock'])
+                changed = True
+        if changed:
+            self.render_low_stock()
+
+    # ── Rendering ────────────────────────────────────────────────────────
+    def render_cards(self):
+        self.card_sales.lbl_value.setText(f"Rs {self.sales:.2f}")
+        self.card_bills.lbl_value.setText(str(self.bills))
+        self.card_low_stock.lbl_value.setText(str(len(self.low_stock)))
+        self.card_dues.lbl_value.setText(f"Rs {self.dues:.2f}")
+
+    def render_top_products(self):
+        top_p = get_top_products(self.day, 5)
+        self.top_products.setRowCount(len(top_p))
+        for i, p in enumerate(top_p):
+            self.top_products.setItem(i, 0, QTableWidgetItem(p['name']))
+            self.top_products.setItem(i, 1, QTableWidgetItem(str(p['qty_sold'])))
+            self.top_products.setItem(i, 2, QTableWidgetItem(f"{p['revenue']:.2f}"))
+
+    def render_recent(self):
+        self.recent_inv.setRowCount(len(self.recent))
+        for i, inv in enumerate(self.recent):
+            self.recent_inv.setItem(i, 0, QTableWidgetItem(inv['invoice_number']))
+            self.recent_inv.setItem(i, 1, QTableWidgetItem(f"{inv['total']:.2f}"))
+            self.recent_inv.setItem(i, 2, QTableWidgetItem(inv['payment_mode']))
+            self.recent_inv.setItem(i, 3, QTableWidgetItem(inv['t']))
+
+    def render_low_stock(self):
+        stocks = sorted(self.low_stock.values(), key=lambda p: p[1])[:10]
+        self.low_stock_list.setRowCount(len(stocks))
+        for i, (name, stock) in enumerate(stocks):
+            self.low_stock_list.setItem(i, 0, QTableWidgetItem(name))
+            self.low_stock_list.setItem(i, 1, QTableWidgetItem(str(stock)))
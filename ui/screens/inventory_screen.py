@@ -1,17 +1,40 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                                QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
-                               QHeaderView, QCheckBox, QDialog, QFormLayout, 
-                               QComboBox, QDoubleSpinBox, QMessageBox, QDateEdit)
-from PySide6.QtCore import Qt, QDate
+                               QHeaderView, QCheckBox, QDialog, QFormLayout, QTableView,
+                               QComboBox, QDoubleSpinBox, QMessageBox, QDateEdit, QFileDialog,
+                               QDateTimeEdit)
+from PySide6.QtCore import Qt, QDate, QDateTime, QThreadPool, QTimer
 from PySide6.QtGui import QColor
-from database.connection import get_connection
+from services.inventory_service import (add_product, adjust_stock, get_product, update_product,
+                                        get_categories, get_gst_rates)
+from services.reorder_service import compute_suggestions, save_suggestions, get_suggestions
+from services.import_service import import_products
+from services import stock_take_service, price_service, purchase_service
+from services.label_service import get_label_items, write_labels
+from services.batch_service import receive_batch, get_expiring_batches, get_expired_batches
+from ui.workers import Worker, ReportWorker
+from ui.paged_model import Column, PagedQueryModel
+from ui.delegates import ButtonDelegate
+from ui.event_bridge import get_bridge
+from services import event_bus
+from database.connection import get_worker_connection
+
+def _import_products(path, dry_run):
+    conn = get_worker_connection() # its writes never interleave with the till's connection
+    try:
+        return import_products(path, dry_run, conn)
+    finally:
+        conn.close()
 
 class AddProductDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, product=None):
         super().__init__(parent)
-        self.setWindowTitle("Add Product")
+        self.product = product # editing an existing product when set
+        self.setWindowTitle("Edit Product" if product else "Add Product")
         self.setFixedSize(400, 500)
         self.setup_ui()
+        if product:
+            self.fill(product)
         
     def setup_ui(self):
         layout = QFormLayout(self)
@@ -19,6 +42,8 @@ class AddProductDialog(QDialog):
         self.name_input = QLineEdit()
         self.sku_input = QLineEdit()
         self.barcode_input = QLineEdit()
+        self.hsn_input = QLineEdit()
+        self.hsn_input.setMaxLength(8)
         
         self.cat_combo = QComboBox()
         self.cat_combo.addItem("General", 1)
@@ -57,6 +82,7 @@ class AddProductDialog(QDialog):
         layout.addRow("Cost Price", self.cost_price)
         layout.addRow("Sell Price", self.sell_price)
         layout.addRow("GST Rate", self.gst_combo)
+        layout.addRow("HSN Code", self.hsn_input)
         layout.addRow("Initial Stock", self.stock_input)
         layout.addRow("Low Stock Alert", self.low_stock)
         layout.addRow("Expiry Date", self.expiry)
@@ -71,6 +97,23 @@ class AddProductDialog(QDialog):
         
         layout.addRow(btn_layout)
         
+    def fill(self, product):
+        self.name_input.setText(product['name'])
+        self.sku_input.setText(product['sku'] or '')
+        self.barcode_input.setText(product['barcode'] or '')
+        self.hsn_input.setText(product['hsn_code'] or '')
+        for combo, value in ((self.cat_combo, product['category_id']), (self.gst_combo, product['gst_rate_id'])):
+            if combo.findData(value) >= 0:
+                combo.setCurrentIndex(combo.findData(value))
+        self.unit_combo.setCurrentText(product['unit'] or 'pcs')
+        self.cost_price.setValue(product['cost_price'])
+        self.sell_price.setValue(product['sell_price'])
+        self.stock_input.setValue(product['stock'])
+        self.stock_input.setEnabled(False) # changed through Adjust Stock
+        self.low_stock.setValue(product['low_stock_qty'] or 0)
+        if product['expiry_date']:
+            self.expiry.setDate(QDate.fromString(product['expiry_date'], Qt.ISODate))
+        
     def save(self):
         if not self.name_input.text().strip():
             QMessageBox.warning(self, "Error", "Name is required.")
@@ -81,35 +124,38 @@ class AddProductDialog(QDialog):
                                         QMessageBox.Yes | QMessageBox.No)
             if reply == QMessageBox.No: return
             
-        conn = get_connection()
         try:
-            with conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO products (name, sku, barcode, category_id, unit, cost_price, 
-                    sell_price, gst_rate_id, stock, low_stock_qty, expiry_date)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    self.name_input.text().strip(),
-                    self.sku_input.text().strip() or None,
-                    self.barcode_input.text().strip() or None,
-                    self.cat_combo.currentData(),
-                    self.unit_combo.currentText(),
-                    self.cost_price.value(),
-                    self.sell_price.value(),
-                    self.gst_combo.currentData(),
-                    self.stock_input.value(),
-                    self.low_stock.value(),
-                    self.expiry.date().toString(Qt.ISODate)
-                ))
-                
-                product_id = cursor.lastrowid
-                
-                if self.stock_input.value() > 0:
-                    cursor.execute("""
-                        INSERT INTO inventory_logs (product_id, change_qty, reason)
-                        VALUES (?, ?, 'purchase')
-                    """, (product_id, self.stock_input.value()))
+            if self.product:
+                update_product(
+                    self.product['id'],
+                    name=self.name_input.text().strip(),
+                    sku=self.sku_input.text().strip(),
+                    barcode=self.barcode_input.text().strip(),
+                    category_id=self.cat_combo.currentData(),
+                    unit=self.unit_combo.currentText(),
+                    cost_price=self.cost_price.value(),
+                    sell_price=self.sell_price.value(),
+                    gst_rate_id=self.gst_combo.currentData(),
+                    hsn_code=self.hsn_input.text().strip(),
+                    low_stock_qty=self.low_stock.value(),
+                    expiry_date=self.expiry.date().toString(Qt.ISODate)
+                )
+                self.accept()
+                return
+            add_product(
+                name=self.name_input.text().strip(),
+                sku=self.sku_input.text().strip() or None,
+                barcode=self.barcode_input.text().strip() or None,
+                category_id=self.cat_combo.currentData(),
+                unit=self.unit_combo.currentText(),
+                cost_price=self.cost_price.value(),
+                sell_price=self.sell_price.value(),
+                gst_rate_id=self.gst_combo.currentData(),
+                hsn_code=self.hsn_input.text().strip() or None,
+                stock=self.stock_input.value(),
+                low_stock_qty=self.low_stock.value(),
+                expiry_date=self.expiry.date().toString(Qt.ISODate)
+            )
             self.accept()
         except Exception as e:
             QMessageBox.critical(self, "DB Error", str(e))
@@ -135,6 +181,21 @@ class StockAdjustDialog(QDialog):
         self.reason.addItems(["Purchase", "Return", "Damage", "Adjustment"])
         layout.addRow("Reason:", self.reason)
         
+        # Purchases arrive as a batch with its own expiry
+        self.batch_input = QLineEdit()
+        self.batch_expiry = QDateEdit()
+        self.batch_expiry.setCalendarPopup(True)
+        self.batch_expiry.setDate(QDate.currentDate().addYears(1))
+        self.batch_has_expiry = QCheckBox("Expires")
+        self.batch_has_expiry.setChecked(True)
+        expiry_row = QHBoxLayout()
+        expiry_row.addWidget(self.batch_has_expiry)
+        expiry_row.addWidget(self.batch_expiry)
+        layout.addRow("Batch No:", self.batch_input)
+        layout.addRow("Batch Expiry:", expiry_row)
+        self.reason.currentTextChanged.connect(self.update_batch_fields)
+        self.update_batch_fields(self.reason.currentText())
+        
         btn_layout = QHBoxLayout()
         save_btn = QPushButton("Save")
         save_btn.clicked.connect(self.save)
@@ -151,25 +212,741 @@ class StockAdjustDialog(QDialog):
             self.reject()
             return
             
-        conn = get_connection()
         try:
-            with conn:
-                cursor = conn.cursor()
-                cursor.execute("UPDATE products SET stock = stock + ? WHERE id = ?", (change, self.product_id))
-                cursor.execute("""
-                    INSERT INTO inventory_logs (product_id, change_qty, reason)
-                    VALUES (?, ?, ?)
-                """, (self.product_id, change, self.reason.currentText().lower()))
+            if self.reason.currentText() == "Purchase" and change > 0:
+                expiry = self.batch_expiry.date().toString(Qt.ISODate) if self.batch_has_expiry.isChecked() else None
+                receive_batch(self.product_id, change, expiry, self.batch_input.text().strip())
+            else:
+                adjust_stock(self.product_id, change, self.reason.currentText().lower())
             self.accept()
         except Exception as e:
             QMessageBox.critical(self, "DB Error", str(e))
+            
+    def update_batch_fields(self, reason):
+        for widget in (self.batch_input, self.batch_expiry, self.batch_has_expiry):
+            widget.setEnabled(reason == "Purchase")
+            
+
+class ExpiryDialog(QDialog):
+    """Batches that have expired or expire soon, read from the expiry index."""
+    RANGES = [("Expired", None), ("Next 7 days", 7), ("Next 30 days", 30), ("Next 90 days", 90)]
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Batch Expiry")
+        self.resize(760, 480)
+        self.setup_ui()
+        self.load_data()
+        
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        top_bar = QHBoxLayout()
+        self.range_combo = QComboBox()
+        for label, days in self.RANGES:
+            self.range_combo.addItem(label, days)
+        self.range_combo.currentIndexChanged.connect(self.load_data)
+        top_bar.addWidget(self.range_combo)
+        self.lbl_total = QLabel("")
+        top_bar.addWidget(self.lbl_total)
+        top_bar.addStretch()
+        layout.addLayout(top_bar)
+        
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["Product", "Batch", "Expiry", "Qty", "Value"])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+        
+    def load_data(self):
+        days = self.range_combo.currentData()
+        rows = get_expired_batches() if days is None else get_expiring_batches(days)
+        self.table.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            for col, value in enumerate([row['name'], row['batch_no'] or '', row['expiry_date'],
+                                         f"{row['qty']:g}", f"{row['stock_value']:.2f}"]):
+                self.table.setItem(i, col, QTableWidgetItem(value))
+        self.lbl_total.setText(f"{len(rows)} batches, Rs {sum(r['stock_value'] for r in rows):.2f} at cost")
+
 
+class PurchaseSuggestionsDialog(QDialog):
+    """Saved reorder suggestions; Recalculate runs the job on a read connection."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Reorder Suggestions")
+        self.resize(760, 480)
+        self.worker = None
+        self.setup_ui()
+        self.load_data()
+        
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        
+        top_bar = QHBoxLayout()
+        self.lbl_info = QLabel("")
+        top_bar.addWidget(self.lbl_info)
+        top_bar.addStretch()
+        self.btn_recalc = QPushButton("Recalculate")
+        self.btn_recalc.clicked.connect(self.recalculate)
+        top_bar.addWidget(self.btn_recalc)
+        layout.addLayout(top_bar)
+        
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["Product", "Stock", "Sold / Day", "Days of Cover", "Order Qty"])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+        
+    def load_data(self):
+        rows = get_suggestions()
+        self.table.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            self.table.setItem(i, 0, QTableWidgetItem(row['name']))
+            self.table.setItem(i, 1, QTableWidgetItem(f"{row['stock']} {row['unit']}"))
+            self.table.setItem(i, 2, QTableWidgetItem(f"{row['velocity']:.2f}"))
+            cover = row['days_of_cover']
+            cover_item = QTableWidgetItem("-" if cover is None else f"{cover:.1f}")
+            if cover is not None and cover < 7:
+                cover_item.setBackground(QColor("#FEE2E2"))
+            self.table.setItem(i, 3, cover_item)
+            self.table.setItem(i, 4, QTableWidgetItem(f"{row['suggested_qty']:g}"))
+        computed = rows[0]['computed_at'] if rows else None
+        self.lbl_info.setText(f"{len(rows)} products to reorder (as of {computed})" if computed
+                              else "No suggestions yet. Click Recalculate.")
+        
+    def recalculate(self):
+        self.btn_recalc.setEnabled(False)
+        self.lbl_info.setText("Calculating...")
+        self.worker = ReportWorker(0, compute_suggestions)
+        self.worker.signals.result.connect(self.on_result)
+        self.worker.signals.error.connect(self.on_error)
+        self.worker.signals.finished.connect(self.on_finished)
+        QThreadPool.globalInstance().start(self.worker)
+        
+    def on_result(self, job_id, rows):
+        save_suggestions(rows) # writes stay on the UI thread's connection
+        self.load_data()
+        
+    def on_error(self, job_id, error):
+        QMessageBox.critical(self, "Error", f"Reorder calculation failed: {error}")
+        
+    def on_finished(self, job_id):
+        self.worker = None
+        self.btn_recalc.setEnabled(True)
+
+class ImportProductsDialog(QDialog):
+    """Catalog import from CSV/XLSX: Preview runs a dry run and lists the changes, Import writes them."""
+    PREVIEW_ROWS = 1000
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Import Products")
+        self.resize(760, 480)
+        self.worker = None
+        self.imported = False
+        self.setup_ui()
+        
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        
+        file_bar = QHBoxLayout()
+        self.path_input = QLineEdit()
+        self.path_input.setPlaceholderText("CSV or XLSX file...")
+        file_bar.addWidget(self.path_input)
+        btn_browse = QPushButton("Browse...")
+        btn_browse.clicked.connect(self.browse)
+        file_bar.addWidget(btn_browse)
+        layout.addLayout(file_bar)
+        
+        self.lbl_info = QLabel("Columns: name, sku, barcode, category, unit, cost_price, sell_price, "
+                               "gst_rate, hsn_code, stock, low_stock_qty, expiry_date")
+        self.lbl_info.setWordWrap(True)
+        layout.addWidget(self.lbl_info)
+        
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Line", "Product", "Action", "Changes"])
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+        
+        btn_bar = QHBoxLayout()
+        btn_bar.addStretch()
+        self.btn_preview = QPushButton("Preview")
+        self.btn_preview.clicked.connect(self.preview)
+        btn_bar.addWidget(self.btn_preview)
+        self.btn_import = QPushButton("Import")
+        self.btn_import.clicked.connect(self.run_import)
+        btn_bar.addWidget(self.btn_import)
+        layout.addLayout(btn_bar)
+        
+    def browse(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import Products", "", "Catalog (*.csv *.xlsx)")
+        if path:
+            self.path_input.setText(path)
+            
+    def preview(self):
+        self.start(True)
+        
+    def run_import(self):
+        self.start(False)
+        
+    def start(self, dry_run):
+        path = self.path_input.text().strip()
+        if not path:
+            QMessageBox.warning(self, "Error", "Choose a file to import.")
+            return
+        self.btn_preview.setEnabled(False)
+        self.btn_import.setEnabled(False)
+        self.lbl_info.setText("Checking..." if dry_run else "Importing...")
+        self.dry_run = dry_run
+        self.worker = Worker(_import_products, path, dry_run)
+        self.worker.signals.result.connect(self.on_result)
+        self.worker.signals.error.connect(self.on_error)
+        self.worker.signals.finished.connect(self.on_finished)
+        QThreadPool.globalInstance().start(self.worker)
+        
+    def on_result(self, stats):
+        rows = [(str(line), '', 'error', error) for line, error in stats['errors']]
+        rows += [(str(d['line']), d['name'], d['action'], d['changes']) for d in stats['diff']]
+        self.table.setRowCount(min(len(rows), self.PREVIEW_ROWS))
+        for i, row in enumerate(rows[:self.PREVIEW_ROWS]):
+            for col, value in enumerate(row):
+                self.table.setItem(i, col, QTableWidgetItem(value))
+                
+        if self.dry_run:
+            summary = (f"Preview: {stats['inserted']} new, {stats['updated']} changed, "
+                       f"{stats['unchanged']} unchanged, {stats['failed']} invalid")
+        else:
+            self.imported = True
+            summary = (f"Imported {stats['inserted']} new and updated {stats['updated']} products "
+                       f"in {stats['seconds']:.1f}s; {stats['failed']} failed")
+        if stats['new_categories']:
+            summary += f", {len(stats['new_categories'])} new categories"
+        self.lbl_info.setText(summary + ".")
+        
+    def on_error(self, error):
+        QMessageBox.critical(self, "Import Failed", str(error))
+        
+    def on_finished(self):
+        self.worker = None
+        self.btn_preview.setEnabled(True)
+        self.btn_import.setEnabled(True)
+
+class PurchaseDialog(QDialog):
+    """Goods receipt (GRN): lines are scanned or imported into a draft and booked together on Post."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Receive Goods")
+        self.resize(860, 560)
+        self.rows = {} # product_id -> table row
+        self.posted_lines = []
+        self.discarded = False
+        draft = purchase_service.get_draft_purchase()
+        self.purchase_id = draft['id'] if draft else purchase_service.create_purchase()
+        self.setup_ui(draft or {})
+        self.load_data()
+        
+    def setup_ui(self, draft):
+        layout = QVBoxLayout(self)
+        
+        header = QHBoxLayout()
+        self.supplier_input = QLineEdit(draft.get('supplier') or '')
+        self.supplier_input.setPlaceholderText("Supplier")
+        self.invoice_input = QLineEdit(draft.get('invoice_no') or '')
+        self.invoice_input.setPlaceholderText("Supplier invoice no.")
+        self.freight_input = QDoubleSpinBox()
+        self.freight_input.setMaximum(9999999.0)
+        self.freight_input.setPrefix("Freight Rs ")
+        self.freight_input.setValue(draft.get('freight') or 0.0)
+        for widget in (self.supplier_input, self.invoice_input, self.freight_input):
+            header.addWidget(widget)
+        layout.addLayout(header)
+        
+        scan_bar = QHBoxLayout()
+        self.scan_input = QLineEdit()
+        self.scan_input.setPlaceholderText("Scan barcode or type SKU, then Enter")
+        self.scan_input.returnPressed.connect(self.scan)
+        scan_bar.addWidget(self.scan_input, stretch=2)
+        self.qty_input = QDoubleSpinBox()
+        self.qty_input.setMaximum(99999.0)
+        self.qty_input.setValue(1.0)
+        self.qty_input.setPrefix("Qty ")
+        scan_bar.addWidget(self.qty_input)
+        self.cost_input = QDoubleSpinBox()
+        self.cost_input.setMaximum(99999.0)
+        self.cost_input.setSpecialValueText("Cost: current")
+        self.cost_input.setPrefix("Cost ")
+        scan_bar.addWidget(self.cost_input)
+        self.batch_input = QLineEdit()
+        self.batch_input.setPlaceholderText("Batch no.")
+        scan_bar.addWidget(self.batch_input)
+        self.batch_has_expiry = QCheckBox("Expires")
+        scan_bar.addWidget(self.batch_has_expiry)
+        self.batch_expiry = QDateEdit()
+        self.batch_expiry.setCalendarPopup(True)
+        self.batch_expiry.setDate(QDate.currentDate().addYears(1))
+        scan_bar.addWidget(self.batch_expiry)
+        layout.addLayout(scan_bar)
+        
+        self.lbl_status = QLabel("")
+        layout.addWidget(self.lbl_status)
+        
+        self.table = QTableWidget(0, 6)
+        self.table.setHorizontalHeaderLabels(["Product", "Qty", "Unit Cost", "Amount", "Batch", "Expiry"])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        layout.addWidget(self.table)
+        
+        btn_bar = QHBoxLayout()
+        btn_discard = QPushButton("Discard GRN")
+        btn_discard.clicked.connect(self.discard)
+        btn_bar.addWidget(btn_discard)
+        btn_remove = QPushButton("Remove Line")
+        btn_remove.clicked.connect(self.remove_line)
+        btn_bar.addWidget(btn_remove)
+        btn_import = QPushButton("Import Lines...")
+        btn_import.clicked.connect(self.import_lines)
+        btn_bar.addWidget(btn_import)
+        btn_bar.addStretch()
+        btn_post = QPushButton("Post GRN")
+        btn_post.clicked.connect(self.post)
+        btn_bar.addWidget(btn_post)
+        layout.addLayout(btn_bar)
+        
+    def load_data(self):
+        lines = purchase_service.get_purchase_lines(self.purchase_id)
+        self.table.setRowCount(0)
+        self.rows = {}
+        for line in lines:
+            self.set_line(line)
+        self.update_status(len(lines))
+        
+    def update_status(self, count):
+        total = sum(float(self.table.item(r, 3).text()) for r in range(self.table.rowCount()))
+        self.lbl_status.setText(f"GRN #{self.purchase_id}: {count} lines, Rs {total:.2f} before freight")
+        
+    def set_line(self, line):
+        row = self.rows.get(line['product_id'])
+        if row is None:
+            row = self.rows[line['product_id']] = self.table.rowCount()
+            self.table.insertRow(row)
+        for col, value in enumerate([line['name'], f"{line['qty']:g}", f"{line['unit_cost']:.2f}",
+                                     f"{line['amount']:.2f}", line['batch_no'] or '', line['expiry_date'] or '']):
+            item = QTableWidgetItem(value)
+            item.setData(Qt.UserRole, line['product_id'])
+            self.table.setItem(row, col, item)
+            
+    def scan(self):
+        code = self.scan_input.text().strip()
+        self.scan_input.clear()
+        if not code:
+            return
+        expiry = self.batch_expiry.date().toString(Qt.ISODate) if self.batch_has_expiry.isChecked() else None
+        try:
+            product_id, qty = purchase_service.record_scan(
+                self.purchase_id, code, self.qty_input.value(), self.cost_input.value() or None,
+                self.batch_input.text().strip(), expiry)
+        except ValueError as e:
+            self.lbl_status.setText(str(e))
+            return
+        line = purchase_service.get_purchase_lines(self.purchase_id, product_id)[0]
+        self.set_line(line)
+        self.table.scrollToItem(self.table.item(self.rows[product_id], 0))
+        self.update_status(len(self.rows))
+        self.qty_input.setValue(1.0)
+        
+    def remove_line(self):
+        item = self.table.item(self.table.currentRow(), 0)
+        if item is not None:
+            purchase_service.remove_line(self.purchase_id, item.data(Qt.UserRole))
+            self.load_data()
+            
+    def import_lines(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import GRN Lines", "", "Delivery (*.csv *.xlsx)")
+        if not path:
+            return
+        try:
+            stats = purchase_service.import_lines(self.purchase_id, path)
+        except ValueError as e:
+            QMessageBox.critical(self, "Import Failed", str(e))
+            return
+        self.load_data()
+        errors = "\n".join(f"line {line}: {error}" for line, error in stats['errors'][:20])
+        if errors:
+            QMessageBox.warning(self, "Import Lines", f"Added {stats['added']} of {stats['rows']} rows.\n\n{errors}")
+            
+    def save_header(self):
+        purchase_service.update_purchase(self.purchase_id, supplier=self.supplier_input.text().strip() or None,
+                                         invoice_no=self.invoice_input.text().strip() or None,
+                                         freight=self.freight_input.value())
+        
+    def post(self):
+        reply = QMessageBox.question(self, "Post GRN", f"Book {len(self.rows)} lines into stock?",
+                                     QMessageBox.Yes | QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+        try:
+            self.save_header()
+            self.posted_lines = purchase_service.get_purchase_lines(self.purchase_id)
+            summary = purchase_service.post_purchase(self.purchase_id)
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+        QMessageBox.information(self, "GRN Posted",
+                                f"{summary['lines']} lines, {summary['qty']:g} units received; "
+                                f"landed cost Rs {summary['total_cost']:.2f}.")
+        self.accept()
+        
+    def discard(self):
+        reply = QMessageBox.question(self, "Discard GRN", "Discard this GRN and all its lines?",
+                                     QMessageBox.Yes | QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            purchase_service.cancel_purchase(self.purchase_id)
+            self.discarded = True
+            self.reject()
+            
+    def reject(self):
+        # Closing keeps the draft, header included, for later
+        if not self.discarded:
+            self.save_header()
+        super().reject()
+
+class StockTakeDialog(QDialog):
+    """Scan-to-count session. Counts are staged and only touch stock when applied."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Stock Take")
+        self.resize(760, 520)
+        self.rows = {} # product_id -> table row
+        take = stock_take_service.get_open_stock_take()
+        self.take_id = take['id'] if take else stock_take_service.start_stock_take()
+        self.setup_ui()
+        self.load_data()
+        
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        
+        scan_bar = QHBoxLayout()
+        self.scan_input = QLineEdit()
+        self.scan_input.setPlaceholderText("Scan barcode or type SKU, then Enter")
+        self.scan_input.returnPressed.connect(self.scan)
+        scan_bar.addWidget(self.scan_input)
+        scan_bar.addWidget(QLabel("Qty"))
+        self.qty_input = QDoubleSpinBox()
+        self.qty_input.setMaximum(99999.0)
+        self.qty_input.setValue(1.0)
+        scan_bar.addWidget(self.qty_input)
+        self.replace_check = QCheckBox("Set count")
+        scan_bar.addWidget(self.replace_check)
+        layout.addLayout(scan_bar)
+        
+        self.lbl_status = QLabel("")
+        layout.addWidget(self.lbl_status)
+        
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Product", "System", "Counted", "Variance"])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+        
+        btn_bar = QHBoxLayout()
+        btn_discard = QPushButton("Discard Count")
+        btn_discard.clicked.connect(self.discard)
+        btn_bar.addWidget(btn_discard)
+        btn_bar.addStretch()
+        btn_apply = QPushButton("Apply Counts")
+        btn_apply.clicked.connect(self.apply)
+        btn_bar.addWidget(btn_apply)
+        layout.addLayout(btn_bar)
+        
+    def load_data(self):
+        lines = stock_take_service.get_stock_take_lines(self.take_id)
+        self.table.setRowCount(0)
+        self.rows = {}
+        for line in lines:
+            self.set_line(line)
+        self.lbl_status.setText(f"Stock take #{self.take_id}: {len(lines)} products counted")
+        
+    def set_line(self, line):
+        row = self.rows.get(line['product_id'])
+        if row is None:
+            row = self.rows[line['product_id']] = self.table.rowCount()
+            self.table.insertRow(row)
+        variance = QTableWidgetItem(f"{line['variance']:+g}")
+        if line['variance']:
+            variance.setBackground(QColor("#FEE2E2" if line['variance'] < 0 else "#DCFCE7"))
+        for col, item in enumerate([QTableWidgetItem(line['name']), QTableWidgetItem(f"{line['system_qty']:g}"),
+                                    QTableWidgetItem(f"{line['counted_qty']:g}"), variance]):
+            self.table.setItem(row, col, item)
+            
+    def scan(self):
+        code = self.scan_input.text().strip()
+        self.scan_input.clear()
+        if not code:
+            return
+        try:
+            product_id, counted = stock_take_service.record_scan(
+                self.take_id, code, self.qty_input.value(), self.replace_check.isChecked())
+        except ValueError as e:
+            self.lbl_status.setText(str(e))
+            return
+        line = stock_take_service.get_stock_take_lines(self.take_id, product_id)[0]
+        self.set_line(line)
+        self.table.scrollToItem(self.table.item(self.rows[product_id], 0))
+        self.lbl_status.setText(f"{line['name']}: {counted:g} counted")
+        self.qty_input.setValue(1.0)
+        self.replace_check.setChecked(False)
+        
+    def apply(self):
+        reply = QMessageBox.question(self, "Apply Counts",
+                                     f"Set stock for {len(self.rows)} counted products to the counted quantities?",
+                                     QMessageBox.Yes | QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+        try:
+            summary = stock_take_service.close_stock_take(self.take_id)
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+        QMessageBox.information(self, "Stock Take Applied",
+                                f"{summary['adjusted']} of {summary['counted']} products adjusted, "
+                                f"net {summary['net_qty']:+g} units (Rs {summary['net_value']:+.2f}).")
+        self.accept()
+        
+    def discard(self):
+        reply = QMessageBox.question(self, "Discard Count", "Discard all counts in this stock take?",
+                                     QMessageBox.Yes | QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            stock_take_service.cancel_stock_take(self.take_id)
+            self.reject()
+
+class PriceListDialog(QDialog):
+    """Schedules a price revision: rules by category / GST rate, applied by the till at the start time."""
+    KINDS = [("% of sell price", 'percent'), ("% over cost price", 'markup'), ("Add amount", 'add')]
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Price Lists")
+        self.resize(820, 560)
+        self.categories = get_categories()
+        self.gst_rates = get_gst_rates()
+        self.setup_ui()
+        self.add_rule()
+        self.load_data()
+        
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        
+        form = QFormLayout()
+        self.name_input = QLineEdit()
+        self.starts_at = QDateTimeEdit(QDateTime.currentDateTime().addSecs(3600))
+        self.starts_at.setCalendarPopup(True)
+        self.starts_at.setDisplayFormat("yyyy-MM-dd HH:mm")
+        form.addRow("Name *", self.name_input)
+        form.addRow("Starts At", self.starts_at)
+        layout.addLayout(form)
+        
+        self.rules_table = QTableWidget(0, 5)
+        self.rules_table.setHorizontalHeaderLabels(["Category", "GST Rate", "Rule", "Value", "Round To"])
+        self.rules_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.rules_table)
+        
+        rule_bar = QHBoxLayout()
+        btn_add_rule = QPushButton("Add Rule")
+        btn_add_rule.clicked.connect(self.add_rule)
+        rule_bar.addWidget(btn_add_rule)
+        btn_remove_rule = QPushButton("Remove Rule")
+        btn_remove_rule.clicked.connect(lambda: self.rules_table.removeRow(self.rules_table.currentRow()))
+        rule_bar.addWidget(btn_remove_rule)
+        rule_bar.addStretch()
+        self.lbl_preview = QLabel("")
+        rule_bar.addWidget(self.lbl_preview)
+        btn_schedule = QPushButton("Schedule")
+        btn_schedule.clicked.connect(self.schedule)
+        rule_bar.addWidget(btn_schedule)
+        layout.addLayout(rule_bar)
+        
+        self.lists_table = QTableWidget(0, 5)
+        self.lists_table.setHorizontalHeaderLabels(["Name", "Starts At", "Rules", "Status", "Repriced"])
+        self.lists_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.lists_table.setSelectionBehavior(QTableWidget.SelectRows)
+        layout.addWidget(self.lists_table)
+        
+        btn_bar = QHBoxLayout()
+        btn_bar.addStretch()
+        btn_cancel_list = QPushButton("Cancel Selected List")
+        btn_cancel_list.clicked.connect(self.cancel_list)
+        btn_bar.addWidget(btn_cancel_list)
+        layout.addLayout(btn_bar)
+        
+    def add_rule(self):
+        row = self.rules_table.rowCount()
+        self.rules_table.insertRow(row)
+        category = QComboBox()
+        category.addItem("All", None)
+        for c in self.categories:
+            category.addItem(c['name'], c['id'])
+        gst = QComboBox()
+        gst.addItem("All", None)
+        for g in self.gst_rates:
+            gst.addItem(g['label'], g['id'])
+        kind = QComboBox()
+        for label, value in self.KINDS:
+            kind.addItem(label, value)
+        value = QDoubleSpinBox()
+        value.setRange(-99999.0, 99999.0)
+        round_to = QDoubleSpinBox()
+        round_to.setMaximum(1000.0)
+        round_to.setSpecialValueText("-")
+        for col, widget in enumerate([category, gst, kind, value, round_to]):
+            self.rules_table.setCellWidget(row, col, widget)
+            
+    def rules(self):
+        cell = self.rules_table.cellWidget
+        return [{'category_id': cell(row, 0).currentData(), 'gst_rate_id': cell(row, 1).currentData(),
+                 'kind': cell(row, 2).currentData(), 'value': cell(row, 3).value(),
+                 'round_to': cell(row, 4).value() or None}
+                for row in range(self.rules_table.rowCount())]
+                
+    def load_data(self):
+        lists = price_service.get_price_lists()
+        self.lists_table.setRowCount(len(lists))
+        for i, pl in enumerate(lists):
+            repriced = '' if pl['products_changed'] is None else str(pl['products_changed'])
+            for col, value in enumerate([pl['name'], pl['starts_at'][:16], str(pl['rules']),
+                                         pl['status'].title(), repriced]):
+                item = QTableWidgetItem(value)
+                item.setData(Qt.UserRole, pl['id'])
+                self.lists_table.setItem(i, col, item)
+                
+    def schedule(self):
+        starts_at = self.starts_at.dateTime().toString("yyyy-MM-dd HH:mm:00")
+        try:
+            price_list_id = price_service.create_price_list(self.name_input.text(), starts_at, self.rules())
+        except ValueError as e:
+            QMessageBox.warning(self, "Price List", str(e))
+            return
+        count, _ = price_service.preview_price_list(price_list_id)
+        self.lbl_preview.setText(f"Scheduled: {count} products would change at today's prices")
+        self.name_input.clear()
+        self.load_data()
+        
+    def cancel_list(self):
+        item = self.lists_table.item(self.lists_table.currentRow(), 0)
+        if item is None:
+            return
+        try:
+            price_service.cancel_price_list(item.data(Qt.UserRole))
+        except ValueError as e:
+            QMessageBox.warning(self, "Price List", str(e))
+        self.load_data()
+
+class LabelsDialog(QDialog):
+    """Barcode labels for the selected products, as an A4 sheet PDF or ZPL for a label printer."""
+    OUTPUTS = [("A4 sheet, 65 labels (38 x 21 mm)", '65-up'), ("A4 sheet, 21 labels (63 x 38 mm)", '21-up'),
+               ("Label printer (ZPL)", 'zpl')]
+    # Fewer barcodes than this render faster in this process than through a
+    # process pool, whose start-up (spawn on Windows) outweighs ~0.35 ms a barcode
+    PARALLEL_BARCODES = 3000
+    
+    def __init__(self, products, parent=None, received=False):
+        super().__init__(parent)
+        self.setWindowTitle("Print Labels")
+        self.products = products # dicts with id and stock (units received, for a GRN)
+        self.worker = None
+        self.setup_ui()
+        if received:
+            self.per_unit.setText("One label per unit received")
+            self.per_unit.setChecked(True)
+        
+    def setup_ui(self):
+        layout = QFormLayout(self)
+        self.output_combo = QComboBox()
+        for label, value in self.OUTPUTS:
+            self.output_combo.addItem(label, value)
+        self.copies = QDoubleSpinBox()
+        self.copies.setDecimals(0)
+        self.copies.setRange(1, 999)
+        self.per_unit = QCheckBox("One label per unit in stock")
+        self.per_unit.toggled.connect(lambda checked: self.copies.setEnabled(not checked))
+        layout.addRow("Products", QLabel(str(len(self.products))))
+        layout.addRow("Output", self.output_combo)
+        layout.addRow("Copies each", self.copies)
+        layout.addRow("", self.per_unit)
+        self.lbl_status = QLabel("")
+        layout.addRow(self.lbl_status)
+        self.btn_save = QPushButton("Save Labels...")
+        self.btn_save.clicked.connect(self.save)
+        layout.addRow(self.btn_save)
+        
+    def save(self):
+        output = self.output_combo.currentData()
+        ext = 'zpl' if output == 'zpl' else 'pdf'
+        path, _ = QFileDialog.getSaveFileName(self, "Save Labels", f"labels.{ext}", f"Labels (*.{ext})")
+        if not path:
+            return
+        if not path.lower().endswith(f".{ext}"):
+            path += f".{ext}"
+        if self.per_unit.isChecked():
+            copies = {p['id']: max(int(p['stock']), 0) for p in self.products}
+        else:
+            copies = {p['id']: int(self.copies.value()) for p in self.products}
+        items = get_label_items(copies) # read here; rendering runs on the worker without the database
+        if not items:
+            QMessageBox.warning(self, "Print Labels", "None of these products has a barcode or SKU to print.")
+            return
+        self.btn_save.setEnabled(False)
+        self.lbl_status.setText(f"Rendering {sum(i['copies'] for i in items)} labels...")
+        sheet = output if output != 'zpl' else '65-up'
+        barcodes = len({(i['symbology'], i['code']) for i in items})
+        workers = 1 if barcodes < self.PARALLEL_BARCODES else None
+        self.worker = Worker(write_labels, items, path, sheet, workers)
+        self.worker.signals.result.connect(self.on_result)
+        self.worker.signals.error.connect(self.on_error)
+        self.worker.signals.finished.connect(self.on_finished)
+        QThreadPool.globalInstance().start(self.worker)
+        
+    def on_result(self, stats):
+        pages = f" on {stats['pages']} pages" if stats['pages'] else ""
+        self.lbl_status.setText(f"Saved {stats['labels']} labels{pages} in {stats['seconds']:.1f}s.")
+        
+    def on_error(self, error):
+        QMessageBox.critical(self, "Print Labels", str(error))
+        
+    def on_finished(self):
+        self.worker = None
+        self.btn_save.setEnabled(True)
+
+class InventoryModel(PagedQueryModel):
+    ACTIONS_COLUMN = 8
+    STOCK_COLUMN = 7
+    
+    def __init__(self, parent=None):
+        right = Qt.AlignRight | Qt.AlignVCenter
+        columns = [
+            Column("ID", "p.id", lambda r: str(r['id'])),
+            Column("Name", "p.name", lambda r: r['name']),
+            Column("SKU/Barcode", "COALESCE(p.sku, p.barcode, '')",
+                   lambda r: f"{r['sku'] or ''} / {r['barcode'] or ''}".strip(' /')),
+            Column("Category", "COALESCE(c.name, '')", lambda r: r['cat_name'] or '---'),
+            Column("Unit", "COALESCE(p.unit, '')", lambda r: r['unit']),
+            Column("Cost", "p.cost_price", lambda r: f"{r['cost_price']:.2f}", right),
+            Column("Sell", "p.sell_price", lambda r: f"{r['sell_price']:.2f}", right),
+            Column("Stock", "p.stock", lambda r: f"{r['stock']}", right),
+            Column("Actions"),
+        ]
+        super().__init__(columns, """p.id, p.name, p.sku, p.barcode, c.name as cat_name, p.unit,
+                                     p.cost_price, p.sell_price, p.stock, p.is_low_stock""",
+                         "products p LEFT JOIN categories c ON p.category_id = c.id", "p.id", parent=parent)
+        
+    def background(self, row, column):
+        if column == self.STOCK_COLUMN and row['is_low_stock']:
+            return QColor("#FEE2E2") # Light red
+        return None
 
 class InventoryScreen(QWidget):
+    SEARCH_DELAY_MS = 250
+    
     def __init__(self):
         super().__init__()
         self.setup_ui()
         self.load_data()
+        get_bridge().event.connect(self.on_event, Qt.QueuedConnection)
         
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -179,81 +956,152 @@ class InventoryScreen(QWidget):
         
         self.search = QLineEdit()
         self.search.setPlaceholderText("Search products...")
-        self.search.textChanged.connect(self.load_data)
         top_bar.addWidget(self.search)
         
+        # Typing restarts the timer, so the query runs once the user pauses
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.load_data)
+        self.search.textChanged.connect(self.search_timer.start)
+        
         self.low_stock_filter = QCheckBox("Low Stock Only")
         self.low_stock_filter.stateChanged.connect(self.load_data)
         top_bar.addWidget(self.low_stock_filter)
         
+        btn_import = QPushButton("Import")
+        btn_import.clicked.connect(self.show_import_dialog)
+        top_bar.addWidget(btn_import)
+        
+        btn_receive = QPushButton("Receive Goods")
+        btn_receive.clicked.connect(self.show_purchase_dialog)
+        top_bar.addWidget(btn_receive)
+        
+        btn_stock_take = QPushButton("Stock Take")
+        btn_stock_take.clicked.connect(self.show_stock_take_dialog)
+        top_bar.addWidget(btn_stock_take)
+        
+        btn_expiry = QPushButton("Expiry")
+        btn_expiry.clicked.connect(self.show_expiry_dialog)
+        top_bar.addWidget(btn_expiry)
+        
+        btn_labels = QPushButton("Labels")
+        btn_labels.setToolTip("Print barcode labels for the selected products")
+        btn_labels.clicked.connect(self.show_labels_dialog)
+        top_bar.addWidget(btn_labels)
+        
+        btn_prices = QPushButton("Price Lists")
+        btn_prices.clicked.connect(self.show_price_list_dialog)
+        top_bar.addWidget(btn_prices)
+        
+        btn_reorder = QPushButton("Reorder List")
+        btn_reorder.clicked.connect(self.show_reorder_dialog)
+        top_bar.addWidget(btn_reorder)
+        
         btn_add = QPushButton("Add Product")
         btn_add.clicked.connect(self.show_add_dialog)
         top_bar.addWidget(btn_add)
         
         layout.addLayout(top_bar)
         
-        # Table
-        self.table = QTableWidget(0, 9)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "Name", "SKU/Barcode", "Category", "Unit", 
-            "Cost", "Sell", "Stock", "Actions"
-        ])
+        # Table: rows are paged in from SQL as the view scrolls
+        self.model = InventoryModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setDefaultSectionSize(32)
         self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.table.setColumnWidth(InventoryModel.ACTIONS_COLUMN, 200)
+        self.actions = ButtonDelegate(["Edit", "Adjust Stock"], self.table)
+        self.actions.clicked.connect(self.on_action)
+        self.table.setItemDelegateForColumn(InventoryModel.ACTIONS_COLUMN, self.actions)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(0, Qt.AscendingOrder)
         layout.addWidget(self.table)
         
-    def load_data(self):
-        conn = get_connection()
-        cursor = conn.cursor()
+        self.lbl_count = QLabel("")
+        layout.addWidget(self.lbl_count)
         
-        query = "SELECT p.*, c.name as cat_name FROM products p LEFT JOIN categories c ON p.category_id = c.id WHERE p.is_active=1"
-        params = []
+    def load_data(self):
+        self.search_timer.stop()
+        where, params = ["p.is_active = 1"], []
         
         search_text = self.search.text().strip()
         if search_text:
-            query += " AND (p.name LIKE ? OR p.sku LIKE ? OR p.barcode LIKE ?)"
+            where.append("(p.name LIKE ? OR p.sku LIKE ? OR p.barcode LIKE ?)")
             params.extend([f"%{search_text}%", f"%{search_text}%", f"%{search_text}%"])
             
         if self.low_stock_filter.isChecked():
-            query += " AND p.stock <= p.low_stock_qty"
+            where.append("p.is_low_stock = 1")
             
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+        self.model.set_filter(where, params)
+        self.lbl_count.setText(f"{self.model.count()} products")
         
-        self.table.setRowCount(len(rows))
-        for i, row in enumerate(rows):
-            self.table.setItem(i, 0, QTableWidgetItem(str(row['id'])))
-            self.table.setItem(i, 1, QTableWidgetItem(row['name']))
+    def on_event(self, name, payload):
+        if name in (event_bus.STOCK_CHANGED, event_bus.LOW_STOCK_CHANGED):
+            for p in payload.get('changes') or payload.get('products') or []:
+                self.model.update_row(p['id'], {'stock': p['stock'], 'is_low_stock': p['is_low_stock']})
+        elif name == event_bus.PRICES_CHANGED:
+            self.model.reload()
+                
+    def on_action(self, row, label):
+        product = self.model.row(row)
+        if label == "Edit":
+            self.show_edit_dialog(product['id'])
+        else:
+            self.show_adjust_dialog(product['id'], product['stock'])
             
-            sku_bc = f"{row['sku'] or ''} / {row['barcode'] or ''}".strip(' /')
-            self.table.setItem(i, 2, QTableWidgetItem(sku_bc))
-            self.table.setItem(i, 3, QTableWidgetItem(row['cat_name'] or '---'))
-            self.table.setItem(i, 4, QTableWidgetItem(row['unit']))
-            self.table.setItem(i, 5, QTableWidgetItem(f"{row['cost_price']:.2f}"))
-            self.table.setItem(i, 6, QTableWidgetItem(f"{row['sell_price']:.2f}"))
+    def show_low_stock(self):
+        self.search.clear()
+        self.low_stock_filter.setChecked(True)
             
-            stock_item = QTableWidgetItem(f"{row['stock']}")
-            if row['stock'] <= row['low_stock_qty']:
-                stock_item.setBackground(QColor("#FEE2E2")) # Light red
-            self.table.setItem(i, 7, stock_item)
+    def show_add_dialog(self):
+        dlg = AddProductDialog(self)
+        if dlg.exec():
+            self.load_data()
             
-            # Actions
-            action_widget = QWidget()
-            h_layout = QHBoxLayout(action_widget)
-            h_layout.setContentsMargins(0, 0, 0, 0)
+    def show_edit_dialog(self, product_id):
+        if AddProductDialog(self, get_product(product_id)).exec():
+            self.load_data()
             
-            btn_edit = QPushButton("Edit")
-            btn_adj = QPushButton("Adjust Stock")
-            btn_adj.clicked.connect(lambda checked=False, pid=row['id'], stk=row['stock']: self.show_adjust_dialog(pid, stk))
+    def show_import_dialog(self):
+        dialog = ImportProductsDialog(self)
+        dialog.exec()
+        if dialog.imported:
+            self.load_data()
             
-            h_layout.addWidget(btn_edit)
-            h_layout.addWidget(btn_adj)
-            self.table.setCellWidget(i, 8, action_widget)
+    def show_purchase_dialog(self):
+        dialog = PurchaseDialog(self)
+        if not dialog.exec():
+            return
+        self.load_data()
+        reply = QMessageBox.question(self, "Print Labels", "Print barcode labels for the received goods?",
+                                     QMessageBox.Yes | QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            LabelsDialog([{'id': l['product_id'], 'stock': l['qty']} for l in dialog.posted_lines],
+                         self, received=True).exec()
             
-    def show_add_dialog(self):
-        dlg = AddProductDialog(self)
-        if dlg.exec():
+    def show_stock_take_dialog(self):
+        if StockTakeDialog(self).exec():
             self.load_data()
             
+    def show_expiry_dialog(self):
+        ExpiryDialog(self).exec()
+            
+    def show_labels_dialog(self):
+        rows = sorted({index.row() for index in self.table.selectionModel().selectedRows()})
+        if not rows:
+            QMessageBox.information(self, "Print Labels", "Select the products to print labels for.")
+            return
+        LabelsDialog([self.model.row(r) for r in rows], self).exec()
+            
+    def show_price_list_dialog(self):
+        PriceListDialog(self).exec()
+            
+    def show_reorder_dialog(self):
+        PurchaseSuggestionsDialog(self).exec()
+            
     def show_adjust_dialog(self, product_id, current_stock):
         dlg = StockAdjustDialog(product_id, current_stock, self)
         if dlg.exec():
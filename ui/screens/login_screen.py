@@ -1,8 +1,10 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QLineEdit, 
-                               QPushButton, QFrame, QHBoxLayout, QGraphicsDropShadowEffect, QMessageBox)
-from PySide6.QtCore import Qt, Signal
+                               QPushButton, QFrame, QHBoxLayout, QGraphicsDropShadowEffect, QMessageBox,
+                               QDialog, QFormLayout, QComboBox)
+from PySide6.QtCore import Qt, Signal, QThreadPool
 from PySide6.QtGui import QColor, QCursor
 from forms.login_form import LoginForm
+from ui.workers import Worker
 
 class LoginScreen(QWidget):
     login_success = Signal(object) # Emits User object
@@ -10,6 +12,8 @@ class LoginScreen(QWidget):
     def __init__(self):
         super().__init__()
         self.form = LoginForm()
+        self.login_worker = None
+        self.pending_login = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -156,7 +160,7 @@ class LoginScreen(QWidget):
         self.error_label.hide()
 
         # Login Button
-        login_btn = QPushButton("➔  Sign In")
+        self.login_btn = login_btn = QPushButton("➔  Sign In")
         login_btn.setCursor(Qt.PointingHandCursor)
         login_btn.setMinimumHeight(42)
         login_btn.setStyleSheet("""
@@ -171,6 +175,9 @@ class LoginScreen(QWidget):
             QPushButton:hover {
                 background-color: #1D4ED8;
             }
+            QPushButton:disabled {
+                background-color: #93C5FD;
+            }
         """)
         login_btn.clicked.connect(self.handle_login)
         self.password_input.returnPressed.connect(self.handle_login)
@@ -221,6 +228,9 @@ class LoginScreen(QWidget):
         main_layout.addSpacing(30)
 
     def handle_login(self):
+        if self.pending_login is not None:
+            return # verification already in progress
+            
         username = self.username_input.text().strip()
         password = self.password_input.text().strip()
 
@@ -229,15 +239,100 @@ class LoginScreen(QWidget):
             return
 
         try:
-            user = self.form.validate(username, password)
+            row = self.form.begin(username)
+        except ValueError as e:
+            self.show_error(str(e))
+            return
+            
+        # bcrypt takes a few hundred ms, so it runs off the UI thread
+        self.pending_login = (username, row)
+        self.set_pending(True)
+        self.login_worker = Worker(LoginForm.check_password, row, password)
+        self.login_worker.signals.result.connect(self.on_password_checked)
+        self.login_worker.signals.error.connect(self.on_login_error)
+        QThreadPool.globalInstance().start(self.login_worker)
+        
+    def on_login_error(self, error):
+        self.pending_login = None
+        self.set_pending(False)
+        self.show_error(f"Login failed: {error}")
+        
+    def on_password_checked(self, password_ok):
+        username, row = self.pending_login
+        self.pending_login = None
+        # Reset before emitting: a successful login replaces this screen
+        self.set_pending(False)
+        try:
+            user = self.form.complete(username, row, password_ok)
             self.error_label.hide()
             self.login_success.emit(user)
         except ValueError as e:
             self.show_error(str(e))
             
+    def set_pending(self, pending):
+        self.login_btn.setEnabled(not pending)
+        self.login_btn.setText("Signing in..." if pending else "➔  Sign In")
+        self.username_input.setEnabled(not pending)
+        self.password_input.setEnabled(not pending)
+        if pending:
+            self.error_label.hide()
+            
     def handle_forgot_password(self, link):
         QMessageBox.information(self, "Forgot Password", "Please contact your system administrator to reset your credentials.")
 
     def show_error(self, message):
         self.error_label.setText(message)
         self.error_label.show()
+
+
+class SwitchCashierDialog(QDialog):
+    """Shift handover: pick a cashier and enter their PIN instead of a full login."""
+    def __init__(self, current_user=None, parent=None):
+        super().__init__(parent)
+        self.form = LoginForm()
+        self.user = None
+        self.setWindowTitle("Switch Cashier")
+        self.setFixedSize(320, 180)
+        self.setup_ui(current_user)
+        
+    def setup_ui(self, current_user):
+        layout = QFormLayout(self)
+        
+        self.user_combo = QComboBox()
+        for u in self.form.get_switchable_users():
+            if current_user and u.id == current_user.id:
+                continue
+            self.user_combo.addItem(f"{u.full_name} ({u.username})", u.id)
+            
+        self.pin_input = QLineEdit()
+        self.pin_input.setEchoMode(QLineEdit.Password)
+        self.pin_input.setMaxLength(6)
+        self.pin_input.setPlaceholderText("4-6 digit PIN")
+        self.pin_input.returnPressed.connect(self.verify)
+        
+        self.error_label = QLabel("")
+        self.error_label.setStyleSheet("color: #EF4444; font-size: 12px; font-weight: bold;")
+        
+        layout.addRow("Cashier:", self.user_combo)
+        layout.addRow("PIN:", self.pin_input)
+        layout.addRow(self.error_label)
+        
+        btn_switch = QPushButton("Switch")
+        btn_switch.clicked.connect(self.verify)
+        layout.addRow(btn_switch)
+        
+        if self.user_combo.count() == 0:
+            self.error_label.setText("No other cashier has a PIN set.")
+            btn_switch.setEnabled(False)
+        self.pin_input.setFocus()
+        
+    def verify(self):
+        user_id = self.user_combo.currentData()
+        if user_id is None:
+            return
+        try:
+            self.user = self.form.verify_pin(user_id, self.pin_input.text().strip())
+            self.accept()
+        except ValueError as e:
+            self.pin_input.clear()
+            self.error_label.setText(str(e))
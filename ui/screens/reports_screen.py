@@ -1,15 +1,34 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTabWidget, 
                                QLabel, QPushButton, QTableWidget, QTableWidgetItem,
-                               QHeaderView, QDateEdit, QFileDialog, QMessageBox)
-from PySide6.QtCore import Qt, QDate
-import csv
-from services.report_service import get_daily_summary, get_product_sales, get_gst_summary, get_day_summary, close_day
+                               QHeaderView, QDateEdit, QFileDialog, QMessageBox, QProgressBar, QComboBox)
+from PySide6.QtCore import Qt, QDate, QThreadPool
+from services.report_service import (iter_product_sales, iter_gst_summary, get_day_summary, close_day,
+                                     update_derived_data)
+from services.export_service import DATASETS, iter_export, export_rows
+from ui.workers import ReportWorker, Worker
+from database.connection import get_worker_connection
 from PySide6.QtGui import QColor
 
+def _update_derived_data():
+    conn = get_worker_connection() # its writes never interleave with the till's connection
+    try:
+        return update_derived_data(conn)
+    finally:
+        conn.close()
+
 class ReportsScreen(QWidget):
     def __init__(self):
         super().__init__()
+        # Reports run on their own small pool and read connections, so the
+        # till stays responsive. One job per slot: a newer request cancels the older.
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+        self.jobs = {}          # slot -> ReportWorker
+        self.job_handlers = {}  # job id -> (slot, label, on_result)
+        self.next_job_id = 0
+        self.derived_worker = None # post-close snapshot/checkpoint job
         self.setup_ui()
+        self.load_day_close_data()
         
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -28,8 +47,87 @@ class ReportsScreen(QWidget):
         self.setup_products_tab()
         self.tabs.addTab(self.tab_products, "Product Sales")
         
+        self.tab_export = QWidget()
+        self.setup_export_tab()
+        self.tabs.addTab(self.tab_export, "Export")
+        
         layout.addWidget(self.tabs)
         
+        # Progress of running reports
+        status_layout = QHBoxLayout()
+        self.lbl_status = QLabel("")
+        self.progress = QProgressBar()
+        self.progress.setMaximumWidth(300)
+        self.btn_cancel = QPushButton("Cancel")
+        self.btn_cancel.clicked.connect(self.cancel_jobs)
+        status_layout.addWidget(self.lbl_status)
+        status_layout.addStretch()
+        status_layout.addWidget(self.progress)
+        status_layout.addWidget(self.btn_cancel)
+        layout.addLayout(status_layout)
+        self.update_status()
+        
+    # ── Background jobs ──────────────────────────────────────────────────
+    def run_report(self, slot, label, fn, args, on_result):
+        """
+        Runs fn(*args) on the pool. on_result gets the final result and, for
+        chunked reports, every partial (done, total, rows) as it arrives.
+        """
+        old = self.jobs.pop(slot, None)
+        if old is not None:
+            old.cancel()
+            self.job_handlers.pop(old.job_id, None)
+            
+        self.next_job_id += 1
+        worker = ReportWorker(self.next_job_id, fn, *args)
+        worker.signals.progress.connect(self.on_job_progress)
+        worker.signals.result.connect(self.on_job_result)
+        worker.signals.error.connect(self.on_job_error)
+        worker.signals.finished.connect(self.on_job_finished)
+        self.jobs[slot] = worker
+        self.job_handlers[worker.job_id] = (slot, label, on_result)
+        self.pool.start(worker)
+        self.update_status()
+        
+    def on_job_progress(self, job_id, partial):
+        handler = self.job_handlers.get(job_id)
+        if handler: # None for a cancelled (stale) job
+            done, total, _ = partial
+            self.progress.setRange(0, total)
+            self.progress.setValue(done)
+            handler[2](partial)
+            
+    def on_job_result(self, job_id, result):
+        handler = self.job_handlers.get(job_id)
+        if handler:
+            handler[2](result)
+            
+    def on_job_error(self, job_id, error):
+        handler = self.job_handlers.get(job_id)
+        if handler:
+            QMessageBox.critical(self, "Error", f"{handler[1]} failed: {error}")
+            
+    def on_job_finished(self, job_id):
+        handler = self.job_handlers.pop(job_id, None)
+        if handler and self.jobs.get(handler[0]) is not None and self.jobs[handler[0]].job_id == job_id:
+            del self.jobs[handler[0]]
+        self.update_status()
+        
+    def cancel_jobs(self):
+        for worker in self.jobs.values():
+            worker.cancel()
+            self.job_handlers.pop(worker.job_id, None)
+        self.jobs.clear()
+        self.update_status()
+        
+    def update_status(self):
+        running = [self.job_handlers[w.job_id][1] for w in self.jobs.values() if w.job_id in self.job_handlers]
+        self.lbl_status.setText(f"{', '.join(running)}..." if running else "")
+        self.progress.setVisible(bool(running))
+        self.btn_cancel.setVisible(bool(running))
+        if running:
+            self.progress.setRange(0, 0) # busy until the first chunk reports
+        
     def setup_day_close_tab(self):
         layout = QVBoxLayout(self.tab_day_close)
         
@@ -99,35 +197,32 @@ class ReportsScreen(QWidget):
         btn_layout.addWidget(self.btn_print_day)
         layout.addLayout(btn_layout)
         
-        self.load_day_close_data()
-        
     def load_day_close_data(self):
         d_str = self.dc_date.date().toString(Qt.ISODate)
-        try:
-            summary = get_day_summary(d_str)
-            self.lbl_grand.setText(f"Rs {summary['grand_total']:.2f}")
-            self.lbl_inv_count.setText(f"{summary['invoice_count']} Invoices")
-            self.lbl_avg_bill.setText(f"Avg: Rs {summary['avg_bill']:.2f}")
-            
-            self.lbl_cash.setText(f"Cash: Rs {summary['cash_total']:.2f}")
-            self.lbl_upi.setText(f"UPI: Rs {summary['upi_total']:.2f}")
-            self.lbl_card.setText(f"Card: Rs {summary['card_total']:.2f}")
-            self.lbl_credit.setText(f"Credit: Rs {summary['credit_total']:.2f}")
+        self.run_report('day_close', "Loading day summary", get_day_summary, (d_str,),
+                        self.show_day_summary)
             
-            self.lbl_dc_cgst.setText(f"CGST Collected: Rs {summary['cgst_total']:.2f}")
-            self.lbl_dc_sgst.setText(f"SGST Collected: Rs {summary['sgst_total']:.2f}")
-            
-            if summary['already_closed']:
-                self.btn_close_day.setText("Day Closed ✅")
-                self.btn_close_day.setEnabled(False)
-                self.btn_close_day.setStyleSheet("background-color: #10B981; color: white; padding: 12px; font-weight: bold; font-size: 16px; border-radius: 4px;")
-            else:
-                self.btn_close_day.setText("Close the Day")
-                self.btn_close_day.setEnabled(True)
-                self.btn_close_day.setStyleSheet("background-color: #F59E0B; color: white; padding: 12px; font-weight: bold; font-size: 16px; border-radius: 4px;")
-                
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Could not load day summary: {e}")
+    def show_day_summary(self, summary):
+        self.lbl_grand.setText(f"Rs {summary['grand_total']:.2f}")
+        self.lbl_inv_count.setText(f"{summary['invoice_count']} Invoices")
+        self.lbl_avg_bill.setText(f"Avg: Rs {summary['avg_bill']:.2f}")
+        
+        self.lbl_cash.setText(f"Cash: Rs {summary['cash_total']:.2f}")
+        self.lbl_upi.setText(f"UPI: Rs {summary['upi_total']:.2f}")
+        self.lbl_card.setText(f"Card: Rs {summary['card_total']:.2f}")
+        self.lbl_credit.setText(f"Credit: Rs {summary['credit_total']:.2f}")
+        
+        self.lbl_dc_cgst.setText(f"CGST Collected: Rs {summary['cgst_total']:.2f}")
+        self.lbl_dc_sgst.setText(f"SGST Collected: Rs {summary['sgst_total']:.2f}")
+        
+        if summary['already_closed']:
+            self.btn_close_day.setText("Day Closed ✅")
+            self.btn_close_day.setEnabled(False)
+            self.btn_close_day.setStyleSheet("background-color: #10B981; color: white; padding: 12px; font-weight: bold; font-size: 16px; border-radius: 4px;")
+        else:
+            self.btn_close_day.setText("Close the Day")
+            self.btn_close_day.setEnabled(True)
+            self.btn_close_day.setStyleSheet("background-color: #F59E0B; color: white; padding: 12px; font-weight: bold; font-size: 16px; border-radius: 4px;")
             
     def do_close_day(self):
         d_str = self.dc_date.date().toString(Qt.ISODate)
@@ -137,10 +232,25 @@ class ReportsScreen(QWidget):
             try:
                 # user_id should be real logged in user
                 close_day(d_str, user_id=1)
-                QMessageBox.information(self, "Success", "Day closed successfully.")
-                self.load_day_close_data()
             except Exception as e:
                 QMessageBox.critical(self, "Error", str(e))
+                return
+            QMessageBox.information(self, "Success", "Day closed successfully.")
+            self.load_day_close_data()
+            # Snapshot and checkpoints follow on a worker, so the till isn't held up
+            self.derived_worker = Worker(_update_derived_data)
+            self.derived_worker.signals.result.connect(self.on_derived_data)
+            self.derived_worker.signals.error.connect(
+                lambda e: self.on_derived_data({'errors': [f"Updating day-close data failed: {e}"]}))
+            self.derived_worker.signals.finished.connect(self.on_derived_finished)
+            self.pool.start(self.derived_worker)
+            
+    def on_derived_data(self, stats):
+        if stats['errors']:
+            QMessageBox.warning(self, "Day Close", "The day is closed, but:\n" + "\n".join(stats['errors']))
+            
+    def on_derived_finished(self):
+        self.derived_worker = None
                 
     def print_day_close(self):
         QMessageBox.information(self, "Print", "Print day summary (to be implemented).")
@@ -164,7 +274,7 @@ class ReportsScreen(QWidget):
         btn_gen.clicked.connect(self.generate_daily_report)
         filter_layout.addWidget(btn_gen)
         
-        btn_exp = QPushButton("Export CSV")
+        btn_exp = QPushButton("Export")
         btn_exp.clicked.connect(self.export_daily)
         filter_layout.addWidget(btn_exp)
         
@@ -183,29 +293,33 @@ class ReportsScreen(QWidget):
     def generate_daily_report(self):
         start = self.dt_start.date().toString(Qt.ISODate)
         end = self.dt_end.date().toString(Qt.ISODate)
-        
-        try:
-            self.daily_data = get_gst_summary(start, end)
-            self.gst_table.setRowCount(len(self.daily_data))
-            for i, row in enumerate(self.daily_data):
-                self.gst_table.setItem(i, 0, QTableWidgetItem(f"{row['gst_rate']}%"))
-                self.gst_table.setItem(i, 1, QTableWidgetItem(f"{row['taxable_value']:.2f}"))
-                self.gst_table.setItem(i, 2, QTableWidgetItem(f"{row['cgst']:.2f}"))
-                self.gst_table.setItem(i, 3, QTableWidgetItem(f"{row['sgst']:.2f}"))
-                self.gst_table.setItem(i, 4, QTableWidgetItem(f"{row['total_tax']:.2f}"))
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        if start > end:
+            QMessageBox.warning(self, "Dates", "Start date is after end date.")
+            return
+        self.daily_data = []
+        self.run_report('gst', "Generating GST report", iter_gst_summary, (start, end),
+                        self.show_gst_summary)
+        
+    def show_gst_summary(self, partial):
+        _, _, self.daily_data = partial
+        self.gst_table.setRowCount(len(self.daily_data))
+        for i, row in enumerate(self.daily_data):
+            self.gst_table.setItem(i, 0, QTableWidgetItem(f"{row['gst_rate']}%"))
+            self.gst_table.setItem(i, 1, QTableWidgetItem(f"{row['taxable_value']:.2f}"))
+            self.gst_table.setItem(i, 2, QTableWidgetItem(f"{row['cgst']:.2f}"))
+            self.gst_table.setItem(i, 3, QTableWidgetItem(f"{row['sgst']:.2f}"))
+            self.gst_table.setItem(i, 4, QTableWidgetItem(f"{row['total_tax']:.2f}"))
             
     def export_daily(self):
         if not self.daily_data: return
-        file_path, _ = QFileDialog.getSaveFileName(self, "Save CSV", "gst_report.csv", "CSV Files (*.csv)")
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export GST Report", "gst_report.csv",
+                                                   "CSV Files (*.csv);;Excel Files (*.xlsx)")
         if file_path:
-            keys = self.daily_data[0].keys()
-            with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=keys)
-                writer.writeheader()
-                writer.writerows(self.daily_data)
-            QMessageBox.information(self, "Success", "Exported successfully.")
+            try:
+                export_rows(self.daily_data, file_path)
+                QMessageBox.information(self, "Success", "Exported successfully.")
+            except Exception as e:
+                QMessageBox.critical(self, "Error", str(e))
             
     def setup_products_tab(self):
         layout = QVBoxLayout(self.tab_products)
@@ -230,12 +344,77 @@ class ReportsScreen(QWidget):
         
     def generate_product_report(self):
         date_str = self.dt_prod.date().toString(Qt.ISODate)
-        try:
-            data = get_product_sales(date_str, date_str)
-            self.prod_table.setRowCount(len(data))
-            for i, row in enumerate(data):
-                self.prod_table.setItem(i, 0, QTableWidgetItem(row['name']))
-                self.prod_table.setItem(i, 1, QTableWidgetItem(str(row['qty_sold'])))
-                self.prod_table.setItem(i, 2, QTableWidgetItem(f"{row['revenue']:.2f}"))
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        self.run_report('products', "Generating product sales", iter_product_sales,
+                        (date_str, date_str), self.show_product_sales)
+        
+    def show_product_sales(self, partial):
+        _, _, data = partial
+        self.prod_table.setRowCount(len(data))
+        for i, row in enumerate(data):
+            self.prod_table.setItem(i, 0, QTableWidgetItem(row['name']))
+            self.prod_table.setItem(i, 1, QTableWidgetItem(str(row['qty_sold'])))
+            self.prod_table.setItem(i, 2, QTableWidgetItem(f"{row['revenue']:.2f}"))
+
+    def setup_export_tab(self):
+        layout = QVBoxLayout(self.tab_export)
+        
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Data:"))
+        self.exp_dataset = QComboBox()
+        for name, (label, _, _) in DATASETS.items():
+            self.exp_dataset.addItem(label, name)
+        self.exp_dataset.currentIndexChanged.connect(self.update_export_dates)
+        filter_layout.addWidget(self.exp_dataset)
+        
+        filter_layout.addWidget(QLabel("From:"))
+        self.exp_start = QDateEdit(QDate.currentDate().addDays(1 - QDate.currentDate().day()))
+        self.exp_start.setCalendarPopup(True)
+        filter_layout.addWidget(self.exp_start)
+        filter_layout.addWidget(QLabel("To:"))
+        self.exp_end = QDateEdit(QDate.currentDate())
+        self.exp_end.setCalendarPopup(True)
+        filter_layout.addWidget(self.exp_end)
+        
+        filter_layout.addWidget(QLabel("Format:"))
+        self.exp_format = QComboBox()
+        self.exp_format.addItem("CSV", ".csv")
+        self.exp_format.addItem("CSV (gzip)", ".csv.gz")
+        self.exp_format.addItem("Excel", ".xlsx")
+        filter_layout.addWidget(self.exp_format)
+        
+        btn_export = QPushButton("Export...")
+        btn_export.clicked.connect(self.start_export)
+        filter_layout.addWidget(btn_export)
+        filter_layout.addStretch()
+        layout.addLayout(filter_layout)
+        
+        self.lbl_export = QLabel("Large exports are written in the background; the till stays usable.")
+        layout.addWidget(self.lbl_export)
+        layout.addStretch()
+        
+    def update_export_dates(self):
+        dated = DATASETS[self.exp_dataset.currentData()][2]
+        self.exp_start.setEnabled(dated)
+        self.exp_end.setEnabled(dated)
+        
+    def start_export(self):
+        dataset = self.exp_dataset.currentData()
+        start = self.exp_start.date().toString(Qt.ISODate)
+        end = self.exp_end.date().toString(Qt.ISODate)
+        if start > end:
+            QMessageBox.warning(self, "Dates", "Start date is after end date.")
+            return
+        ext = self.exp_format.currentData()
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export", f"{dataset}{ext}", f"*{ext}")
+        if not file_path:
+            return
+        if not file_path.lower().endswith(ext):
+            file_path += ext
+        self.lbl_export.setText("Starting export...")
+        self.run_report('export', f"Exporting {self.exp_dataset.currentText().lower()}",
+                        iter_export, (dataset, file_path, start, end), self.show_export_progress)
+        
+    def show_export_progress(self, partial):
+        _, _, stats = partial
+        self.lbl_export.setText(f"{stats['rows']:,} rows written to {stats['path']} "
+                                f"({stats['rows_per_sec']:,} rows/s, {stats['seconds']:.1f}s)")
@@ -8,6 +8,7 @@ import os
 import shutil
 import bcrypt
 from database.connection import get_connection
+from forms.login_form import LoginForm
 from services.backup_service import backup_to_usb, backup_to_local, get_last_backup_date, check_backup_reminder
 
 class AddUserDialog(QDialog):
@@ -23,12 +24,17 @@ class AddUserDialog(QDialog):
         self.fullname = QLineEdit()
         self.password = QLineEdit()
         self.password.setEchoMode(QLineEdit.Password)
+        self.pin = QLineEdit()
+        self.pin.setEchoMode(QLineEdit.Password)
+        self.pin.setMaxLength(6)
+        self.pin.setPlaceholderText("Optional, for cashier switching")
         self.role = QComboBox()
         self.role.addItems(["staff", "admin"])
         
         layout.addRow("Username *:", self.username)
         layout.addRow("Full Name *:", self.fullname)
         layout.addRow("Password *:", self.password)
+        layout.addRow("PIN:", self.pin)
         layout.addRow("Role:", self.role)
         
         btn_save = QPushButton("Save User")
@@ -45,13 +51,22 @@ class AddUserDialog(QDialog):
             QMessageBox.warning(self, "Error", "All fields are required")
             return
             
+        pin = self.pin.text().strip()
+        if pin and not (pin.isdigit() and 4 <= len(pin) <= 6):
+            QMessageBox.warning(self, "Error", "PIN must be 4 to 6 digits")
+            return
+            
         hashed = bcrypt.hashpw(pwd.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
         
         conn = get_connection()
         try:
             with conn:
-                conn.execute("INSERT INTO users (username, full_name, password, role) VALUES (?, ?, ?, ?)",
-                             (un, fn, hashed, r))
+                cursor = conn.cursor()
+                cursor.execute("INSERT INTO users (username, full_name, password, role) VALUES (?, ?, ?, ?)",
+                               (un, fn, hashed, r))
+                user_id = cursor.lastrowid
+            if pin:
+                LoginForm().set_pin(user_id, pin)
             self.accept()
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to add user (Username might exist). Error: {e}")
@@ -153,7 +168,7 @@ class SettingsScreen(QWidget):
         layout = QFormLayout(page)
         
         self.paper_width = QComboBox()
-        self.paper_width.addItems(["58mm", "80mm"])
+        self.paper_width.addItems(["58mm", "80mm", "A4"])
         
         port_layout = QHBoxLayout()
         self.printer_port = QLineEdit()
@@ -266,7 +281,15 @@ class SettingsScreen(QWidget):
             if self.current_user and self.current_user.id == u['id']:
                 btn_deact.setEnabled(False) # Can't toggle self
                 
-            self.users_table.setCellWidget(i, 4, btn_deact)
+            btn_pin = QPushButton("Set PIN")
+            btn_pin.clicked.connect(lambda checked=False, uid=u['id']: self.set_user_pin(uid))
+            
+            actions = QWidget()
+            h_layout = QHBoxLayout(actions)
+            h_layout.setContentsMargins(0, 0, 0, 0)
+            h_layout.addWidget(btn_deact)
+            h_layout.addWidget(btn_pin)
+            self.users_table.setCellWidget(i, 4, actions)
             
     def update_backup_info(self):
         last = get_last_backup_date()
@@ -344,7 +367,23 @@ class SettingsScreen(QWidget):
         conn = get_connection()
         with conn:
             conn.execute("UPDATE users SET is_active = ? WHERE id = ?", (new_status, user_id))
+        LoginForm.clear_pin_cache()
         self.load_users()
+        
+    def set_user_pin(self, user_id):
+        if self.current_user and self.current_user.role != 'admin':
+            QMessageBox.warning(self, "Error", "Only admin can manage users")
+            return
+        from PySide6.QtWidgets import QInputDialog
+        pin, ok = QInputDialog.getText(self, "Set PIN", "New 4-6 digit PIN for cashier switching:",
+                                       QLineEdit.Password)
+        if not ok:
+            return
+        try:
+            LoginForm().set_pin(user_id, pin.strip())
+            QMessageBox.information(self, "Saved", "PIN updated")
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
 
     def do_backup_usb(self):
         try:
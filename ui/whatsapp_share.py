@@ -0,0 +1,29 @@
+import webbrowser
+from PySide6.QtWidgets import QInputDialog, QMessageBox
+from utils.whatsapp_share import build_whatsapp_url
+
+def open_whatsapp(phone_number, invoice_data, parent_widget=None):
+    if not phone_number:
+        # Ask for phone number
+        phone, ok = QInputDialog.getText(parent_widget, "WhatsApp Number", 
+                                        "Enter WhatsApp number\n(10 digits, no +91 needed):")
+        if ok and phone:
+            phone_number = phone.strip()
+        else:
+            return False # Cancelled
+            
+    webbrowser.open(build_whatsapp_url(phone_number, invoice_data))
+    return True
+
+def open_whatsapp_pdf(invoice_data, parent_widget=None):
+    from services.printer_service import print_to_pdf
+    try:
+        pdf_path = print_to_pdf(invoice_data)
+        QMessageBox.information(parent_widget, "PDF Generated", 
+            f"PDF generated at:\n{pdf_path}\n\nOpening WhatsApp Web to share it manually.")
+        webbrowser.open("https://web.whatsapp.com/")
+        return True
+    except Exception as e:
+        if parent_widget:
+            QMessageBox.warning(parent_widget, "Error", f"Failed to open WhatsApp PDF: {e}")
+        return False
@@ -0,0 +1,97 @@
+import inspect
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+class WorkerSignals(QObject):
+    result = Signal(object)
+    error = Signal(object)     # the exception raised by the task
+    finished = Signal()
+
+class Worker(QRunnable):
+    """
+    Runs fn(*args, **kwargs) on a QThreadPool thread and reports back through
+    signals, which Qt delivers on the receiver's (UI) thread.
+    Keep a reference to the worker until finished fires.
+    """
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self._emit(self.signals.error, e)
+        else:
+            self._emit(self.signals.result, result)
+        finally:
+            self._emit(self.signals.finished)
+            
+    @staticmethod
+    def _emit(signal, *args):
+        try:
+            signal.emit(*args)
+        except RuntimeError:
+            pass # receiver side was torn down (e.g. screen closed) - nothing to report to
+
+
+class ReportSignals(QObject):
+    progress = Signal(int, object)  # job id, partial result
+    result = Signal(int, object)    # job id, final result
+    error = Signal(int, object)     # job id, exception
+    finished = Signal(int)
+
+
+class ReportWorker(QRunnable):
+    """
+    Runs fn(*args, conn=<read connection>) on a pool thread, on its own
+    read-only connection so billing keeps writing meanwhile. If fn returns a
+    generator, every yielded value is emitted as progress and the last one is
+    the result. cancel() interrupts the SQL statement in flight; a cancelled
+    job emits nothing but finished.
+    """
+    def __init__(self, job_id, fn, *args):
+        super().__init__()
+        self.job_id = job_id
+        self.fn = fn
+        self.args = args
+        self.conn = None
+        self.cancelled = False
+        self.signals = ReportSignals()
+
+    def run(self):
+        from database.connection import get_read_connection
+        try:
+            self.conn = get_read_connection()
+            if self.cancelled:
+                return
+            out = self.fn(*self.args, conn=self.conn)
+            if inspect.isgenerator(out):
+                result = None
+                for result in out:
+                    if self.cancelled:
+                        out.close() # lets the generator clean up (e.g. remove a partial file)
+                        return
+                    Worker._emit(self.signals.progress, self.job_id, result)
+                out = result
+            if not self.cancelled:
+                Worker._emit(self.signals.result, self.job_id, out)
+        except Exception as e:
+            if not self.cancelled: # sqlite3 'interrupted' errors are expected after cancel()
+                Worker._emit(self.signals.error, self.job_id, e)
+        finally:
+            conn, self.conn = self.conn, None
+            if conn is not None:
+                conn.close()
+            Worker._emit(self.signals.finished, self.job_id)
+
+    def cancel(self):
+        self.cancelled = True
+        conn = self.conn
+        if conn is not None:
+            try:
+                conn.interrupt()
+            except Exception:
+                pass # already closed
@@ -1,6 +1,5 @@
 import re
-from PySide6.QtWidgets import QApplication
-from database.connection import get_connection
+from services.inventory_service import find_product_by_barcode
 
 def is_barcode(text):
     """
@@ -10,8 +9,10 @@ def is_barcode(text):
     return bool(re.match(r'^\d{8,13}$', text))
 
 class BarcodeHandler:
-    def __init__(self):
-        pass
+    def __init__(self, on_scan=None):
+        # Optional feedback hook (the billing screen passes QApplication.beep);
+        # kept as a callback so this module stays free of Qt
+        self.on_scan = on_scan
         
     def handle_search_input(self, text, on_product_found, on_not_found):
         """
@@ -23,17 +24,13 @@ class BarcodeHandler:
         if not is_barcode(text):
             return False # Not a barcode, ignore
             
-        conn = get_connection()
-        cursor = conn.cursor()
+        product = find_product_by_barcode(text)
         
-        cursor.execute("SELECT * FROM products WHERE barcode = ? AND is_active = 1", (text,))
-        row = cursor.fetchone()
-        
-        if row:
-            QApplication.beep()
-            on_product_found(dict(row))
+        if product:
+            if self.on_scan:
+                self.on_scan()
+            on_product_found(product)
         else:
             on_not_found(text)
             
         return True
-
@@ -0,0 +1,106 @@
+import os
+import sys
+import json
+import time
+
+# Set SMART_POS_PROFILE=1 to record per-module import times and startup
+# milestones. The report is printed and written to startup_profile.json
+# (or the path in SMART_POS_PROFILE_OUT) once the billing screen is ready.
+ENABLED = os.environ.get('SMART_POS_PROFILE', '') not in ('', '0')
+
+_t0 = time.perf_counter()
+_marks = []            # (label, seconds since process start of profiling)
+_imports = {}          # module -> {'self': s, 'total': s}
+_stack = []            # child time accumulated per import in progress
+_installed = False
+_finished = False
+
+
+class _TimedLoader:
+    """Wraps a module loader and times exec_module (self and cumulative)."""
+    def __init__(self, loader, name):
+        self._loader = loader
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        start = time.perf_counter()
+        _stack.append(0.0)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            total = time.perf_counter() - start
+            children = _stack.pop()
+            _imports[self._name] = {'self': total - children, 'total': total}
+            if _stack:
+                _stack[-1] += total
+
+
+class _ImportTimer:
+    """meta_path finder that defers to the real finders and wraps their loader."""
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, fullname)
+                return spec
+        return None
+
+
+def install():
+    """Starts import timing. Call before any heavy import in main.py."""
+    global _installed
+    if not ENABLED or _installed:
+        return
+    sys.meta_path.insert(0, _ImportTimer())
+    _installed = True
+    mark('profile_start')
+
+
+def mark(label):
+    if ENABLED:
+        _marks.append((label, time.perf_counter() - _t0))
+
+
+def elapsed(label_from, label_to):
+    times = dict(_marks)
+    if label_from in times and label_to in times:
+        return times[label_to] - times[label_from]
+    return None
+
+
+def finish(top=25):
+    """Prints the profile and writes it as JSON. Only runs once."""
+    global _finished
+    if not ENABLED or _finished:
+        return None
+    _finished = True
+
+    slowest = sorted(_imports.items(), key=lambda kv: kv[1]['self'], reverse=True)[:top]
+    profile = {
+        'marks': [{'label': l, 'seconds': round(t, 4)} for l, t in _marks],
+        'login_to_billing_ready': elapsed('login_success', 'billing_ready'),
+        'launch_to_login_shown': elapsed('profile_start', 'login_shown'),
+        'imports': {name: {k: round(v, 4) for k, v in t.items()} for name, t in slowest},
+        'import_total': round(sum(t['self'] for t in _imports.values()), 4),
+    }
+
+    print("── Startup profile ──")
+    for label, t in _marks:
+        print(f"{t*1000:9.1f} ms  {label}")
+    print(f"Imports: {len(_imports)} modules, {profile['import_total']*1000:.1f} ms")
+    for name, t in slowest:
+        print(f"{t['self']*1000:9.1f} ms self {t['total']*1000:9.1f} ms total  {name}")
+
+    out_path = os.environ.get('SMART_POS_PROFILE_OUT', 'startup_profile.json')
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, indent=2)
+    return profile
@@ -1,6 +1,4 @@
 import urllib.parse
-import webbrowser
-from PySide6.QtWidgets import QInputDialog, QMessageBox
 
 def format_receipt_text(invoice_data):
     """
@@ -32,17 +30,8 @@ def format_receipt_text(invoice_data):
     
     return "\n".join(lines)
 
-def open_whatsapp(phone_number, invoice_data, parent_widget=None):
-    if not phone_number:
-        # Ask for phone number
-        phone, ok = QInputDialog.getText(parent_widget, "WhatsApp Number", 
-                                        "Enter WhatsApp number\n(10 digits, no +91 needed):")
-        if ok and phone:
-            phone_number = phone.strip()
-        else:
-            return False # Cancelled
-            
-    # Clean phone number
+def build_whatsapp_url(phone_number, invoice_data):
+    """wa.me link with the receipt text. 10-digit numbers get the +91 prefix."""
     clean_phone = ''.join(filter(str.isdigit, phone_number))
     if len(clean_phone) == 10:
         clean_phone = "91" + clean_phone
@@ -50,19 +39,4 @@ def open_whatsapp(phone_number, invoice_data, parent_widget=None):
     text = format_receipt_text(invoice_data)
     encoded_text = urllib.parse.quote(text)
     
-    url = f"https://wa.me/{clean_phone}?text={encoded_text}"
-    webbrowser.open(url)
-    return True
-
-def open_whatsapp_pdf(invoice_data, parent_widget=None):
-    from services.printer_service import print_to_pdf
-    try:
-        pdf_path = print_to_pdf(invoice_data)
-        QMessageBox.information(parent_widget, "PDF Generated", 
-            f"PDF generated at:\n{pdf_path}\n\nOpening WhatsApp Web to share it manually.")
-        webbrowser.open("https://web.whatsapp.com/")
-        return True
-    except Exception as e:
-        if parent_widget:
-            QMessageBox.warning(parent_widget, "Error", f"Failed to open WhatsApp PDF: {e}")
-        return False
+    return f"https://wa.me/{clean_phone}?text={encoded_text}"